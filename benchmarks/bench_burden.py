@@ -0,0 +1,60 @@
+# benchmarks/bench_burden.py
+# Times a facility-wide burden pass over an assessment period, then a refresh after one resident's
+# shift is saved (only that resident is recomputed); checks the refreshed scores against a full pass.
+# Usage: python -m benchmarks.bench_burden [--residents 120] [--days 90] [--db PATH]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from note_an_acc.scoring import BurdenScores
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import facility_records, random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Behaviour burden scoring benchmark")
+    ap.add_argument("--residents", type=int, default=120)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--db", default=None, help="database path; generated only if it holds no shifts yet")
+    args = ap.parse_args()
+
+    store = ShiftStore(args.db or os.path.join(tempfile.mkdtemp(), "burden.db"))
+    if not store.connection().execute("SELECT 1 FROM shifts LIMIT 1").fetchone():
+        records = facility_records(random.Random(5), args.residents, args.days)
+        for i in range(0, len(records), 2000):
+            store.save_shifts(records[i:i + 2000], notes=[""] * len(records[i:i + 2000]), ward="A")
+    date_from, date_to = store.connection().execute("SELECT MIN(shift_date), MAX(shift_date) FROM shifts").fetchone()
+    episodes = store.connection().execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    scores = BurdenScores(date_from, date_to)
+    t0 = time.perf_counter()
+    scores.refresh(store)
+    t_full = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scores.refresh(store)
+    t_idle = time.perf_counter() - t0
+
+    record = random_record(random.Random(2), "R0001", date_to, n_episodes=5, shift_type="Night")
+    store.save_shift(record, "", ward="A")
+    t0 = time.perf_counter()
+    recomputed = scores.refresh(store)
+    t_one = time.perf_counter() - t0
+
+    fresh = BurdenScores(date_from, date_to)
+    fresh.refresh(store)
+    assert scores.values.keys() == fresh.values.keys()
+    assert all((scores.values[r] == fresh.values[r]).all() for r in fresh.values), "refresh drifted from a full pass"
+
+    print(f"episodes:          {episodes:,} ({len(scores.values)} residents, {date_from} to {date_to})")
+    print(f"full pass:         {t_full * 1000:.1f} ms")
+    print(f"refresh, idle:     {t_idle * 1000:.2f} ms")
+    print(f"refresh, 1 saved:  {t_one * 1000:.2f} ms ({recomputed} resident recomputed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_drafts.py
+# Many sessions changing their forms as fast as a slider drag: counts draft updates handed to the
+# write-behind cache against transactions and rows actually written, and checks the stored drafts end
+# up identical to each session's last state.
+# Usage: python -m benchmarks.bench_drafts [--sessions 40] [--seconds 20] [--rate 20] [--flush-every 2]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from note_an_acc.drafts import DraftWriter, decode_state
+from note_an_acc.storage import ShiftStore
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Draft autosave write-behind benchmark")
+    ap.add_argument("--sessions", type=int, default=40)
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--rate", type=float, default=20.0, help="form changes per second per session")
+    ap.add_argument("--flush-every", type=float, default=2.0)
+    ap.add_argument("--quiet", type=float, default=1.0)
+    ap.add_argument("--max-wait", type=float, default=8.0)
+    args = ap.parse_args()
+
+    store = ShiftStore(os.path.join(tempfile.mkdtemp(), "drafts.db"))
+    writer = DraftWriter(store, args.flush_every, args.quiet, args.max_wait).start()
+    rng = random.Random(3)
+    last = {}
+    # Each session stops at a random point, as staff move on to the next resident
+    stop_at = {f"tab{i}": rng.uniform(args.seconds / 2, args.seconds) for i in range(args.sessions)}
+
+    t0 = time.monotonic()
+    update_s = 0.0
+    while (elapsed := time.monotonic() - t0) < args.seconds:
+        for key, stop in stop_at.items():
+            if elapsed < stop:
+                state = {"resident_id": key, "ep_wandering_sev": rng.randint(1, 4),
+                         "ep_wandering_freq": rng.randint(1, 4), "ongoing": "monitor" * rng.randint(0, 3)}
+                u0 = time.perf_counter()
+                writer.update(key, state)
+                update_s += time.perf_counter() - u0
+                last[key] = state
+        time.sleep(1 / args.rate)
+    writer.close()
+
+    minutes = args.seconds / 60
+    for key, state in last.items():
+        assert decode_state(store.load_draft(key)) == state, f"{key}: stored draft is not the last state"
+    print(f"form changes:       {writer.updates:,} ({writer.updates / minutes:,.0f}/min)")
+    print(f"coalesced in cache: {writer.coalesced:,}")
+    print(f"transactions:       {writer.flushes} ({writer.flushes / minutes:.0f}/min, bound {60 / args.flush_every:.0f}/min + final)")
+    print(f"draft rows written: {writer.rows_written} ({writer.rows_written / minutes:.0f}/min)")
+    print(f"update() cost:      {update_s / max(writer.updates, 1) * 1e6:.1f} µs per rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_effectiveness.py
+# Times loading the strategy/intervention effectiveness index from stored history, ranking lookups
+# as the episode cards do on every rerun, and folding in a saved shift; checks incremental counts
+# against a reload.
+# Usage: python -m benchmarks.bench_effectiveness [--residents 60] [--days 90] [--db PATH]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from note_an_acc.catalogue import load_catalogue
+from note_an_acc.effectiveness import EffectivenessIndex
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import facility_records, random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Effectiveness index benchmark")
+    ap.add_argument("--residents", type=int, default=60)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--lookups", type=int, default=100_000)
+    ap.add_argument("--db", default=None, help="database path; generated only if it holds no shifts yet")
+    args = ap.parse_args()
+
+    store = ShiftStore(args.db or os.path.join(tempfile.mkdtemp(), "effectiveness.db"))
+    if not store.connection().execute("SELECT 1 FROM shifts LIMIT 1").fetchone():
+        records = facility_records(random.Random(4), args.residents, args.days)
+        for i in range(0, len(records), 2000):
+            store.save_shifts(records[i:i + 2000], notes=[""] * len(records[i:i + 2000]), ward="A")
+    episodes = store.connection().execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    t0 = time.perf_counter()
+    index = EffectivenessIndex.load(store)
+    t_load = time.perf_counter() - t0
+
+    cat = load_catalogue()
+    entries = list(cat.behaviours.values())
+    rng = random.Random(1)
+    lookups = [(f"R{rng.randrange(args.residents):04d}", rng.choice(entries)) for _ in range(1000)]
+    t0 = time.perf_counter()
+    for i in range(args.lookups):
+        resident, entry = lookups[i % len(lookups)]
+        index.rank(resident, entry.name, "intervent", entry.intervent)
+        index.rank(resident, entry.name, "prevent", entry.prevent)
+    t_rank = (time.perf_counter() - t0) / (args.lookups * 2)
+
+    # Save a shift, then resubmit it with different episodes
+    record = random_record(rng, "R0001", "2030-01-01", n_episodes=4)
+    store.save_shift(record, "", ward="A")
+    t0 = time.perf_counter()
+    index.apply_shift(record)
+    revised = random_record(rng, "R0001", "2030-01-01", n_episodes=3, shift_type=record.shift_type)
+    previous = store.load_shift(record.resident_id, record.shift_date, record.shift_type)
+    store.save_shift(revised, "", ward="A")
+    index.apply_shift(revised, previous)
+    t_apply = (time.perf_counter() - t0) / 2
+
+    fresh = EffectivenessIndex.load(store)
+    clean = {k: {o: c for o, c in v.items() if c != [0, 0]} for k, v in index.counts.items()}
+    clean = {k: v for k, v in clean.items() if v}
+    assert clean == fresh.counts, "incremental counts drifted from a reload"
+
+    print(f"episodes:    {episodes:,}")
+    print(f"load:        {t_load:.2f}s (one-off per process)")
+    print(f"rank lookup: {t_rank * 1e6:.2f} µs")
+    print(f"apply shift: {t_apply * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
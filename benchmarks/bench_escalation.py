@@ -0,0 +1,105 @@
+# benchmarks/bench_escalation.py
+# Streams a facility's shifts through the escalation detector in submission order, with one planted
+# escalation, and reports the per-event cost early and late in the stream (it should not grow with
+# history). Then replays the same shifts from the store and checks the alerts are identical, and
+# delivers them to a local stand-in webhook.
+# Usage: python -m benchmarks.bench_escalation [--residents 60] [--days 60]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from note_an_acc.engine import Episode, ShiftRecord
+from note_an_acc.escalation import EscalationDetector, deliver, record_alerts, stored_shifts
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_record
+
+SHIFTS = ("Morning", "Afternoon", "Night")
+
+
+def planted(day: str, shift_type: str, sev: int) -> ShiftRecord:
+    return ShiftRecord(resident_id="P0001", shift_date=day, shift_type=shift_type, episodes=(
+        Episode(behaviour="Problem wandering", specifics=("Exit-seeking",), sev=sev),
+    ))
+
+async def receive(store: ShiftStore) -> list:
+    received = []
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readline()
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        received.extend(json.loads(await reader.readexactly(length))["alerts"])
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        await deliver(store, f"http://127.0.0.1:{port}/alerts")
+    return received
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Escalation detector benchmark")
+    ap.add_argument("--residents", type=int, default=60)
+    ap.add_argument("--days", type=int, default=60)
+    args = ap.parse_args()
+
+    rng = random.Random(24)
+    first = date(2026, 1, 1)
+    records = []
+    for d in range(args.days):
+        day = (first + timedelta(days=d)).isoformat()
+        for i, shift_type in enumerate(SHIFTS):
+            batch = [random_record(rng, f"R{r:04d}", day, shift_type=shift_type) for r in range(args.residents)]
+            rng.shuffle(batch)  # carers submit in no particular order within a shift
+            records += batch
+            if d == args.days // 2:
+                records.append(planted(day, shift_type, sev=2 + i))
+
+    detector = EscalationDetector()
+    timings, streamed = [], []
+    for record in records:
+        t0 = time.perf_counter()
+        alerts = detector.apply_shift(record, "A")
+        timings.append((time.perf_counter() - t0, len({ep.behaviour for ep in record.episodes})))
+        streamed += alerts
+    events = detector.events
+    tenth = len(timings) // 10
+    per_event = lambda part: sum(t for t, _ in part) / max(1, sum(n for _, n in part)) * 1e6
+
+    store = ShiftStore(os.path.join(tempfile.mkdtemp(), "escalation.db"))
+    store.upsert_residents([(f"R{r:04d}", "", "A") for r in range(args.residents)] + [("P0001", "", "A")])
+    store.save_shifts(records)
+    t0 = time.perf_counter()
+    replayer = EscalationDetector()
+    replayed = list(replayer.replay(stored_shifts(store, shift_order=replayer.shift_order)))
+    replay_s = time.perf_counter() - t0
+
+    assert sorted(map(repr, replayed)) == sorted(map(repr, streamed)), "replay differs from the live stream"
+    mine = {(a.rule, a.shift_type) for a in streamed if a.resident_id == "P0001"}
+    assert {("severity", "Night"), ("manifestation", "Night")} <= mine, mine
+    recorded = record_alerts(store, streamed)
+    received = asyncio.run(receive(store))
+    assert len(received) == recorded == len(streamed)
+
+    print(f"shifts: {len(records):,}, behaviour-shifts: {events:,}, tracks: {len(detector.tracks):,}")
+    print(f"stream: {per_event(timings[:tenth]):.1f} µs per event in the first tenth, "
+          f"{per_event(timings[-tenth:]):.1f} µs in the last")
+    print(f"replay from store: {replay_s:.2f}s ({events / replay_s:,.0f} events/s)")
+    print(f"alerts: {len(streamed)} ({len(streamed) / args.days:.1f}/day), planted escalation found, "
+          f"replay identical, {len(received)} delivered to the webhook")
+
+
+if __name__ == "__main__":
+    main()
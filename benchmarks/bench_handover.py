@@ -0,0 +1,56 @@
+# benchmarks/bench_handover.py
+# Builds the handover pack for one ward (some residents not yet reported) in-process and on a
+# process pool (forced, whatever the ward size), and checks both documents are identical apart
+# from the generated-at time.
+# Usage: python -m benchmarks.bench_handover [--residents 60] [--workers 4]
+
+import argparse
+import io
+import os
+import random
+import re
+import tempfile
+import time
+
+from note_an_acc.engine import build_note
+from note_an_acc.handover import write_handover
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Ward handover pack benchmark")
+    ap.add_argument("--residents", type=int, default=60)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    store = ShiftStore(os.path.join(tempfile.mkdtemp(), "handover.db"))
+    rng = random.Random(8)
+    store.upsert_residents((f"R{i:04d}", f"Resident {i}", "A") for i in range(args.residents))
+    # One in ten residents has no record yet at handover time
+    records = [random_record(rng, f"R{i:04d}", "2026-03-01", shift_type="Morning")
+               for i in range(args.residents) if i % 10 != 9]
+    store.save_shifts(records, [build_note(r) for r in records], ward="A")
+
+    docs, timings = {}, {}
+    for workers in sorted({1, args.workers}):
+        runs = []
+        for _ in range(args.repeat):
+            buf = io.StringIO()
+            t0 = time.perf_counter()
+            n = write_handover(buf, store, "A", "2026-03-01", "Morning", workers, pool_min=0)
+            runs.append(time.perf_counter() - t0)
+        docs[workers] = re.sub(r"generated \d\d:\d\d", "", buf.getvalue())
+        timings[workers] = min(runs)
+        assert n == args.residents and docs[workers].count('class="resident') == n
+    assert len(set(docs.values())) == 1, "pooled and in-process documents differ"
+
+    print(f"residents: {args.residents} ({len(records)} reported), document {len(docs[1]) / 1024:.0f} KiB")
+    for workers, t in timings.items():
+        print(f"workers={workers}: {t * 1000:.1f} ms (best of {args.repeat}, pool start-up included)")
+
+
+if __name__ == "__main__":
+    main()
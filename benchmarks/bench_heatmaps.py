@@ -0,0 +1,65 @@
+# benchmarks/bench_heatmaps.py
+# Builds a facility's worth of shift history, then times loading the 7/30/90-day heatmap index,
+# advancing it a day, and checks the rolling totals against a from-scratch rebuild. Night shifts are
+# included, so their slots after midnight land on the next day's bucket.
+# Usage: python -m benchmarks.bench_heatmaps [--residents 120] [--days 90]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from note_an_acc.analytics import HeatmapIndex
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import facility_records, random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Heatmap index load/advance benchmark")
+    ap.add_argument("--residents", type=int, default=120)
+    ap.add_argument("--days", type=int, default=90)
+    args = ap.parse_args()
+
+    store = ShiftStore(os.path.join(tempfile.mkdtemp(), "heatmaps.db"))
+    start = date(2026, 1, 1)
+    rng = random.Random(3)
+    records = facility_records(rng, args.residents, args.days + 1, start.isoformat())
+    records += [random_record(rng, f"R{r:04d}", (start + timedelta(days=d)).isoformat(), shift_type="Night")
+                for d in range(args.days + 1) for r in range(args.residents)]
+    for i in range(0, len(records), 2000):
+        store.save_shifts(records[i:i + 2000], notes=[""] * len(records[i:i + 2000]), ward="A")
+    episodes = store.connection().execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    as_of = start + timedelta(days=args.days - 1)
+    t0 = time.perf_counter()
+    index = HeatmapIndex.load(store, as_of)
+    t_load = time.perf_counter() - t0
+
+    # Roll forward a day and fold in that day's submissions as the app would on save
+    next_day = as_of + timedelta(days=1)
+    t0 = time.perf_counter()
+    index.advance(next_day)
+    t_adv = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    todays = [r for r in records if r.shift_date == next_day.isoformat()]
+    for record in todays:
+        index.apply_shift(record, "A")
+    t_apply = time.perf_counter() - t0
+
+    rebuilt = HeatmapIndex.load(store, next_day)
+    for w in index.windows:
+        for measure in ("count", "freq", "sev"):
+            assert getattr(index.ward("A", w), measure) == getattr(rebuilt.ward("A", w), measure), \
+                f"{w}-day {measure} drifted"
+
+    print(f"episodes stored:  {episodes:,} ({args.residents} residents x {args.days + 1} days)")
+    print(f"load 90-day index: {t_load * 1000:.0f} ms")
+    print(f"advance one day:   {t_adv * 1000:.1f} ms")
+    print(f"apply {len(todays)} shifts:  {t_apply * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_import.py
+# Generates a historical chart file (CSV or JSONL) with a sprinkling of bad rows and times the import.
+# Usage: python -m benchmarks.bench_import [--rows 1000000] [--workers 4] [--format csv]
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from note_an_acc.export import EPISODE_COLUMNS, LIST_COLUMNS
+from note_an_acc.importer import import_file
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_episode
+
+
+def generate(path: str, rows: int, fmt: str, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    first = date(2023, 1, 1)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, EPISODE_COLUMNS, extrasaction="ignore") if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        for n in range(rows):
+            shift_type = rng.choice(["Morning", "Afternoon"])
+            ep = random_episode(rng, shift_type)
+            row = dict(ep.to_dict(), resident_id=f"R{rng.randint(0, 199):04d}", ward="A",
+                       shift_date=(first + timedelta(days=rng.randint(0, 1094))).isoformat(),
+                       shift_type=shift_type, slot=ep.time, med_given=int(ep.med_given))
+            if n % 997 == 0:
+                row["sev"] = 7  # out of range — should be reported, not abort the run
+            if writer:
+                writer.writerow({k: "; ".join(v) if k in LIST_COLUMNS else v for k, v in row.items()})
+            else:
+                fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Bulk import benchmark")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, f"charts.{args.format}")
+    t0 = time.perf_counter()
+    generate(path, args.rows, args.format)
+    print(f"generated {args.rows:,} rows in {time.perf_counter() - t0:.1f}s")
+
+    store = ShiftStore(os.path.join(tmp, "import.db"))
+    t0 = time.perf_counter()
+    report = import_file(path, store, workers=args.workers)
+    wall = time.perf_counter() - t0
+    print(f"imported {report.imported:,} rows, {len(report.errors):,} errors, {args.workers} workers")
+    print(f"import:  {wall:.1f}s ({report.rows / wall:,.0f} rows/s)")
+
+    t0 = time.perf_counter()
+    again = import_file(path, store, workers=args.workers)
+    print(f"re-import skipped {again.skipped:,} existing rows in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# benchmarks/bench_inclusion.py
+# Scalar include_episode vs the vectorised lookup-table path.
+# Usage: python -m benchmarks.bench_inclusion [--rows 10000000] [--seed 7]
+
+import argparse
+import time
+
+import numpy as np
+
+from note_an_acc.engine import include_episode
+from note_an_acc.inclusion import score_episodes
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark episode inclusion scoring")
+    ap.add_argument("--rows", type=int, default=10_000_000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    freq = rng.integers(1, 5, args.rows, dtype=np.int8)
+    sev = rng.integers(1, 5, args.rows, dtype=np.int8)
+    disrupt = rng.integers(0, 5, args.rows, dtype=np.int8)
+
+    t0 = time.perf_counter()
+    scalar = [include_episode(f, s, d) for f, s, d in zip(freq.tolist(), sev.tolist(), disrupt.tolist())]
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    mask, labels = score_episodes(freq, sev, disrupt)
+    t_vec = time.perf_counter() - t0
+
+    assert np.array_equal(mask, np.array(scalar, dtype=bool)), "vectorised mask differs from scalar rule"
+    print(f"rows:       {args.rows:,}")
+    print(f"scalar:     {t_scalar:.3f}s")
+    print(f"vectorised: {t_vec:.3f}s (mask + labels)")
+    print(f"speed-up:   {t_scalar / t_vec:.1f}x")
+    print(f"included:   {int(mask.sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
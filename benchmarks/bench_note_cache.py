@@ -0,0 +1,57 @@
+# benchmarks/bench_note_cache.py
+# Replays a session's worth of preview reruns through build_note with and without the
+# per-session SentenceCache. Most reruns touch only ADLs/visitors; some edit one episode.
+# Usage: python -m benchmarks.bench_note_cache [--episodes 20] [--reruns 5000] [--edit-rate 0.1]
+
+import argparse
+import random
+import time
+from dataclasses import replace
+
+from note_an_acc.engine import SentenceCache, build_note
+
+from .fixtures import ADLS, random_episode, random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Episode sentence cache benchmark")
+    ap.add_argument("--episodes", type=int, default=20)
+    ap.add_argument("--reruns", type=int, default=5000)
+    ap.add_argument("--edit-rate", type=float, default=0.1, help="share of reruns that edit an episode")
+    ap.add_argument("--seed", type=int, default=11)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    record = random_record(rng, n_episodes=args.episodes, shift_type="Morning")
+    # Keep every episode in the note so the cache is exercised on all of them
+    record = replace(record, episodes=tuple(replace(ep, freq=4) for ep in record.episodes))
+    records = []
+    for _ in range(args.reruns):
+        if record.episodes and rng.random() < args.edit_rate:
+            eps = list(record.episodes)
+            i = rng.randrange(len(eps))
+            eps[i] = replace(random_episode(rng, "Morning"), freq=4)
+            record = replace(record, episodes=tuple(eps))
+        else:
+            record = replace(record, adls_done=tuple(a for a in ADLS if rng.random() < 0.5))
+        records.append(record)
+
+    t0 = time.perf_counter()
+    plain = [build_note(r) for r in records]
+    t_plain = time.perf_counter() - t0
+
+    cache = SentenceCache()
+    t0 = time.perf_counter()
+    cached = [build_note(r, cache) for r in records]
+    t_cached = time.perf_counter() - t0
+
+    assert plain == cached, "cached notes differ from uncached"
+    n = len(records)
+    print(f"reruns:    {n:,} × {args.episodes} episodes (edit rate {args.edit_rate:.0%})")
+    print(f"uncached:  {t_plain / n * 1e6:.0f} µs/note")
+    print(f"cached:    {t_cached / n * 1e6:.0f} µs/note ({t_plain / t_cached:.1f}x)")
+    print(f"cache:     {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
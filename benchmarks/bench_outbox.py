@@ -0,0 +1,123 @@
+# benchmarks/bench_outbox.py
+# Handover burst through the outbox: carers save N notes at once, then the dispatcher drains them to a
+# local stand-in receiver that adds latency, returns 503 for a share of requests and sometimes drops the
+# response after accepting a batch. Checks every note arrives exactly once by idempotency key.
+# Usage: python -m benchmarks.bench_outbox [--notes 500] [--fail-rate 0.2] [--lost-rate 0.05]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from note_an_acc.outbox import Dispatcher, counts
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_record
+
+
+class StandIn:
+    """Minimal asyncio HTTP receiver that de-duplicates notes on their idempotency key."""
+
+    def __init__(self, latency: float, fail_rate: float, lost_rate: float, seed: int = 1):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.lost_rate = lost_rate
+        self.rng = random.Random(seed)
+        self.received = {}
+        self.duplicates = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            payload = json.loads(await reader.readexactly(length))
+            await asyncio.sleep(self.latency)
+            if self.rng.random() < self.fail_rate:
+                status = 503
+            else:
+                status = 200
+                for note in payload["notes"]:
+                    if note["idempotency_key"] in self.received:
+                        self.duplicates += 1
+                    self.received[note["idempotency_key"]] = note
+                if self.rng.random() < self.lost_rate:
+                    return  # accepted, but the sender never hears back
+            body = b'{"ok": true}' if status == 200 else b'{"error": "busy"}'
+            writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+        finally:
+            self.in_flight -= 1
+            writer.close()
+
+
+async def drain(store: ShiftStore, standin: StandIn, args) -> tuple:
+    server = await asyncio.start_server(standin.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    dispatcher = Dispatcher(store, f"http://127.0.0.1:{port}/notes", batch_size=args.batch,
+                            concurrency=args.concurrency, base_delay=0.05, max_delay=1.0,
+                            timeout=1.0, poll_interval=0.05)
+    t0 = time.perf_counter()
+    stats = await dispatcher.drain(deadline=120)
+    elapsed = time.perf_counter() - t0
+    server.close()
+    await server.wait_closed()
+    return stats, elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Outbox handover-burst benchmark")
+    ap.add_argument("--notes", type=int, default=500)
+    ap.add_argument("--carers", type=int, default=20)
+    ap.add_argument("--batch", type=int, default=25)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--latency", type=float, default=0.05, help="receiver latency per request (s)")
+    ap.add_argument("--fail-rate", type=float, default=0.2)
+    ap.add_argument("--lost-rate", type=float, default=0.05)
+    args = ap.parse_args()
+
+    store = ShiftStore(os.path.join(tempfile.mkdtemp(), "outbox.db"), outbox=True)
+    per_carer = args.notes // args.carers
+    waits = []
+    lock = threading.Lock()
+
+    def carer(n: int) -> None:
+        rng = random.Random(n)
+        for k in range(per_carer):
+            record = random_record(rng, f"R{n:03d}", f"2026-02-{k % 28 + 1:02d}", shift_type=("Morning", "Afternoon")[k // 28 % 2])
+            t0 = time.perf_counter()
+            store.submit(record, ward="A").result()
+            with lock:
+                waits.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=carer, args=(n,)) for n in range(args.carers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    waits.sort()
+    queued = counts(store).get("pending", 0)
+    print(f"saved {len(waits)} notes; carer wait p95 {waits[int(len(waits) * 0.95)] * 1000:.1f} ms; queued {queued}")
+
+    standin = StandIn(args.latency, args.fail_rate, args.lost_rate)
+    stats, elapsed = asyncio.run(drain(store, standin, args))
+    print(f"drained in {elapsed:.2f}s: {stats.requests} requests, {stats.retried} note retries, "
+          f"{stats.failed} failed; receiver peak in-flight {standin.peak_in_flight} (limit {args.concurrency})")
+    print(f"receiver: {len(standin.received)} unique notes, {standin.duplicates} re-sent duplicates absorbed")
+    print(f"queue: {counts(store)}")
+    assert len(standin.received) == queued, "not every queued note reached the receiver"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_overlays.py
+# Memory and resolve time of per-facility catalogue overlays against forking the whole catalogue per
+# facility; checks every overlay view answers exactly like a full parse of the merged file, and that the
+# documented example overlay applies.
+# Usage: python -m benchmarks.bench_overlays [--facilities 50] [--changes 6]
+
+import argparse
+import copy
+import json
+import random
+import time
+import tracemalloc
+
+from note_an_acc.catalogue import (
+    CATALOGUE_PATH, EXAMPLE_OVERLAY_PATH, FORM_FIELDS, LIST_FIELDS, _patch, apply_overlay, load_catalogue,
+    parse_catalogue,
+)
+
+
+def random_overlay(rng: random.Random, raw: dict, changes: int) -> dict:
+    names = [b for subs in raw["domains"].values() for behs in subs.values() for b in behs]
+    behaviours = {}
+    for name in rng.sample(names, changes):
+        field = rng.choice(LIST_FIELDS)
+        current = raw.get(field, {}).get(name, [])
+        behaviours.setdefault(name, {})[field] = {
+            "add": [f"Site practice {rng.randrange(1000)}"],
+            "remove": rng.sample(current, min(1, len(current))),
+        }
+    return {
+        "schema": 1, "version": "1",
+        "behaviours": behaviours,
+        "visitor_types": {"remove": ["Regis Companion"], "add": [f"Companion {rng.randrange(10)}"]},
+        "default_adls": {"Night": ["Toileting", "Change of incontinence aid"]},
+    }
+
+def merged(raw: dict, overlay: dict) -> dict:
+    """The per-facility fork the overlay replaces: the whole catalogue file with changes applied."""
+    out = copy.deepcopy(raw)
+    for name, fields in overlay["behaviours"].items():
+        for f, op in fields.items():
+            out.setdefault(f, {})[name] = list(_patch(tuple(out.get(f, {}).get(name, ())), op, f))
+    for f in FORM_FIELDS:
+        if f in overlay:
+            out[f] = list(_patch(tuple(out[f]), overlay[f], f))
+    out["default_adls"] = {**out["default_adls"], **overlay["default_adls"]}
+    return out
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Facility catalogue overlay benchmark")
+    ap.add_argument("--facilities", type=int, default=50)
+    ap.add_argument("--changes", type=int, default=2, help="behaviours changed per facility")
+    args = ap.parse_args()
+
+    with open(CATALOGUE_PATH, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    base = load_catalogue()
+    rng = random.Random(11)
+    overlays = [random_overlay(rng, raw, args.changes) for _ in range(args.facilities)]
+    forks = [merged(raw, o) for o in overlays]
+
+    views, overlay_bytes, overlay_s = measure(
+        lambda: [apply_overlay(base, o, f"site{i}") for i, o in enumerate(overlays)])
+    full, fork_bytes, fork_s = measure(lambda: [parse_catalogue(f) for f in forks])
+
+    for view, ref in zip(views, full):
+        assert dict(view.behaviours) == dict(ref.behaviours)
+        assert view.visitor_types == ref.visitor_types and dict(view.default_adls) == dict(ref.default_adls)
+        items = set(ref._any) | set(view._any)
+        for item in items:
+            assert view.behaviours_with(item) == ref.behaviours_with(item), item
+            for f in LIST_FIELDS:
+                assert view.behaviours_with(item, f) == ref.behaviours_with(item, f), (item, f)
+
+    with open(EXAMPLE_OVERLAY_PATH, encoding="utf-8") as fh:
+        example = apply_overlay(base, json.load(fh), "example")
+    assert "Walk in the sensory garden" in example.behaviours["Problem wandering"].intervent
+    assert "Regis Companion" not in example.visitor_types
+
+    n = args.facilities
+    print(f"facilities: {n}, {args.changes} behaviours changed each")
+    print(f"overlay views:  {overlay_bytes / n / 1024:7.1f} KiB per facility, resolved in {overlay_s / n * 1000:.2f} ms")
+    print(f"full forks:     {fork_bytes / n / 1024:7.1f} KiB per facility, parsed in {fork_s / n * 1000:.2f} ms")
+    print("overlay views match full parses of the merged files; the example overlay applies")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_search.py
+# Builds several years of shift notes for a facility, then times full-text searches with and
+# without resident, date and domain filters. Reports median and worst latency over repeats.
+# Usage: python -m benchmarks.bench_search [--residents 60] [--years 3] [--repeat 20]
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from note_an_acc.engine import render_notes
+from note_an_acc.export import ExportFilter
+from note_an_acc.search import search
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_record
+
+QUERIES = [
+    ("phrase", '"exit-seeking"', ExportFilter()),
+    ("phrase, stemmed", "Responding to voices", ExportFilter()),
+    ("common term", "resident", ExportFilter()),
+    ("prefix", "renov*", ExportFilter()),
+    ("resident filter", "exit-seeking", ExportFilter(resident_id="R0007")),
+    ("date range", "calling out", ExportFilter(date_from="2024-06-01", date_to="2024-06-30")),
+    ("domain filter", "unsettled", ExportFilter(domain="Agitation")),
+]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Full-text note search benchmark")
+    ap.add_argument("--residents", type=int, default=60)
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--db", default=None, help="database path; generated only if it holds no shifts yet")
+    args = ap.parse_args()
+
+    store = ShiftStore(args.db or os.path.join(tempfile.mkdtemp(), "search.db"))
+    if not store.connection().execute("SELECT 1 FROM shifts LIMIT 1").fetchone():
+        rng = random.Random(9)
+        start = date(2024, 1, 1)
+        t0 = time.perf_counter()
+        for d in range(args.years * 365):
+            day = (start + timedelta(days=d)).isoformat()
+            records = [random_record(rng, f"R{r:04d}", day, shift_type=s)
+                       for r in range(args.residents) for s in ("Morning", "Afternoon")]
+            store.save_shifts(records, render_notes(records), ward="A")
+        print(f"built {args.years * 365 * args.residents * 2:,} notes in {time.perf_counter() - t0:.0f}s")
+    notes = store.connection().execute("SELECT COUNT(*) FROM note_search").fetchone()[0]
+    print(f"indexed notes: {notes:,}")
+
+    print(f"{'query':<18} {'hits':>5} {'median ms':>10} {'max ms':>8}")
+    for label, q, flt in QUERIES:
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            results = search(store, q, flt, limit=20)
+            times.append((time.perf_counter() - t0) * 1000)
+        print(f"{label:<18} {len(results.hits):>5} {statistics.median(times):>10.1f} {max(times):>8.1f}  "
+              f"{'ranked after ' + results.cutoff if results.cutoff else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_session_memory.py
+# Drives one app session through a simulated shift with AppTest: carers pick and drop behaviours
+# across domains, score them and tick ADLs. Reports session_state key count, pickled state size and
+# traced heap at checkpoints; with stale episode state pruned these should stay flat (the sentence
+# cache grows only to its LRU bound).
+# Usage: python -m benchmarks.bench_session_memory [--hours 12] [--per-hour 30]
+
+import argparse
+import gc
+import os
+import pickle
+import random
+import time
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+from note_an_acc.ui import episode_key
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "note_an-acc_app.py")
+
+
+def _state(at: AppTest) -> dict:
+    # AppTest wraps SessionState; filtered_state is the user-visible mapping
+    ss = at.session_state._state._state
+    return dict(ss.filtered_state)
+
+def _state_bytes(state: dict) -> int:
+    size = 0
+    for v in state.values():
+        try:
+            size += len(pickle.dumps(v))
+        except Exception:  # widget placeholders such as date objects still pickle; skip anything odd
+            pass
+    return size
+
+def interact(at: AppTest, rng: random.Random) -> None:
+    domain = rng.choice(at.selectbox(key="domain").options)
+    if domain != at.selectbox(key="domain").value:
+        at.multiselect(key="behaviour_pick").set_value([]).run()
+        at.selectbox(key="domain").set_value(domain).run()
+    options = at.multiselect(key="behaviour_pick").options
+    pick = rng.sample(options, rng.randint(0, min(3, len(options))))
+    at.multiselect(key="behaviour_pick").set_value(pick).run()
+    for beh in pick:
+        at.slider(key=episode_key(beh, "freq")).set_value(rng.randint(1, 4))
+        at.slider(key=episode_key(beh, "sev")).set_value(rng.randint(1, 4))
+    adl = rng.choice([c for c in at.checkbox if c.key and c.key.startswith("adl_")])
+    adl.set_value(not adl.value)
+    at.run()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Per-session memory over a simulated shift")
+    ap.add_argument("--hours", type=int, default=12)
+    ap.add_argument("--per-hour", type=int, default=30, help="interactions per hour")
+    ap.add_argument("--seed", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    print(f"{'hour':>4} {'keys':>5} {'ep keys':>7} {'cached':>6} {'state KB':>8} {'heap MB':>8}")
+    for hour in range(args.hours + 1):
+        if hour:
+            for _ in range(args.per_hour):
+                interact(at, rng)
+        assert not at.exception, at.exception
+        gc.collect()
+        state = _state(at)
+        ep_keys = sum(1 for k in state if k.startswith("ep_"))
+        cached = state["_sentence_cache"].stats()["size"] if "_sentence_cache" in state else 0
+        heap = tracemalloc.get_traced_memory()[0] / 1e6
+        print(f"{hour:>4} {len(state):>5} {ep_keys:>7} {cached:>6} {_state_bytes(state) / 1024:>8.1f} {heap:>8.1f}")
+    print(f"{args.hours * args.per_hour} interactions in {time.perf_counter() - t0:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_typeahead.py
+# Typeahead lookup latency on the shipped catalogue and on a synthetic one grown to thousands of
+# behaviours, replaying what a carer types one keystroke at a time; checks every hit against a linear
+# scan of the catalogue text.
+# Usage: python -m benchmarks.bench_typeahead [--behaviours 2000] [--queries 2000]
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from note_an_acc.catalogue import CATALOGUE_PATH, LIST_FIELDS, load_catalogue, parse_catalogue
+from note_an_acc.typeahead import TypeaheadIndex, words
+
+SYLLABLES = ("ag", "ba", "cal", "dis", "ex", "fid", "gro", "hol", "in", "ja", "ki", "lo", "mu", "ne", "or",
+             "pa", "qua", "re", "se", "ta", "un", "ve", "wa", "yel")
+
+
+def synthetic_catalogue(rng: random.Random, behaviours: int) -> dict:
+    """The shipped catalogue plus ``behaviours`` made-up behaviours with a handful of items per field."""
+    with open(CATALOGUE_PATH, encoding="utf-8") as fh:
+        raw = json.load(fh)
+
+    def phrase(n_words: int) -> str:
+        return " ".join("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(n_words)).capitalize()
+
+    for i in range(behaviours):
+        name = f"{phrase(2)} {i}"
+        raw["domains"].setdefault(f"Domain {i % 12}", {}).setdefault(f"Subdomain {i % 60}", []).append(name)
+        for f in LIST_FIELDS:
+            raw.setdefault(f, {})[name] = [phrase(rng.randint(1, 4)) for _ in range(rng.randint(2, 6))]
+    return raw
+
+def keystrokes(rng: random.Random, index: TypeaheadIndex, n: int) -> list:
+    """Queries as typed: growing prefixes of real labels, sometimes starting mid-label."""
+    out = []
+    while len(out) < n:
+        ws = words(rng.choice(index.hits).label)
+        text = " ".join(ws[rng.randrange(len(ws)):])
+        out += [text[:k] for k in range(1, min(len(text), 12) + 1)]
+    return out[:n]
+
+def check(index: TypeaheadIndex, query: str, limit: int) -> None:
+    qwords = words(query)
+    hits = index.search(query, limit)
+    for hit in hits:
+        text = " ".join(words(hit.label))
+        assert all(w in text for w in qwords), (query, hit)
+    starts = [i for i, h in enumerate(index.hits)
+              if all(any(t.startswith(w) for t in words(h.label)) for w in qwords)]
+    if starts:
+        assert len(hits) == min(limit, len(starts)), (query, len(hits), len(starts))
+
+def run(name: str, index: TypeaheadIndex, queries: list, limit: int) -> None:
+    runs = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, limit)
+        runs.append(time.perf_counter() - t0)
+    runs.sort()
+    p = lambda q: runs[min(len(runs) - 1, int(q * len(runs)))] * 1e6
+    print(f"{name:<10} {len(index):>7,} entries  p50 {p(0.5):6.1f} µs  p99 {p(0.99):6.1f} µs  "
+          f"max {runs[-1] * 1e6:7.1f} µs  mean {statistics.mean(runs) * 1e6:6.1f} µs")
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Catalogue typeahead benchmark")
+    ap.add_argument("--behaviours", type=int, default=2000, help="synthetic behaviours added to the catalogue")
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args()
+    rng = random.Random(5)
+
+    for name, catalogue in (("shipped", load_catalogue()),
+                            ("synthetic", parse_catalogue(synthetic_catalogue(rng, args.behaviours)))):
+        t0 = time.perf_counter()
+        index = TypeaheadIndex(catalogue)
+        built = time.perf_counter() - t0
+        queries = keystrokes(rng, index, args.queries)
+        for q in queries[:200]:
+            check(index, q, args.limit)
+        print(f"{name}: index built in {built * 1000:.0f} ms")
+        run(name, index, queries, args.limit)
+    print("hits match a linear scan of the catalogue text")
+
+
+if __name__ == "__main__":
+    main()
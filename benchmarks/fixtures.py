@@ -0,0 +1,62 @@
+# benchmarks/fixtures.py
+# Synthetic shift records drawn from the behaviour catalogue, shared by the benchmark scripts.
+
+import random
+from datetime import date, timedelta
+from typing import List, Optional
+
+from note_an_acc.catalogue import load_catalogue
+from note_an_acc.engine import Episode, ShiftRecord
+from note_an_acc.shifts import load_calendar
+
+ADLS = ["Toileting", "Oral Care", "Shower", "Skin Care", "Grooming hair", "Donning Glasses"]
+FREE_TEXT = [
+    "exit-seeking near the front door after lunch", "Responding to voices in the corridor",
+    "unsettled after family phone call", "calling out for her husband overnight",
+    "refused shower, accepted sponge later", "pacing the garden path", "noise from the renovation works",
+]
+
+
+def _some(rng: random.Random, items, k: int = 2) -> tuple:
+    return tuple(rng.sample(list(items), min(len(items), rng.randint(0, k))))
+
+def random_episode(rng: random.Random, shift_type: str = "Morning") -> Episode:
+    cat = load_catalogue()
+    entry = cat.behaviours[rng.choice(list(cat.behaviours))]
+    med_given = rng.random() < 0.1
+    return Episode(
+        behaviour=entry.name,
+        specifics=_some(rng, entry.details),
+        freq=rng.randint(1, 4), sev=rng.randint(1, 4), disrupt=rng.randint(0, 4),
+        time=rng.choice(load_calendar().slots(shift_type)),
+        trig_mod=_some(rng, entry.triggers_mod),
+        trig_nonmod=_some(rng, entry.triggers_nonmod, 1),
+        trig_free=rng.choice(FREE_TEXT) if rng.random() < 0.15 else "",
+        prevent=_some(rng, entry.prevent),
+        interventions=_some(rng, entry.intervent),
+        eff=rng.choice(["Good", "Limited", "No effect"]),
+        med_given=med_given,
+        med_eff=rng.choice(["Effective", "Partial", "No effect"]) if med_given else None,
+    )
+
+def random_record(rng: random.Random, resident_id: str = "R0001", shift_date: str = "2026-01-01",
+                  n_episodes: Optional[int] = None, shift_type: Optional[str] = None) -> ShiftRecord:
+    shift_type = shift_type or rng.choice(["Morning", "Afternoon"])
+    n = rng.randint(0, 6) if n_episodes is None else n_episodes
+    in_bed = rng.random() < 0.5
+    return ShiftRecord(
+        resident_id=resident_id, shift_date=shift_date, shift_type=shift_type,
+        adls_done=_some(rng, ADLS, 5),
+        behaviour_management_done=rng.random() < 0.3,
+        episodes=tuple(random_episode(rng, shift_type) for _ in range(n)),
+        settledness=rng.choice(["Settled", "Unsettled"]),
+        in_bed=in_bed, call_bell=in_bed, sensor_mats=int(in_bed),
+        ongoing=rng.choice(FREE_TEXT) if rng.random() < 0.1 else "",
+    )
+
+def facility_records(rng: random.Random, residents: int, days: int, start: str = "2026-01-01") -> List[ShiftRecord]:
+    first = date.fromisoformat(start)
+    return [
+        random_record(rng, f"R{r:04d}", (first + timedelta(days=d)).isoformat(), shift_type=s)
+        for d in range(days) for r in range(residents) for s in ("Morning", "Afternoon")
+    ]
@@ -0,0 +1,76 @@
+# benchmarks/load_service.py
+# Load test for the HTTP note service: starts it in-process at each worker count, drives it with
+# concurrent keep-alive clients for a fixed duration and reports requests/sec and latency percentiles.
+# Usage: python -m benchmarks.load_service [--workers 1 4 16] [--clients 16] [--seconds 10] [--records 1]
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from note_an_acc.service import NoteClient, NoteService
+
+from .fixtures import random_record
+
+
+def run(workers: int, clients: int, seconds: float, per_request: int) -> dict:
+    server = NoteService(("127.0.0.1", 0), workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    latencies = []
+    lock = threading.Lock()
+    # Warm the pool so process start-up is not counted
+    warm = NoteClient(url)
+    warm.render([random_record(random.Random(0))] * max(workers, 1) * 4)
+    warm.close()
+
+    barrier = threading.Barrier(clients)
+
+    def client(n: int) -> None:
+        rng = random.Random(n)
+        payloads = [[random_record(rng, f"R{n:03d}") for _ in range(per_request)] for _ in range(50)]
+        conn = NoteClient(url)
+        mine = []
+        barrier.wait()
+        end = time.perf_counter() + seconds
+        i = 0
+        while time.perf_counter() < end:
+            t0 = time.perf_counter()
+            results = conn.render(payloads[i % len(payloads)])
+            mine.append(time.perf_counter() - t0)
+            assert len(results) == per_request
+            i += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+    server.shutdown()
+    server.server_close()
+
+    q = statistics.quantiles(latencies, n=100)
+    return {"workers": workers, "requests": len(latencies), "rps": len(latencies) / wall,
+            "p50_ms": q[49] * 1000, "p95_ms": q[94] * 1000}
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="HTTP note service load test")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--records", type=int, default=1, help="shift records per request")
+    args = ap.parse_args()
+
+    print(f"{args.clients} clients, {args.records} record(s)/request, {args.seconds:.0f}s per run")
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for w in args.workers:
+        r = run(w, args.clients, args.seconds, args.records)
+        print(f"{r['workers']:>7} {r['requests']:>9,} {r['rps']:>8.0f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
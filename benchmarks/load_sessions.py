@@ -0,0 +1,273 @@
+# benchmarks/load_sessions.py
+# Concurrent session load test for the Streamlit app: replays carers' interaction scripts headlessly with
+# N simultaneous sessions and reports rerun latency percentiles plus CPU and RSS per session, for
+# capacity planning per server size and for catching regressions (--compare).
+#
+# Scripts are JSONL steps ({"session": ..., "at": seconds, "set": {widget key: value}}), either recorded
+# from real use (run the app with NOTE_AN_ACC_RECORD=sessions.jsonl) or generated here: pick a shift,
+# tick ADLs, pick behaviours, drag the freq/sev/disrupt sliders, fill triggers and save the note.
+#
+# Each session is its own process driving the app through streamlit.testing's AppTest (which swaps a
+# process-global runtime per run, so sessions can't share one). Sessions start together at a barrier;
+# --pace 1 keeps the recorded think time between steps, 0 replays back to back. Shifts are saved to a
+# scratch database unless NOTE_AN_ACC_DB is set.
+#
+# Usage: python -m benchmarks.load_sessions [--sessions 1 2 4] [--scripts sessions.jsonl] [--pace 0]
+#        python -m benchmarks.load_sessions --generate 20 --out-scripts sessions.jsonl
+#        python -m benchmarks.load_sessions --out load.json --compare baseline.json [--threshold 0.25]
+
+import os
+import tempfile
+
+# Set before the app's modules are imported, which is when they read it
+os.environ.setdefault("NOTE_AN_ACC_DB", os.path.join(tempfile.mkdtemp(), "load.db"))
+
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from note_an_acc.catalogue import load_catalogue
+from note_an_acc.recording import Step, _encode, load_scripts
+from note_an_acc.shifts import load_calendar
+from note_an_acc.utils import keyify
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "note_an-acc_app.py")
+WIDGETS = ("button", "checkbox", "date_input", "multiselect", "number_input", "radio", "selectbox", "slider",
+           "text_area", "text_input", "toggle")
+
+
+# =========================
+# Scripts
+# =========================
+def synthetic_script(rng: random.Random, session: str) -> List[Step]:
+    """One carer documenting one resident's shift, a widget change per step with 2–8 s think time."""
+    cat, calendar = load_catalogue(), load_calendar()
+    steps, t = [], 0.0
+
+    def step(key: str, value) -> None:
+        nonlocal t
+        t += rng.uniform(2, 8)
+        steps.append({"session": session, "at": round(t, 2), "set": {key: value}})
+
+    shift_type = rng.choice(calendar.names)
+    step("resident_id", f"L{session}")
+    step("ward", rng.choice("ABC"))
+    step("shift_type", shift_type)
+    defaults = cat.default_adls.get(shift_type, frozenset())
+    for opt in rng.sample(cat.adl_options, rng.randint(2, 5)):
+        step(f"adl_{keyify(opt)}", opt not in defaults)
+    step("intake", rng.choice(["½", "¾", "All"]))
+
+    domain = rng.choice(list(cat.domains))
+    subdomain = rng.choice(list(cat.domains[domain]))
+    step("domain", domain)
+    step("subdomain", subdomain)
+    options = cat.domains[domain][subdomain]
+    picked = []
+    for beh in rng.sample(options, rng.randint(1, min(3, len(options)))):
+        picked.append(beh)
+        step("behaviour_pick", list(picked))
+        entry = cat.behaviours[beh]
+        key = lambda field: f"ep_{keyify(beh)}_{field}"
+        if entry.details:
+            step(key("spec"), rng.sample(entry.details, rng.randint(1, min(2, len(entry.details)))))
+        for field, low in (("freq", 1), ("sev", 1), ("disr", 0)):
+            for v in range(low + 1, rng.randint(low, 4) + 1):  # a slider drag lands on each value in turn
+                step(key(field), v)
+        step(key("slot"), rng.choice(calendar.slots(shift_type)))
+        if entry.triggers_mod:
+            step(key("tmod"), rng.sample(entry.triggers_mod, 1))
+        if entry.intervent:
+            step(key("int"), rng.sample(entry.intervent, 1))
+    step("settledness", rng.choice(["Settled", "Unsettled"]))
+    step("save_shift", True)
+    return steps
+
+def write_scripts(path: str, scripts: Dict[str, List[Step]]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        for steps in scripts.values():
+            for s in steps:
+                fh.write(f'{{"session":{json.dumps(s["session"])},"at":{s["at"]},"set":{_encode(s["set"])}}}\n')
+
+# =========================
+# One session (runs in its own process)
+# =========================
+def _share_script_cache() -> None:
+    # AppTest compiles the script afresh on every run; the server compiles it once per process
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # not Linux: peak instead of current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def _cpu_s() -> float:
+    r = resource.getrusage(resource.RUSAGE_SELF)
+    return r.ru_utime + r.ru_stime
+
+def _widget(at, key: str):
+    for kind in WIDGETS:
+        try:
+            return getattr(at, kind)(key=key)
+        except KeyError:
+            continue
+    return None
+
+def apply_step(at, values: Dict[str, object], latencies: List[float]) -> None:
+    """
+    Set each changed widget and rerun, as the browser would. A key the app has already moved to the
+    recorded value is skipped; one whose widget isn't drawn (or doesn't accept the value) yet is
+    retried after the next rerun, and dropped if that doesn't help.
+    """
+    pending = dict(values)
+    while pending:
+        for key, value in list(pending.items()):
+            if key in at.session_state and at.session_state[key] == value:
+                del pending[key]
+                continue
+            w = _widget(at, key)
+            if w is None:
+                continue
+            try:
+                w.click() if type(w).__name__ == "Button" else w.set_value(value)
+            except (ValueError, TypeError, IndexError):
+                continue
+            del pending[key]
+            t0 = time.perf_counter()
+            at.run()
+            latencies.append(time.perf_counter() - t0)
+            break
+        else:
+            return
+
+def run_session(script: List[Step], pace: float, barrier, results) -> None:
+    from streamlit.testing.v1 import AppTest
+    _share_script_cache()
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()  # first load: imports and per-process resources, not counted
+    rss0, cpu0 = _rss_bytes(), _cpu_s()
+    latencies: List[float] = []
+    barrier.wait()
+    started = time.perf_counter()
+    for s in script:
+        if pace:
+            time.sleep(max(0.0, started + s["at"] * pace - time.perf_counter()))
+        apply_step(at, s["set"], latencies)
+        if at.exception:
+            break
+    results.put({
+        "latencies": latencies, "wall_s": time.perf_counter() - started, "cpu_s": _cpu_s() - cpu0,
+        "rss_base": rss0, "rss_growth": _rss_bytes() - rss0, "steps": len(script),
+        "error": at.exception[0].message if at.exception else "",
+    })
+
+# =========================
+# Load levels
+# =========================
+def run_level(n: int, scripts: List[List[Step]], pace: float) -> dict:
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    barrier, results = ctx.Barrier(n), ctx.Queue()
+    procs = [ctx.Process(target=run_session, args=(scripts[i % len(scripts)], pace, barrier, results))
+             for i in range(n)]
+    for p in procs:
+        p.start()
+    sessions = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    latencies = sorted(l for s in sessions for l in s["latencies"])
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    wall = max(s["wall_s"] for s in sessions)
+    mean = lambda k: statistics.mean(s[k] for s in sessions)
+    return {
+        "sessions": n, "reruns": len(latencies), "reruns_per_s": len(latencies) / wall,
+        "p50_ms": q[49] * 1000, "p95_ms": q[94] * 1000, "p99_ms": q[98] * 1000,
+        "cpu_s_per_session": mean("cpu_s"), "cpu_share": statistics.mean(s["cpu_s"] / s["wall_s"] for s in sessions),
+        "rss_base_mb": mean("rss_base") / 2 ** 20, "rss_growth_mb": mean("rss_growth") / 2 ** 20,
+        "errors": [s["error"] for s in sessions if s["error"]],
+    }
+
+def compare(levels: List[dict], baseline: dict, threshold: float) -> List[int]:
+    """Session counts whose p95 got slower than ``baseline`` by more than ``threshold``."""
+    base = {l["sessions"]: l for l in baseline["levels"]}
+    slower = []
+    for l in levels:
+        b = base.get(l["sessions"])
+        if not b:
+            continue
+        ratio = l["p95_ms"] / b["p95_ms"]
+        flag = "  SLOWER" if ratio > 1 + threshold else ""
+        print(f"  {l['sessions']:>3} session(s): p95 {b['p95_ms']:.0f} -> {l['p95_ms']:.0f} ms  x{ratio:.2f}{flag}")
+        if flag:
+            slower.append(l["sessions"])
+    return slower
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Concurrent Streamlit session load test")
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--scripts", help="recorded JSONL scripts (default: generate one per session)")
+    ap.add_argument("--pace", type=float, default=0.0, help="think-time multiplier (1 = as recorded)")
+    ap.add_argument("--seed", type=int, default=25)
+    ap.add_argument("--generate", type=int, help="write this many generated scripts to --out-scripts and exit")
+    ap.add_argument("--out-scripts", default="sessions.jsonl")
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--compare", help="previous results file to compare p95 against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed p95 slowdown before flagging")
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.generate:
+        write_scripts(args.out_scripts, {f"{i:04d}": synthetic_script(rng, f"{i:04d}") for i in range(args.generate)})
+        print(f"wrote {args.generate} script(s) to {args.out_scripts}")
+        return
+    if args.scripts:
+        scripts = [s for s in load_scripts(args.scripts).values() if s]
+    else:
+        scripts = [synthetic_script(rng, f"{i:04d}") for i in range(max(args.sessions))]
+    steps = statistics.mean(len(s) for s in scripts)
+    print(f"{len(scripts)} script(s), {steps:.0f} steps each on average, pace {args.pace:g}, "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"{'sessions':>8} {'reruns':>7} {'rr/s':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'CPU s/sess':>10} {'CPU %':>6} {'RSS MB':>7} {'+MB/sess':>8}")
+    levels = []
+    for n in args.sessions:
+        r = run_level(n, scripts, args.pace)
+        levels.append(r)
+        print(f"{n:>8} {r['reruns']:>7} {r['reruns_per_s']:>6.1f} {r['p50_ms']:>7.0f} {r['p95_ms']:>7.0f} "
+              f"{r['p99_ms']:>7.0f} {r['cpu_s_per_session']:>10.2f} {r['cpu_share']:>6.0%} "
+              f"{r['rss_base_mb']:>7.0f} {r['rss_growth_mb']:>8.1f}")
+        for e in r["errors"]:
+            print(f"    session error: {e}")
+
+    if args.out:
+        meta = {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                "platform": platform.platform(), "cpus": os.cpu_count(), "pace": args.pace,
+                "scripts": args.scripts or f"generated (seed {args.seed})"}
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta, "levels": levels}, fh, indent=2)
+        print(f"wrote {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        print(f"compared with {args.compare}:")
+        slower = compare(levels, baseline, args.threshold)
+        if slower:
+            print(f"p95 rerun latency regressed by more than {args.threshold:.0%} at {slower} session(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
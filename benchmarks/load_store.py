@@ -0,0 +1,71 @@
+# benchmarks/load_store.py
+# Simulates a handover burst: N carers submit end-of-shift records at once; reports commit latency.
+# Usage: python -m benchmarks.load_store [--carers 40] [--rounds 5] [--batch 1] [--mode queued|direct]
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from note_an_acc.engine import build_note
+from note_an_acc.storage import ShiftStore
+
+from .fixtures import random_record
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Concurrent end-of-shift submission load test")
+    ap.add_argument("--carers", type=int, default=40)
+    ap.add_argument("--rounds", type=int, default=5, help="submissions per carer")
+    ap.add_argument("--batch", type=int, default=1, help="shift records per transaction")
+    ap.add_argument("--mode", choices=["queued", "direct"], default="queued",
+                    help="queued: group-commit writer (ShiftStore.submit); direct: one transaction per carer")
+    ap.add_argument("--db", default=None, help="database path (default: temporary file)")
+    args = ap.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "load.db")
+    store = ShiftStore(path)
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.carers)
+
+    def carer(n: int) -> None:
+        rng = random.Random(n)
+        batches = []
+        for r in range(args.rounds):
+            recs = [random_record(rng, f"R{n:03d}-{b}", f"2026-01-{r + 1:02d}") for b in range(args.batch)]
+            batches.append((recs, [build_note(x) for x in recs]))
+        barrier.wait()
+        for recs, notes in batches:
+            t0 = time.perf_counter()
+            if args.mode == "direct":
+                store.save_shifts(recs, notes, ward="A")
+            else:
+                for fut in [store.submit(x, note, ward="A") for x, note in zip(recs, notes)]:
+                    fut.result()
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+        store.close()
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=carer, args=(n,)) for n in range(args.carers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    print(f"database:     {path}")
+    print(f"mode:         {args.mode}")
+    print(f"submissions:  {len(latencies)} ({args.carers} carers x {args.rounds}, {args.batch} record(s) each)")
+    print(f"wall time:    {wall:.2f}s")
+    print(f"commit p50:   {q[49] * 1000:.1f} ms")
+    print(f"commit p95:   {q[94] * 1000:.1f} ms")
+    print(f"commit max:   {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
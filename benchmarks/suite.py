@@ -0,0 +1,226 @@
+# benchmarks/suite.py
+# Reproducible benchmark suite for the note pipeline and app reruns. Micro-benchmarks use timeit (best
+# of --repeat runs); reruns drive the app headlessly through streamlit.testing's AppTest, timing each
+# interaction both as a full-script rerun and as the fragment rerun the browser actually requests.
+# Results are written as JSON; --compare flags anything slower than a previous results file.
+#
+# Usage: python -m benchmarks.suite [--out results.json] [--compare baseline.json] [--threshold 0.15]
+#        [--only micro|notes|reruns] [--repeat 5]
+
+import os
+import tempfile
+
+# The rerun group drives the real app, which saves drafts: keep them out of the live database
+os.environ.setdefault("NOTE_AN_ACC_DB", os.path.join(tempfile.mkdtemp(), "suite.db"))
+
+import argparse
+import functools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from note_an_acc.engine import SentenceCache, build_note, include_episode
+from note_an_acc.catalogue import load_catalogue
+from note_an_acc.shifts import SHIFTS_PATH, load_calendar, parse_calendar
+from note_an_acc.typeahead import TypeaheadIndex
+from note_an_acc.utils import keyify, oxford_join
+
+from .fixtures import random_record
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "note_an-acc_app.py")
+GROUPS = ("micro", "notes", "reruns")
+
+
+def _time(fn: Callable[[], object], repeat: int, number: Optional[int] = None) -> Dict[str, float]:
+    """Per-call seconds: best and median of ``repeat`` timeit runs, auto-sizing ``number`` to ~0.2 s."""
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best_s": min(runs), "median_s": statistics.median(runs), "calls": number}
+
+# =========================
+# Benchmarks
+# =========================
+def bench_micro(repeat: int) -> Dict[str, dict]:
+    items = ["Family", "Friends", "NDIS Companion", "Hair-Dresser"]
+    scores = [(f, s, d) for f in range(1, 5) for s in range(1, 5) for d in range(0, 5)]
+    calendar = load_calendar()
+    with open(SHIFTS_PATH, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    typeahead = TypeaheadIndex(load_catalogue())
+    return {
+        "calendar/parse": _time(lambda: parse_calendar(raw), repeat),
+        "calendar/slot_index": _time(lambda: calendar.slot_index("Night", "02:30"), repeat),
+        "typeahead/prefix": _time(lambda: typeahead.search("exit seek"), repeat),
+        "typeahead/substring": _time(lambda: typeahead.search("xit"), repeat),
+        "oxford_join/4": _time(lambda: oxford_join(items), repeat),
+        "keyify": _time(lambda: keyify("Dressing Upper and Lower Garments"), repeat),
+        # All 80 score combinations per call
+        "include_episode/80": _time(lambda: [include_episode(f, s, d) for f, s, d in scores], repeat),
+    }
+
+def bench_notes(repeat: int) -> Dict[str, dict]:
+    out = {}
+    for n in (0, 5, 20, 50):
+        record = random_record(random.Random(n), n_episodes=n, shift_type="Morning")
+        out[f"build_note/{n}"] = _time(lambda: build_note(record), repeat)
+        cache = SentenceCache()
+        build_note(record, cache)
+        out[f"build_note_cached/{n}"] = _time(lambda: build_note(record, cache), repeat)
+    return out
+
+def _fragment_ids(at, name: str) -> List[str]:
+    """Ids of the fragments registered by the last run whose function is ``name``."""
+    ids = []
+    for fid, wrapped in at._fragment_storage._fragments.items():
+        inner = [c.cell_contents for c in wrapped.__closure__ or () if callable(c.cell_contents)]
+        if any(getattr(fn, "__name__", "") == name for fn in inner):
+            ids.append(fid)
+    return ids
+
+def _run_fragment(at, fragment_id: str) -> None:
+    """
+    Rerun one fragment, as the browser requests after a widget inside it changes. AppTest itself only
+    does full runs, so the rerun request it builds gets the fragment queued.
+    """
+    from streamlit.testing.v1 import local_script_runner
+
+    rerun_data = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(rerun_data, fragment_id_queue=[fragment_id])
+    try:
+        at.run()
+    finally:
+        local_script_runner.RerunData = rerun_data
+
+def bench_reruns(repeat: int, samples: int = 10) -> Dict[str, dict]:
+    from streamlit.testing.v1 import AppTest  # only needed for this group
+
+    from note_an_acc.ui import episode_key
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    beh = at.multiselect(key="behaviour_pick").options[0]
+
+    def timed(action: Callable[[], object]) -> Dict[str, float]:
+        runs = []
+        for _ in range(repeat):
+            batch = []
+            for _ in range(samples):
+                t0 = time.perf_counter()
+                action()
+                batch.append(time.perf_counter() - t0)
+            runs.append(statistics.median(batch))
+        assert not at.exception, at.exception
+        return {"best_s": min(runs), "median_s": statistics.median(runs), "calls": samples}
+
+    def toggle_adl(rerun: Callable[[], object]) -> Callable[[], object]:
+        def action():
+            box = at.checkbox(key="adl_toileting")
+            box.set_value(not box.value)
+            rerun()
+        return action
+
+    def drag_severity(rerun: Callable[[], object]) -> Callable[[], object]:
+        def action():
+            at.slider(key=episode_key(beh, "sev")).set_value(next(sev) % 4 + 1)
+            rerun()
+        return action
+
+    # Each interaction as a full-script rerun (how the page ran before the fragments) and as a
+    # rerun of the fragment holding the widget; the full run between them restores the element tree
+    sev = iter(range(10 ** 9))
+    results = {"rerun/first_load": {"best_s": first, "median_s": first, "calls": 1}}
+    results["rerun/idle"] = timed(lambda: at.run())
+    results["rerun/toggle_adl"] = timed(toggle_adl(at.run))
+    adl_block = _fragment_ids(at, "adl_block")[-1]
+    results["rerun/toggle_adl_fragment"] = timed(toggle_adl(lambda: _run_fragment(at, adl_block)))
+    at.run()
+    at.multiselect(key="behaviour_pick").select(beh).run()
+    results["rerun/severity_slider"] = timed(drag_severity(at.run))
+    card = _fragment_ids(at, "episode_card")[-1]
+    results["rerun/severity_slider_fragment"] = timed(drag_severity(lambda: _run_fragment(at, card)))
+    at.run()
+    results["rerun/pick_behaviour"] = timed(
+        lambda: at.multiselect(key="behaviour_pick").set_value([] if at.multiselect(key="behaviour_pick").value
+                                                               else [beh]).run())
+    return results
+
+# =========================
+# Results
+# =========================
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def run_suite(groups: List[str], repeat: int) -> dict:
+    benches = {"micro": bench_micro, "notes": bench_notes, "reruns": bench_reruns}
+    results = {}
+    for g in groups:
+        results.update(benches[g](repeat))
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Names of benchmarks whose median got slower than ``baseline`` by more than ``threshold``."""
+    slower = []
+    for name, r in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["median_s"]:
+            continue
+        ratio = r["median_s"] / base["median_s"]
+        flag = "  SLOWER" if ratio > 1 + threshold else ""
+        print(f"  {name:<32} {base['median_s'] * 1e6:>12.2f} -> {r['median_s'] * 1e6:>12.2f} µs  x{ratio:.2f}{flag}")
+        if flag:
+            slower.append(name)
+    return slower
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Note pipeline and rerun benchmark suite")
+    ap.add_argument("--out", default="benchmark_results.json")
+    ap.add_argument("--compare", help="previous results file to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    ap.add_argument("--only", choices=GROUPS, action="append", help="run only these groups (repeatable)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    current = run_suite(args.only or list(GROUPS), args.repeat)
+    for name, r in current["results"].items():
+        print(f"{name:<32} median {r['median_s'] * 1e6:>12.2f} µs   best {r['best_s'] * 1e6:>12.2f} µs")
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(current, fh, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        print(f"compared with {args.compare} ({baseline['meta'].get('commit') or 'unknown commit'}):")
+        slower = compare(current, baseline, args.threshold)
+        if slower:
+            print(f"{len(slower)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,93 +3,31 @@
 # UK English, Australian Standards
 
 import streamlit as st
-from datetime import datetime, time, timedelta
-from typing import Dict, List, Tuple
+from datetime import date
+from time import perf_counter
+from typing import Tuple
+
+from note_an_acc.engine import (
+    EFFECT_SCALE, MED_EFFECT, Episode, ShiftRecord, build_note, included_episodes,
+)
+from note_an_acc.escalation import record_alerts
+from note_an_acc.ui import (
+    apply_typeahead_hit, autosave_draft, current_facility, discard_draft, facilities, episode_key, finish_rerun,
+    get_calendar, get_catalogue, get_effectiveness, get_escalations, get_heatmaps, get_sentence_cache, get_store,
+    get_typeahead, profile_panel, profile_section, profiled, prune_episode_state, record_interaction, restore_draft,
+    start_rerun,
+)
+from note_an_acc.utils import keyify
 
 st.set_page_config(page_title="Behaviour Inventory – Shift Note Builder", layout="wide")
 
-# =========================
-# Utility helpers
-# =========================
-def slots_30m(start: time, end: time) -> List[str]:
-    out = []
-    dt = datetime.combine(datetime.today(), start)
-    end_dt = datetime.combine(datetime.today(), end)
-    while dt <= end_dt:
-        out.append(dt.strftime("%H:%M"))
-        dt += timedelta(minutes=30)
-    return out
-
-def oxford_join(items: List[str]) -> str:
-    items = [i for i in items if i and str(i).strip()]
-    if not items: return ""
-    if len(items) == 1: return items[0]
-    return ", ".join(items[:-1]) + f" and {items[-1]}"
-
-def keyify(s: str) -> str:
-    return s.lower().replace(" ", "_").replace("/", "_").replace("-", "_").replace("&", "and")
-
 # =========================
 # Constants 
 # =========================
 
-SHIFT_SCHEDULE = {
-    "Morning": [
-        "0600–0730 ADLs upon rising",
-        "0730–0900 Breakfast",
-        "0900–1130 Lifestyle / activity engagement",
-        "1000–1030 Morning tea",
-        "1200–1300 Lunch",
-        "1300–1330 Activity engagement / Toileting / Transfers / Appointments",
-        "1330–1400 End of shift / ATOR",
-        "Variable: Visitors, behaviour management",
-    ],
-    "Afternoon": [
-        "1400–1500 Afternoon tea",
-        "1500–1700 Lifestyle / activity engagement",
-        "1500–1600 Toileting / Shower / Change of clothes (if applicable)",
-        "1700–1800 Dinner",
-        "1800–1930 ADLs",
-        "1930–2100 End of shift / ATOR",
-        "Variable: Visitors, behaviour management",
-    ],
-}
-
-MORNING_SLOTS = slots_30m(time(6, 0), time(14, 0))
-AFTERNOON_SLOTS = slots_30m(time(14, 0), time(21, 0))
-
-ADL_OPTIONS = [
-    "Toileting",
-    "Change of incontinence aid",
-    "Shower",
-    "Sponge",
-    "Dressing Upper and Lower Garments",
-    "Dressing Upper Garments",
-    "Dressing Lower Garments",
-    "Skin Care",
-    "Oral Care",
-    "Shaving",
-    "Donning Hearing Aids",
-    "Donning Glasses",
-    "Grooming hair",
-    "Groomed nails",
-]
-
-DEFAULT_ADLS = {
-    "Morning": {
-        "Toileting", "Oral Care", "Donning Glasses", "Donning Hearing Aids",
-        "Dressing Upper and Lower Garments", "Skin Care", "Grooming hair"
-    },
-    "Afternoon": {
-        "Toileting", "Change of incontinence aid", "Shower",
-        "Skin Care", "Grooming hair"
-    },
-}
-
-VISITOR_TYPES = [
-    "Family", "Friends", "Regis Companion", "NDIS Companion",
-    "External carer", "Hair-Dresser", "Beautician"
-]
+# ---- Shifts, their charting slots and schedule guides (note_an_acc/data/shifts.json, or
+# NOTE_AN_ACC_SHIFTS). Parsed once per server process.
+CALENDAR = get_calendar()
 
 FOOD_FLUID_LEVELS = ["None", "1/8", "¼", "1/3", "½", "¾", "All"]
 MEAL_ASSIST = ["Set-up", "Cut-up", "Minimal", "Moderate", "Full"]
@@ -101,557 +39,348 @@ RECEPTIVENESS = ["Not receptive", "Receptive to assistance"]
 ASSIST_LEVEL = ["1x", "2x", "3x"]
 ADL_TIME = ["Minimal", "Moderate", "Extensive"]
 SETTLEDNESS = ["Settled", "Unsettled"]
-EFFECT_SCALE = ["Good", "Limited", "No effect"]
-MED_EFFECT = ["Effective", "Partial", "No effect"]
-
-# ---- Behaviour structure: Domains → Subdomains → Behaviours
-DOMAINS: Dict[str, Dict[str, List[str]]] = {
-    "Agitation": {
-        "Physical": [
-            "Physically aggressive", "Disinhibition", "Care resistance"
-        ],
-        "Verbal": [
-            "Abusive language", "Verbally disruptive"
-        ],
-        "Emotional Dependence": [
-            "Passive resistance", "Attention seeking", "Manipulative",
-            "Withdrawal & apathy", "Depression", "Anxiety", "Irritable"
-        ],
-    },
-    "Wandering": {
-        "Locomotion": [
-            "Problem wandering", "Intrusive behaviour"
-        ]
-    },
-    "Other": {
-        "Risk/Pattern/Perception": [
-            "High-risk behaviour", "Aberrant motor behaviour",
-            "Sleep & night-time behaviour", "Appetite & eating changes",
-            "Hallucinations", "Delusions"
-        ]
-    }
-}
-
-# ---- Behaviour Inventory detail lists (examples condensed for UI clarity; extend as needed)
-INVENTORY_DETAILS: Dict[str, List[str]] = {
-    # Agitation / Physical
-    "Physically aggressive": [
-        "Upset when approached", "Attempted to hurt others",
-        "Violence toward staff", "Violence toward co-resident",
-        "Damaged property", "Uncooperative with help",
-        "Physically resisted care", "Demanded own way"
-    ],
-    "Disinhibition": [
-        "Inappropriate touching", "Public displays", "Public indecency",
-        "Insensitive remarks", "Overly personal disclosures"
-    ],
-    "Care resistance": [
-        "Refusal of care", "Non-compliance with hygiene",
-        "Non-compliance with medication", "Non-compliance with activity"
-    ],
-
-    # Agitation / Verbal
-    "Abusive language": [
-        "Swearing", "Shouting", "Racial or sexual slurs", "Verbal threats"
-    ],
-    "Verbally disruptive": [
-        "Repetitive calling out", "Excessive vocalisation", "Demanding behaviour"
-    ],
-
-    # Agitation / Emotional Dependence
-    "Passive resistance": [
-        "Hesitant with care", "Reluctant to participate"
-    ],
-    "Attention seeking": [
-        "Seeking constant reassurance", "Feigning illness",
-        "Exaggerating symptoms"
-    ],
-    "Manipulative": [
-        "Emotional pressure", "Guilt-inducing statements"
-    ],
-    "Withdrawal & apathy": [
-        "Reduced engagement", "Flat affect", "Lack of motivation",
-        "Less spontaneous", "Less enthusiastic"
-    ],
-    "Depression": [
-        "Tearfulness", "Sleep cycle affected", "Socially withdrawn",
-        "Slow but coherent speech", "Negative self-image",
-        "Feelings of guilt", "Expressions of wanting to die"
-    ],
-    "Anxiety": [
-        "Catastrophising statements", "Preoccupied thought content",
-        "Restlessness", "Pacing", "Hypervigilance",
-        "Irrational fears", "Frequent questioning",
-        "Excessive worry about future", "Tension / unable to relax",
-        "Gasping/sighing due to nerves", "Racing heart (not medically explained)",
-        "Avoidance of places/situations", "Upset when separated from trusted others"
-    ],
-    "Irritable": [
-        "Easily irritated", "Impatient with delays", "Argued",
-        "Difficult to get along with", "Snapped at others"
-    ],
-
-    # Wandering
-    "Intrusive behaviour": [
-        "Interfering with others", "Entering others’ rooms",
-        "Touching others’ belongings"
-    ],
-    "Problem wandering": [
-        "Constant movement", "Exit-seeking", "Movement into unsafe areas"
-    ],
-
-    # Other
-    "High-risk behaviour": [
-        "Walking without required aids", "Climbed from chair/bed",
-        "Simulated falls", "Unsafe actions", "Exit-seeking"
-    ],
-    "Aberrant motor behaviour": [
-        "Repetitive pacing/organising/rearranging/cleaning",
-        "Rocking/tapping", "Itching/picking", "Excessive fidgeting"
-    ],
-    "Hallucinations": [
-        "Responding to voices", "Talking to unseen people",
-        "Acting as if seeing figures", "Smelling things others cannot",
-        "Tactile sensations not present", "Tasting things not present"
-    ],
-    "Delusions": [
-        "False skin sensations", "Interacted with voices",
-        "Saw figures not present", "False smells/tastes"
-    ],
-    "Sleep & night-time behaviour": [
-        "Night wandering", "Difficulty sleeping",
-        "Packing/planning to leave at night"
-    ],
-    "Appetite & eating changes": [
-        "Pooling food in mouth", "Poor appetite", "Unusually good appetite",
-        "Change in preferred foods", "Playing with/destroying meal"
-    ],
-}
-
-# ---- Triggers (modifiable / non-modifiable) and Management (prevention / intervention)
-TRIGGERS_MOD: Dict[str, List[str]] = {
-    "Physically aggressive": [
-        "Environmental overstimulation", "Unmet needs (pain/hunger/toilet)",
-        "Personal space issues on approach", "Poor communication", "Frustration/confusion"
-    ],
-    "Disinhibition": [
-        "Environmental factors", "Lack of privacy", "Boredom",
-        "Misread social cues", "Medication side effects"
-    ],
-    "Abusive language": [
-        "Frustration", "Communication barriers", "Pain",
-        "Sensory overload", "Environmental stressors"
-    ],
-    "Verbally disruptive": [
-        "Anxiety", "Loneliness", "Boredom", "Environmental/routine changes"
-    ],
-    "Passive resistance": [
-        "Lack of trust", "Poor communication", "Staff inconsistency",
-        "Fear of losing autonomy"
-    ],
-    "Attention seeking": ["Unmet emotional needs", "Loneliness", "Boredom"],
-    "Manipulative": ["Staff inconsistency", "Lack of boundaries", "Unmet emotional needs"],
-    "Withdrawal & apathy": [
-        "Pain", "Under-stimulation", "Poor lighting/noise", "Co-occurring depression"
-    ],
-    "Depression": [
-        "Change in routine/environment", "Social isolation", "Grief", "Comfort needs"
-    ],
-    "Anxiety": [
-        "Uncertainty", "Change in routine/environment", "Lack of reassurance",
-        "Physical discomfort", "Hearing/vision impairment", "Recent event"
-    ],
-    "Irritable": [
-        "Pain", "Discomfort", "Fatigue", "Hunger", "Toileting needs",
-        "Overstimulation"
-    ],
-    "Intrusive behaviour": [
-        "Confusing layout", "Boredom",
-        "Insufficient supervision/meaningful activity"
-    ],
-    "Problem wandering": [
-        "Restlessness", "Unmet physical needs",
-        "Searching for comfort (familiar person/place)", "Change in routine/environment"
-    ],
-    "High-risk behaviour": [
-        "Frustration/confusion", "Unmet needs", "Environmental obstacles"
-    ],
-    "Aberrant motor behaviour": [
-        "Boredom", "Anxiety", "Medication side effects"
-    ],
-}
-
-TRIGGERS_NONMOD: Dict[str, List[str]] = {
-    "Physically aggressive": ["Cognitive impairment", "Dementia progression", "Neurological condition", "Personality"],
-    "Disinhibition": ["Frontal lobe changes", "Frontotemporal dementia", "Historical hypersexuality"],
-    "Abusive language": ["Cognitive decline", "Personality", "Cultural background", "Psychiatric illness"],
-    "Verbally disruptive": ["Cognitive decline", "Hearing impairment", "Psychiatric disorders"],
-    "Passive resistance": ["Cognitive impairment", "Trauma history", "Personality style"],
-    "Attention seeking": ["Personality traits", "Lifelong coping mechanisms"],
-    "Manipulative": ["Personality disorder traits", "Past relational patterns"],
-    "Withdrawal & apathy": ["Cognitive impairment", "Chronic illness", "Existing psychiatric illness"],
-    "Depression": ["Genetic predisposition", "Chronic illness", "Cognitive decline"],
-    "Anxiety": ["Personality", "Dementia subtype", "Cognitive decline"],
-    "Irritable": ["Cognitive decline", "Severe memory loss", "Personality traits", "Chronic conditions"],
-    "Intrusive behaviour": ["Cognitive impairment", "Disorientation", "Frontal lobe changes", "Personality"],
-    "Problem wandering": ["Cognitive impairment", "Sundowning", "Neurological damage"],
-    "High-risk behaviour": ["Cognitive impairment", "Physical disability", "Psychiatric illness"],
-    "Aberrant motor behaviour": ["Cognitive/neurological/psychiatric illness"],
-}
-
-MANAGEMENT_PREVENT: Dict[str, List[str]] = {
-    "Physically aggressive": [
-        "Maintain calm environment", "Consistent routine",
-        "Person-centred care and validation techniques"
-    ],
-    "Disinhibition": [
-        "Maintain dignity and privacy", "Clear communication", "Structured routine",
-        "Gender-appropriate staff", "Orient to place and person"
-    ],
-    "Abusive language": [
-        "Therapeutic communication", "Validate emotions", "Calm reassurance",
-        "Maintain calm environment"
-    ],
-    "Verbally disruptive": [
-        "Meaningful engagement", "Maintain routine",
-        "Comfort items", "1:1 or group companionship"
-    ],
-    "Passive resistance": [
-        "Empowerment and choice", "Explain each action", "Build rapport"
-    ],
-    "Attention seeking": [
-        "Positive interactions", "Scheduled re-approaches",
-        "Encourage group participation", "Encourage independence"
-    ],
-    "Manipulative": [
-        "Set firm but kind limits", "Consistent team approach", "Focus on quality care"
-    ],
-    "Withdrawal & apathy": [
-        "Encourage social interaction", "Structured activities",
-        "Promote autonomy", "Check unmet ADL needs"
-    ],
-    "Depression": [
-        "Foster social connection", "Positive communication",
-        "Daylight exposure", "Familiar environment"
-    ],
-    "Anxiety": [
-        "Consistent routine/environment", "Calm tone", "Avoid rushing"
-    ],
-    "Irritable": [
-        "Monitor comfort needs", "Ensure rest periods", "Calm surroundings"
-    ],
-    "Intrusive behaviour": [
-        "Structured activity", "Secure environment",
-        "Signage/barriers", "Reality orientation"
-    ],
-    "Problem wandering": [
-        "Secure exits", "Notify nearby staff",
-        "Offer hydration/food/toileting", "Routine and exercise"
-    ],
-    "High-risk behaviour": [
-        "Maintain safe environment", "Provide supervision",
-        "Ensure aids within reach", "Educate"
-    ],
-    "Aberrant motor behaviour": [
-        "Sensory stimulation", "Maintain structure", "Allow safe expression"
-    ],
-    "Sleep & night-time behaviour": [
-        "Dim lights", "Comfort drink/snack", "Ensure toileting",
-        "Comfortable temperature", "Calming music", "Orienting activities"
-    ],
-}
-
-MANAGEMENT_INTERVENT: Dict[str, List[str]] = {
-    "Physically aggressive": [
-        "De-escalation strategies", "Ensure safety",
-        "Redirect behaviour", "Diversional activity", "RN review"
-    ],
-    "Disinhibition": [
-        "Calm redirection", "Clear boundaries", "Neutral body language",
-        "Document behaviour", "Inform RN"
-    ],
-    "Abusive language": [
-        "Avoid confrontation", "Redirect conversation",
-        "Acknowledge feelings", "Short clear sentences",
-        "Relaxed posture", "RN review"
-    ],
-    "Verbally disruptive": [
-        "Acknowledge feelings", "Redirect", "Reality orientation (visual cues)",
-        "Involve family", "Inform RN"
-    ],
-    "Passive resistance": [
-        "Gentle encouragement", "Offer choices", "Familiar carer", "RN review"
-    ],
-    "Attention seeking": [
-        "Redirect to activities", "Reinforce independence",
-        "Duty of care for all residents", "RN review"
-    ],
-    "Manipulative": [
-        "Avoid power struggles", "Team debriefing",
-        "Refocus to goals/routine", "RN review"
-    ],
-    "Withdrawal & apathy": [
-        "Positive reinforcement", "Small achievable tasks", "RN review"
-    ],
-    "Depression": [
-        "Emotional support", "Involve Psychologist/GP",
-        "Monitor suicidality", "Review meds and adherence", "RN review"
-    ],
-    "Anxiety": [
-        "Provide reassurance", "Relaxation strategies",
-        "RNOD call if needed", "Consider GP review", "Inform RN"
-    ],
-    "Irritable": [
-        "Validate feelings", "Short simple statements",
-        "Redirect to calming activity", "Move to calm area",
-        "Ensure comfort needs met", "RN review"
-    ],
-    "Intrusive behaviour": [
-        "Gentle redirection", "Meaningful activity",
-        "Reassure and validate", "Separate triggering co-residents", "Inform RN"
-    ],
-    "Problem wandering": [
-        "Regular support/supervision", "Purposeful task", "RN involved"
-    ],
-    "High-risk behaviour": [
-        "Prompt response to unsafe acts", "Falls prevention plan",
-        "MDT involvement", "Redirect to calming activity",
-        "Ensure safety", "Monitor distress severity", "RN review"
-    ],
-    "Aberrant motor behaviour": [
-        "Redirect to calming activities", "Ensure safety",
-        "Minimise distress/harm", "RN review"
-    ],
-    "Sleep & night-time behaviour": [
-        "Redirect to bed", "Dim lights", "Warm drink/snack",
-        "Ensure toileting", "Comfortable temperature",
-        "Calming music", "RN review"
-    ],
-}
+
+# Form fields kept in the tab's autosaved draft, plus the ADL checkboxes and episode widgets by prefix
+DRAFT_FIELDS = frozenset({
+    "facility", "resident_id", "ward", "shift_date", "shift_type", "behaviour_management_done", "receptiveness",
+    "pa_assist", "adl_time", "intake", "meal_assist", "engagement_level", "engagement_behaviour_desc",
+    "had_visitors", "visitor_types", "visitor_times", "domain", "subdomain", "behaviour_pick",
+    "settledness", "in_bed", "call_bell", "sensor_mats", "crash_mats", "ongoing",
+})
+DRAFT_PREFIXES = ("adl_", "ep_")
+# What NOTE_AN_ACC_RECORD logs for load-test replay: the draft fields plus search and Save
+RECORD_FIELDS = DRAFT_FIELDS | {"catalogue_query", "save_shift"}
+
+# =========================
+# Shared state → shift record
+# =========================
+# Widgets below write into st.session_state; the ADL, visitor and episode blocks
+# are fragments, so a change inside one reruns only that block plus the note preview.
+_run_started = perf_counter()
+start_rerun()  # NOTE_AN_ACC_PROFILE=1 times each section below; otherwise a no-op
+if restore_draft(DRAFT_FIELDS, DRAFT_PREFIXES):
+    st.toast("Restored your unsaved shift draft.")
+
+# ---- Behaviour catalogue (note_an_acc/data/catalogue.json): Domains → Subdomains → Behaviours,
+# with details, triggers and management per behaviour, plus ADL options, per-shift ADL defaults and
+# visitor types. The shared base is parsed once per server process; each facility's overlay is
+# resolved once on top of it, so switching facility is a cache lookup.
+FACILITY = current_facility()
+CATALOGUE = get_catalogue(FACILITY)
+DOMAINS = CATALOGUE.domains
+_full_run = True  # cleared once the page-level preview is drawn; fragment reruns see it False
+
+def shift_slots(shift_type: str) -> Tuple[str, ...]:
+    return CALENDAR.slots(shift_type)
+
+def episode_from_state(beh: str, slots: Tuple[str, ...]) -> Episode:
+    ss = st.session_state
+
+    def get(field, default=None):
+        return ss.get(episode_key(beh, field), default)
+
+    med_given = get("med", False)
+    return Episode(
+        behaviour=beh,
+        specifics=tuple(get("spec", ())),
+        freq=get("freq", 1),
+        sev=get("sev", 1),
+        disrupt=get("disr", 0),
+        time=get("slot", slots[0]),
+        trig_mod=tuple(get("tmod", ())),
+        trig_nonmod=tuple(get("tnon", ())),
+        trig_free=get("tfree", "").strip(),
+        prevent=tuple(get("prev", ())),
+        interventions=tuple(get("int", ())),
+        eff=get("eff", EFFECT_SCALE[0]),
+        med_given=med_given,
+        med_eff=get("me", MED_EFFECT[0]) if med_given else None,
+    )
+
+def record_from_state() -> ShiftRecord:
+    ss = st.session_state
+    shift_type = ss.get("shift_type", CALENDAR.default)
+    slots = shift_slots(shift_type)
+    had_visitors = ss.get("had_visitors", "No") == "Yes"
+    in_bed = ss.get("in_bed", False)
+    return ShiftRecord(
+        resident_id=ss.get("resident_id", "").strip(),
+        shift_date=ss.get("shift_date", date.today()).isoformat(),
+        shift_type=shift_type,
+        adls_done=tuple(opt for opt in CATALOGUE.adl_options if ss.get(f"adl_{keyify(opt)}", False)),
+        behaviour_management_done=ss.get("behaviour_management_done", False),
+        receptiveness=ss.get("receptiveness", RECEPTIVENESS[0]),
+        pa_assist=ss.get("pa_assist", ASSIST_LEVEL[0]),
+        adl_time=ss.get("adl_time", ADL_TIME[1]),
+        intake=ss.get("intake", FOOD_FLUID_LEVELS[5]),
+        meal_assist=tuple(ss.get("meal_assist", ())),
+        engagement_level=ss.get("engagement_level", ENGAGEMENT_LEVELS[0]),
+        engagement_behaviour_desc=ss.get("engagement_behaviour_desc", ""),
+        had_visitors=had_visitors,
+        visitor_types=tuple(ss.get("visitor_types", ())) if had_visitors else (),
+        visitor_times=tuple(ss.get("visitor_times", ())) if had_visitors else (),
+        episodes=tuple(episode_from_state(beh, slots) for beh in ss.get("behaviour_pick", [])),
+        settledness=ss.get("settledness", SETTLEDNESS[0]),
+        in_bed=in_bed,
+        call_bell=ss.get("call_bell", True) if in_bed else False,
+        sensor_mats=int(ss.get("sensor_mats", 1)) if in_bed else 0,
+        crash_mats=int(ss.get("crash_mats", 0)) if in_bed else 0,
+        ongoing=ss.get("ongoing", ""),
+    )
+
+def render_preview(scope: str, started: float) -> None:
+    """
+    Redraw the note preview. Within a full run a fragment only claims its place in the slot (a
+    fragment can redraw an outside container on its own reruns only if it wrote to it in the full
+    run); the page-level call at the end draws the note once.
+    """
+    if _full_run:
+        _preview_slot.empty()
+        return
+    record = record_from_state()
+    autosave_draft(DRAFT_FIELDS, DRAFT_PREFIXES)
+    record_interaction(RECORD_FIELDS, DRAFT_PREFIXES)
+    included = included_episodes(record)
+    cache = get_sentence_cache()
+    with profile_section("Note build"):
+        note = build_note(record, cache)
+    elapsed_ms = (perf_counter() - started) * 1000
+    with _preview_slot.container():
+        st.caption(
+            f"{len(included)} of {len(record.episodes)} episode(s) meet the inclusion rules. "
+            f"Last rerun: {scope} in {elapsed_ms:.0f} ms. "
+            f"Sentence cache: {cache.hit_rate:.0%} hits ({cache.hits}/{cache.hits + cache.misses})."
+        )
+        st.code(note, language=None, wrap_lines=True)
 
 # =========================
 # User Interface – Header & Sidebar
 # =========================
 st.title("Behaviour Inventory – Shift Note Builder (v2)")
 
-with st.sidebar:
+with st.sidebar, profile_section("Sidebar"):
     st.subheader("Shift Settings")
-    shift_type = st.selectbox("Shift Type", ["Morning", "Afternoon"])
+    if len(facilities()) > 1:
+        st.selectbox("Facility", facilities(), index=facilities().index(FACILITY),
+                     format_func=lambda f: f or "Shared catalogue", key="facility")
+    st.text_input("Resident ID", key="resident_id")
+    st.text_input("Ward", key="ward")
+    st.date_input("Shift date", value=date.today(), key="shift_date")
+    shift_type = st.selectbox("Shift Type", CALENDAR.names, key="shift_type")
+    shift = CALENDAR.get(shift_type)
+    if shift.crosses_midnight:
+        st.caption("This shift runs past midnight: date it by the day it started.")
     st.caption("The schedule below is a guide only — use clinical judgement.")
+    st.caption(f"Behaviour catalogue v{CATALOGUE.version}")
 
     st.write("**Shift Structure (guide)**")
-    for line in SHIFT_SCHEDULE[shift_type]:
+    for line in shift.schedule:
         st.write(f"• {line}")
 
 # =========================
-# Section: ADLs & Care
+# Page layout
 # =========================
-c1, c2 = st.columns(2)
+# The form sections fill _form; the note preview below it is created first so every fragment
+# can write to it during the full run, which is what lets their own reruns redraw it.
+_form = st.container()
+st.markdown("---")
+st.header("Shift Note")
+_preview_slot = st.empty()
 
-with c1:
+# =========================
+# Section: ADLs & Care
+# =========================
+@st.fragment
+@profiled("ADLs & Care")
+def adl_block(shift_type: str) -> None:
+    started = perf_counter()
     st.header("ADLs & Care")
 
     # Select/Clear controls
     b1, b2 = st.columns(2)
     with b1:
         if st.button("Select all ADLs"):
-            for opt in ADL_OPTIONS:
+            for opt in CATALOGUE.adl_options:
                 st.session_state[f"adl_{keyify(opt)}"] = True
     with b2:
         if st.button("Clear all ADLs"):
-            for opt in ADL_OPTIONS:
+            for opt in CATALOGUE.adl_options:
                 st.session_state[f"adl_{keyify(opt)}"] = False
 
     st.caption("Pre-ticked based on shift; untick anything not completed.")
 
     # Render checkboxes with shift-aware defaults
-    preselected = DEFAULT_ADLS.get(shift_type, set())
-    adls_done = []
-    for opt in ADL_OPTIONS:
+    preselected = CATALOGUE.default_adls.get(shift_type, frozenset())
+    for opt in CATALOGUE.adl_options:
         k = f"adl_{keyify(opt)}"
-        chk = st.checkbox(opt, value=st.session_state.get(k, opt in preselected), key=k)
-        if chk:
-            adls_done.append(opt)
+        st.checkbox(opt, value=st.session_state.get(k, opt in preselected), key=k)
 
-    behaviour_management_done = st.checkbox("Behaviour management undertaken this shift")
+    st.checkbox("Behaviour management undertaken this shift", key="behaviour_management_done")
 
     st.markdown("**Care Requirements**")
-    receptiveness = st.selectbox("Receptiveness", RECEPTIVENESS)
-    pa_assist = st.selectbox("Physical assistance required", ASSIST_LEVEL, index=0)
-    adl_time = st.selectbox("Time required to complete ADLs", ADL_TIME, index=1)
+    st.selectbox("Receptiveness", RECEPTIVENESS, key="receptiveness")
+    st.selectbox("Physical assistance required", ASSIST_LEVEL, index=0, key="pa_assist")
+    st.selectbox("Time required to complete ADLs", ADL_TIME, index=1, key="adl_time")
 
     st.markdown("**Dietary Intake (scheduled meal times)**")
-    intake = st.selectbox("Total food & fluid intake", FOOD_FLUID_LEVELS, index=5)
-    meal_assist_sel = st.multiselect("Meal assistance (select all that apply)", MEAL_ASSIST)
-
-with c2:
+    st.selectbox("Total food & fluid intake", FOOD_FLUID_LEVELS, index=5, key="intake")
+    st.multiselect("Meal assistance (select all that apply)", MEAL_ASSIST, key="meal_assist")
+    render_preview("ADLs & Care", started)
+
+@st.fragment
+@profiled("Activity & Visitors")
+def visitors_block(shift_type: str) -> None:
+    started = perf_counter()
     st.header("Activity & Visitors")
 
-    engagement_level = st.selectbox("Activity engagement level", ENGAGEMENT_LEVELS, index=0)
-    engagement_behaviour_desc = st.text_area(
+    st.selectbox("Activity engagement level", ENGAGEMENT_LEVELS, index=0, key="engagement_level")
+    st.text_area(
         "If behaviours occurred during engagement, describe presentation/benefit (optional)",
-        placeholder="e.g., Calm with intermittent calling out; benefited from 1:1 and redirection."
+        placeholder="e.g., Calm with intermittent calling out; benefited from 1:1 and redirection.",
+        key="engagement_behaviour_desc",
     )
 
     st.markdown("**Visitors**")
-    had_visitors = st.radio("Was the resident visited this shift?", ["No", "Yes"], index=0, horizontal=True)
-    visitor_types = []
-    visitor_times = []
+    had_visitors = st.radio("Was the resident visited this shift?", ["No", "Yes"], index=0, horizontal=True,
+                            key="had_visitors")
     if had_visitors == "Yes":
-        visitor_types = st.multiselect("Visitor type(s)", VISITOR_TYPES)
-        slot_source = MORNING_SLOTS if shift_type == "Morning" else AFTERNOON_SLOTS
-        visitor_times = st.multiselect("Visit times (30-min intervals)", options=slot_source)
+        st.multiselect("Visitor type(s)", CATALOGUE.visitor_types, key="visitor_types")
+        st.multiselect(f"Visit times ({CALENDAR.get(shift_type).step}-min intervals)", options=shift_slots(shift_type),
+                       key="visitor_times")
+    render_preview("Activity & Visitors", started)
+
+with _form:
+    c1, c2 = st.columns(2)
+    with c1:
+        adl_block(shift_type)
+    with c2:
+        visitors_block(shift_type)
 
 # =========================
 # Behaviour Section
 # =========================
-st.markdown("---")
-st.header("Behaviour Inventory")
-st.caption("Record behaviour episodes by **Domain → Subdomain → Behaviour(s)** with frequency, severity, and disruption. Inclusion rules are applied automatically.")
-
-domain = st.selectbox("Domain", list(DOMAINS.keys()))
-subdomain = st.selectbox("Subdomain", list(DOMAINS[domain].keys()))
-behaviour_pick = st.multiselect("Behaviours (tick all that apply)", DOMAINS[domain][subdomain])
-
-episodes: List[dict] = []
-
-if behaviour_pick:
-    st.markdown("#### Episodes (set scoring for each selected behaviour)")
-    for i, beh in enumerate(behaviour_pick):
-        with st.container(border=True):
-            st.markdown(f"**{i+1}. {beh}**")
-
-            # Specific manifestations (from inventory details)
-            specifics = INVENTORY_DETAILS.get(beh, [])
-            selected_specifics = []
-            if specifics:
-                selected_specifics = st.multiselect(
-                    f"Specific manifestations of {beh} (optional)",
-                    specifics, key=f"spec_{i}"
-                )
-
-            cA, cB, cC, cD = st.columns([1,1,1,1])
-            with cA:
-                freq = st.slider("Frequency (1–4)", 1, 4, 1, key=f"freq_{i}",
-                                 help="1: once; 2: at times; 3: often; 4: very often")
-            with cB:
-                sev = st.slider("Severity (1–4)", 1, 4, 1, key=f"sev_{i}",
-                                help="1: minimal; 2: mild; 3: moderate; 4: severe")
-            with cC:
-                disrupt = st.slider("Occupational disruption (0–4)", 0, 4, 0, key=f"disr_{i}",
-                                    help="0: nil; 1: minimal; 2: mild; 3: moderate; 4: severe")
-            with cD:
-                when_slot = st.selectbox(
-                    "Approx. time",
-                    MORNING_SLOTS if shift_type == "Morning" else AFTERNOON_SLOTS,
-                    key=f"slot_{i}"
-                )
-
-            # Triggers (modifiable / non-modifiable) + free text
-            trig_mod_opts = TRIGGERS_MOD.get(beh, [])
-            trig_nonmod_opts = TRIGGERS_NONMOD.get(beh, [])
-            t1, t2 = st.columns(2)
-            with t1:
-                trig_mod = st.multiselect("Modifiable triggers (select as applicable)", trig_mod_opts, key=f"tmod_{i}")
-            with t2:
-                trig_nonmod = st.multiselect("Non-modifiable triggers", trig_nonmod_opts, key=f"tnon_{i}")
-            trig_free = st.text_input("Additional trigger context (optional)", key=f"tfree_{i}")
-
-            # Management (prevention used this shift? / interventions applied?)
-            prev_opts = MANAGEMENT_PREVENT.get(beh, [])
-            int_opts = MANAGEMENT_INTERVENT.get(beh, [])
-            m1, m2 = st.columns(2)
-            with m1:
-                used_prevent = st.multiselect("Preventative strategies utilised", prev_opts, key=f"prev_{i}")
-            with m2:
-                interventions = st.multiselect("Interventions applied", int_opts, key=f"int_{i}")
-
-            eff = st.selectbox("Effectiveness of strategies", EFFECT_SCALE, index=0, key=f"eff_{i}")
-            med_given = st.checkbox("Sedative medication administered?", key=f"med_{i}")
-            med_eff = st.selectbox("Medication effect", MED_EFFECT, index=0, key=f"me_{i}") if med_given else None
-
-            episodes.append({
-                "behaviour": beh,
-                "specifics": selected_specifics,
-                "freq": freq,
-                "sev": sev,
-                "disrupt": disrupt,
-                "time": when_slot,
-                "trig_mod": trig_mod,
-                "trig_nonmod": trig_nonmod,
-                "trig_free": trig_free.strip(),
-                "prevent": used_prevent,
-                "interventions": interventions,
-                "eff": eff,
-                "med_given": med_given,
-                "med_eff": med_eff
-            })
+with _form:
+    st.markdown("---")
+    st.header("Behaviour Inventory")
+    st.caption("Record behaviour episodes by **Domain → Subdomain → Behaviour(s)** with frequency, severity, and disruption. Inclusion rules are applied automatically.")
+
+    with profile_section("Behaviour Inventory"):
+        # Typeahead over the whole catalogue; picking a hit jumps the pickers below to its behaviour
+        query = st.text_input("Search behaviours, manifestations, triggers and strategies", key="catalogue_query",
+                              placeholder="e.g. exit-seeking, calling out, redirection")
+        if query:
+            hits = get_typeahead(FACILITY).search(query)
+            for i, hit in enumerate(hits):
+                st.button(hit.describe(), key=f"catalogue_hit_{i}", type="tertiary",
+                          on_click=apply_typeahead_hit, args=(hit, CATALOGUE, "catalogue_query"))
+            if not hits:
+                st.caption("Nothing in the catalogue matches that.")
+
+        domain = st.selectbox("Domain", list(DOMAINS.keys()), key="domain")
+        subdomain = st.selectbox("Subdomain", list(DOMAINS[domain].keys()), key="subdomain")
+        behaviour_pick = st.multiselect("Behaviours (tick all that apply)", DOMAINS[domain][subdomain], key="behaviour_pick")
+        prune_episode_state(behaviour_pick)
+
+@st.fragment
+@profiled("Episode card")
+def episode_card(i: int, beh: str, slots: Tuple[str, ...]) -> None:
+    started = perf_counter()
+    with st.container(border=True):
+        st.markdown(f"**{i+1}. {beh}**")
+
+        # Specific manifestations (from inventory details)
+        entry = CATALOGUE.behaviours[beh]
+        if entry.details:
+            st.multiselect(
+                f"Specific manifestations of {beh} (optional)",
+                entry.details, key=episode_key(beh, "spec")
+            )
+
+        cA, cB, cC, cD = st.columns([1,1,1,1])
+        with cA:
+            st.slider("Frequency (1–4)", 1, 4, 1, key=episode_key(beh, "freq"),
+                      help="1: once; 2: at times; 3: often; 4: very often")
+        with cB:
+            st.slider("Severity (1–4)", 1, 4, 1, key=episode_key(beh, "sev"),
+                      help="1: minimal; 2: mild; 3: moderate; 4: severe")
+        with cC:
+            st.slider("Occupational disruption (0–4)", 0, 4, 0, key=episode_key(beh, "disr"),
+                      help="0: nil; 1: minimal; 2: mild; 3: moderate; 4: severe")
+        with cD:
+            st.selectbox("Approx. time", slots, key=episode_key(beh, "slot"))
+
+        # Triggers (modifiable / non-modifiable) + free text
+        t1, t2 = st.columns(2)
+        with t1:
+            st.multiselect("Modifiable triggers (select as applicable)", entry.triggers_mod, key=episode_key(beh, "tmod"))
+        with t2:
+            st.multiselect("Non-modifiable triggers", entry.triggers_nonmod, key=episode_key(beh, "tnon"))
+        st.text_input("Additional trigger context (optional)", key=episode_key(beh, "tfree"))
+
+        # Management (prevention used this shift? / interventions applied?), best-performing first
+        ranking = get_effectiveness()
+        resident = st.session_state.get("resident_id", "").strip()
+        ranked_help = "Ordered by how well each has worked before for this resident and behaviour."
+        m1, m2 = st.columns(2)
+        with m1:
+            st.multiselect("Preventative strategies utilised", ranking.rank(resident, beh, "prevent", entry.prevent),
+                           key=episode_key(beh, "prev"), help=ranked_help)
+        with m2:
+            st.multiselect("Interventions applied", ranking.rank(resident, beh, "intervent", entry.intervent),
+                           key=episode_key(beh, "int"), help=ranked_help)
+
+        st.selectbox("Effectiveness of strategies", EFFECT_SCALE, index=0, key=episode_key(beh, "eff"))
+        med_given = st.checkbox("Sedative medication administered?", key=episode_key(beh, "med"))
+        if med_given:
+            st.selectbox("Medication effect", MED_EFFECT, index=0, key=episode_key(beh, "me"))
+    render_preview(f"Episode: {beh}", started)
+
+with _form, profile_section("Behaviour Inventory"):
+    if behaviour_pick:
+        st.markdown("#### Episodes (set scoring for each selected behaviour)")
+        for i, beh in enumerate(behaviour_pick):
+            episode_card(i, beh, shift_slots(shift_type))
 
 # =========================
 # End of Shift
 # =========================
-st.markdown("---")
-st.header("End of Shift")
-settledness = st.selectbox("Resident appears", SETTLEDNESS, index=0)
-in_bed = st.checkbox("Resident in bed at time of report")
-call_bell = False
-sensor_mats = 0
-crash_mats = 0
-ongoing = st.text_input("Ongoing care/concerns (optional)",
-                        placeholder="e.g., Continue hourly rounding; monitor for further agitation.")
-if in_bed:
-    call_bell = st.checkbox("Call bell left within reach", value=True)
-    sensor_mats = st.number_input("Sensor mats in situ", min_value=0, max_value=2, value=1)
-    crash_mats = st.number_input("Crash mats in situ", min_value=0, max_value=2, value=0)
+with _form:
+    st.markdown("---")
+    st.header("End of Shift")
+    with profile_section("End of Shift"):
+        st.selectbox("Resident appears", SETTLEDNESS, index=0, key="settledness")
+        in_bed = st.checkbox("Resident in bed at time of report", key="in_bed")
+        st.text_input("Ongoing care/concerns (optional)",
+                      placeholder="e.g., Continue hourly rounding; monitor for further agitation.", key="ongoing")
+        if in_bed:
+            st.checkbox("Call bell left within reach", value=True, key="call_bell")
+            st.number_input("Sensor mats in situ", min_value=0, max_value=2, value=1, key="sensor_mats")
+            st.number_input("Crash mats in situ", min_value=0, max_value=2, value=0, key="crash_mats")
 
 # =========================
-# Inclusion Logic & Note Builder
+# Shift Note
 # =========================
-def include_episode(freq: int, sev: int, disrupt: int) -> bool:
-    """
-    Include if:
-      - freq >= 3 OR
-      - sev >= 3 OR
-      - freq * sev > 4 OR
-      - disruption >= 3
-    Otherwise do not include.
-    """
-    return (freq >= 3) or (sev >= 3) or (freq * sev > 4) or (disrupt >= 3)
-
-def build_note() -> str:
-    parts: List[str] = []
-
-    # Baseline intro: will change to 'no notable change' only if no episodes included
-    included_any = False
-
-    # ADLs
-    if adls_done:
-        parts.append(f"ADLs completed included {oxford_join(adls_done)}.")
-    if behaviour_management_done:
-        parts.append("Behaviour management strategies were implemented as required.")
-
-    # Behaviours
-    for ep in episodes:
-        if include_episode(ep["freq"], ep["sev"], ep["disrupt"]):
-            included_any = True
-
-            spec = f" ({oxford_join(ep['specifics'])})" if ep["specifics"] else ""
-            trig_bits = []
-            if ep["trig_mod"]: trig_bits.append(oxford_join(ep["trig_mod"]))
-            if ep["trig_nonmod"]: trig_bits.append(oxford_join(ep["trig_nonmod"]))
-            if ep["trig_free"]: trig_bits.append(ep["trig_free"])
-            trig_txt = f" and potentially triggered by {oxford_join(trig_bits)}" if trig_bits else ""
-
-            disr_txt = ""
-            if ep["disrupt"] >= 3:
-                disr_map = {3: "moderate", 4: "severe"}
-                disr_txt = f" and caused {disr_map.get(ep['disrupt'], 'notable')} occupational disruption"
-
-            ints = oxford_join(ep["interventions"])
-            ints_txt = f" Staff provided {ints} and made the care team aware." if ints else " Staff informed the care team."
-
-            med_txt = ""
-            if ep["med_given"]:
-                med_txt = f" Pharmacological intervention was administered with {ep['med_eff'].lower()} reduction in behaviours."
-
-            # Frequency to words
+_full_run = False
+render_preview("Full page", _run_started)
+
+if st.button("Save shift record", type="primary", key="save_shift"):
+    record = record_from_state()
+    if not record.resident_id:
+        st.error("Enter a Resident ID in the sidebar before saving.")
+    else:
+        store = get_store()
+        previous = store.load_shift(record.resident_id, record.shift_date, record.shift_type)
+        # A blank Ward keeps the resident's stored ward; count the shift under whichever was saved
+        _, ward = store.submit(record, build_note(record, get_sentence_cache()),
+                               ward=st.session_state.get("ward", "").strip()).result()
+        get_heatmaps().apply_shift(record, ward, previous)
+        get_effectiveness().apply_shift(record, previous)
+        alerts = get_escalations().apply_shift(record, ward)
+        record_alerts(store, alerts)
+        discard_draft(DRAFT_FIELDS, DRAFT_PREFIXES)
+        st.success(f"Saved {record.shift_type} shift for {record.resident_id} on {record.shift_date}.")
+        for alert in alerts:
+            st.warning(f"Escalation – {alert.behaviour}: {alert.detail}. Flagged on the ward dashboard.")
+
+finish_rerun()
+profile_panel()
@@ -0,0 +1,12 @@
+# note_an_acc/__init__.py
+# Importable core of the Behaviour Inventory – Shift Note Builder.
+
+from .engine import (
+    Episode, SentenceCache, ShiftRecord, build_note, include_episode, included_episodes,
+    iter_notes, render_notes,
+)
+
+__all__ = [
+    "Episode", "SentenceCache", "ShiftRecord", "build_note", "include_episode", "included_episodes",
+    "iter_notes", "render_notes",
+]
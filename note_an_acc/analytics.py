@@ -0,0 +1,186 @@
+# note_an_acc/analytics.py
+# Time-of-day behaviour heatmaps over the shift calendar's slot grid.
+# Counts live in flat arrays indexed by slot position, bucketed per calendar day (a night shift's
+# slots after midnight fall on the day after its shift date); 7/30/90-day window totals are
+# maintained incrementally as episodes arrive and as the window end moves forward.
+
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .engine import ShiftRecord
+from .storage import ShiftStore
+from .shifts import load_calendar
+
+CALENDAR = load_calendar()
+# Every shift's charting slots on one clock, starting from the first shift
+SLOT_GRID: Tuple[str, ...] = CALENDAR.grid
+SLOT_INDEX: Mapping[str, int] = CALENDAR.grid_index
+WINDOWS: Tuple[int, ...] = (7, 30, 90)
+
+# Per-slot measures kept for every bucket and window
+MEASURES = ("count", "freq", "sev")
+
+
+def slot_day(shift_date: str, shift_type: str, slot: str) -> date:
+    """The calendar day an episode charted at ``slot`` happened on."""
+    day = date.fromisoformat(shift_date)
+    shift = CALENDAR.get(shift_type)
+    offset = shift.day_offset(slot) if shift else None
+    return day + timedelta(days=offset) if offset else day
+
+
+class Grid:
+    """Episode count, frequency-score sum and severity sum per slot."""
+    __slots__ = MEASURES
+
+    def __init__(self, n_slots: int):
+        for m in MEASURES:
+            setattr(self, m, array("l", [0]) * n_slots)
+
+    def add(self, other: "Grid", sign: int = 1) -> None:
+        for m in MEASURES:
+            dst, src = getattr(self, m), getattr(other, m)
+            for i, v in enumerate(src):
+                if v:
+                    dst[i] += sign * v
+
+    def mean(self, measure: str) -> List[float]:
+        total = getattr(self, measure)
+        return [t / c if c else 0.0 for t, c in zip(total, self.count)]
+
+
+class RollingHeatmap:
+    """
+    Day buckets for the longest window plus one running Grid per window.
+    ``add`` touches one bucket and each window it falls into; ``advance`` subtracts
+    only the days that leave each window and adds those that enter it (the small hours of a night
+    shift saved before midnight are a day ahead of ``as_of``).
+    """
+
+    def __init__(self, as_of: date, windows: Tuple[int, ...] = WINDOWS, n_slots: int = len(SLOT_GRID)):
+        self.as_of = as_of
+        self.windows = windows
+        self.n_slots = n_slots
+        self.buckets: Dict[date, Grid] = {}
+        self.totals: Dict[int, Grid] = {w: Grid(n_slots) for w in windows}
+
+    def add(self, day: date, slot: int, count: int, freq: int, sev: int) -> None:
+        age = (self.as_of - day).days
+        if age >= max(self.windows):
+            return
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = self.buckets[day] = Grid(self.n_slots)
+        grids = [bucket] + [self.totals[w] for w in self.windows if 0 <= age < w]
+        for g in grids:
+            g.count[slot] += count
+            g.freq[slot] += freq
+            g.sev[slot] += sev
+
+    def advance(self, as_of: date) -> None:
+        if as_of <= self.as_of:
+            return
+        for w in self.windows:
+            # Days in the old window but not the new one
+            old_start = self.as_of - timedelta(days=w - 1)
+            new_start = as_of - timedelta(days=w - 1)
+            day = old_start
+            while day < new_start and day <= self.as_of:
+                bucket = self.buckets.get(day)
+                if bucket is not None:
+                    self.totals[w].add(bucket, -1)
+                day += timedelta(days=1)
+            for day, bucket in self.buckets.items():
+                if self.as_of < day <= as_of and day >= new_start:
+                    self.totals[w].add(bucket)
+        oldest = as_of - timedelta(days=max(self.windows) - 1)
+        for day in [d for d in self.buckets if d < oldest]:
+            del self.buckets[day]
+        self.as_of = as_of
+
+    def window(self, days: int) -> Grid:
+        return self.totals[days]
+
+
+class HeatmapIndex:
+    """Per-resident and per-ward rolling heatmaps for a facility."""
+
+    def __init__(self, as_of: date, windows: Tuple[int, ...] = WINDOWS):
+        self.as_of = as_of
+        self.windows = windows
+        self.residents: Dict[str, RollingHeatmap] = {}
+        self.wards: Dict[str, RollingHeatmap] = {}
+        self.ward_of: Dict[str, str] = {}
+        # Ward each shift was counted under, so a resubmission after a ward move is backed out of the
+        # right one: saved shifts by (resident, date, shift type), loaded ones by resident
+        self.counted_in: Dict[Tuple[str, str, str], str] = {}
+        self.loaded_ward: Dict[str, str] = {}
+        self.lock = threading.Lock()  # shared across Streamlit sessions
+
+    def _maps(self, resident_id: str, ward: str) -> Iterable[RollingHeatmap]:
+        self.ward_of[resident_id] = ward
+        for key, maps in ((resident_id, self.residents), (ward, self.wards)):
+            if key not in maps:
+                maps[key] = RollingHeatmap(self.as_of, self.windows)
+            yield maps[key]
+
+    def add(self, resident_id: str, ward: str, day: date, slot: str, count: int, freq: int, sev: int) -> None:
+        """Count at ``slot`` on calendar ``day`` (see slot_day)."""
+        idx = SLOT_INDEX.get(slot)
+        if idx is None:
+            return
+        for hm in self._maps(resident_id, ward):
+            hm.add(day, idx, count, freq, sev)
+
+    def apply_shift(self, record: ShiftRecord, ward: str, previous: Optional[ShiftRecord] = None) -> None:
+        """Fold a newly saved shift in, backing out the earlier submission it replaces."""
+        key = (record.resident_id, record.shift_date, record.shift_type)
+        day = lambda slot: slot_day(record.shift_date, record.shift_type, slot)
+        with self.lock:
+            if previous is not None:
+                was = self.counted_in.get(key, self.loaded_ward.get(record.resident_id, ward))
+                for ep in previous.episodes:
+                    self.add(record.resident_id, was, day(ep.time), ep.time, -1, -ep.freq, -ep.sev)
+                self.ward_of[record.resident_id] = ward
+            for ep in record.episodes:
+                self.add(record.resident_id, ward, day(ep.time), ep.time, 1, ep.freq, ep.sev)
+            self.counted_in[key] = ward
+
+    def advance(self, as_of: date) -> None:
+        with self.lock:
+            for hm in list(self.residents.values()) + list(self.wards.values()):
+                hm.advance(as_of)
+            self.as_of = max(self.as_of, as_of)
+            oldest = (self.as_of - timedelta(days=max(self.windows) - 1)).isoformat()
+            for key in [k for k in self.counted_in if k[1] < oldest]:
+                del self.counted_in[key]
+
+    @classmethod
+    def load(cls, store: ShiftStore, as_of: date, windows: Tuple[int, ...] = WINDOWS) -> "HeatmapIndex":
+        """Build from one grouped query over the episodes inside the longest window."""
+        index = cls(as_of, windows)
+        # From a day early: the previous night's small hours fall inside the window
+        start = (as_of - timedelta(days=max(windows))).isoformat()
+        rows = store.connection().execute(
+            "SELECT e.resident_id, r.ward, e.shift_date, s.shift_type, e.slot, COUNT(*), SUM(e.freq), SUM(e.sev) "
+            "FROM episodes e JOIN shifts s ON s.shift_id = e.shift_id JOIN residents r ON r.resident_id = e.resident_id "
+            "WHERE e.shift_date BETWEEN ? AND ? GROUP BY e.resident_id, e.shift_date, s.shift_type, e.slot",
+            (start, as_of.isoformat()),
+        )
+        for resident_id, ward, shift_date, shift_type, slot, count, freq, sev in rows:
+            index.add(resident_id, ward, slot_day(shift_date, shift_type, slot), slot, count, freq, sev)
+        index.loaded_ward = dict(index.ward_of)
+        return index
+
+    def ward_residents(self, ward: str) -> List[str]:
+        return sorted(r for r, w in self.ward_of.items() if w == ward)
+
+    def resident(self, resident_id: str, days: int) -> Grid:
+        hm = self.residents.get(resident_id)
+        return hm.window(days) if hm else Grid(len(SLOT_GRID))
+
+    def ward(self, ward: str, days: int) -> Grid:
+        hm = self.wards.get(ward)
+        return hm.window(days) if hm else Grid(len(SLOT_GRID))
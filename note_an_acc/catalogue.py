@@ -0,0 +1,241 @@
+# note_an_acc/catalogue.py
+# Behaviour catalogue: Domains → Subdomains → Behaviours, with details, triggers and management,
+# plus the form's ADL options, per-shift ADL defaults and visitor types.
+# Loaded once per process from a versioned JSON file into an immutable, interned index.
+#
+# Facilities layer sparse overlays on the shared base (data/facilities/<facility>.json, or the
+# NOTE_AN_ACC_FACILITIES directory). An overlay lists only what it changes; a list replaces the
+# base list, {"add": [...], "remove": [...]} patches it (data/overlay.example.json):
+#
+#   {"schema": 1, "version": "2026.1",
+#    "behaviours": {"Problem wandering": {"intervent": {"add": ["Walk in the sensory garden"]}}},
+#    "visitor_types": {"remove": ["Regis Companion"]},
+#    "default_adls": {"Night": ["Toileting"]}}
+#
+# The resolved view shares every untouched entry and index bucket with the base, so memory grows
+# with the size of the overrides rather than the number of facilities.
+
+import json
+import os
+import sys
+from collections import ChainMap
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+CATALOGUE_PATH = Path(__file__).parent / "data" / "catalogue.json"
+FACILITIES_DIR = Path(__file__).parent / "data" / "facilities"
+EXAMPLE_OVERLAY_PATH = Path(__file__).parent / "data" / "overlay.example.json"
+CATALOGUE_SCHEMA = 1
+
+# Per-behaviour list sections; each is both a catalogue file key and a BehaviourEntry field
+LIST_FIELDS = ("details", "triggers_mod", "triggers_nonmod", "prevent", "intervent")
+# Form option lists, also top-level catalogue file keys
+FORM_FIELDS = ("adl_options", "visitor_types")
+
+Index = Mapping[str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class BehaviourEntry:
+    name: str
+    domain: str
+    subdomain: str
+    details: Tuple[str, ...] = ()
+    triggers_mod: Tuple[str, ...] = ()
+    triggers_nonmod: Tuple[str, ...] = ()
+    prevent: Tuple[str, ...] = ()
+    intervent: Tuple[str, ...] = ()
+
+
+class Catalogue:
+    """
+    Read-only behaviour index. ``behaviours`` maps behaviour → BehaviourEntry;
+    ``behaviours_with(item)`` is the O(1) reverse lookup (e.g. "Exit-seeking").
+    ``facility`` is "" for the shared base and names the overlay otherwise.
+    """
+    __slots__ = ("version", "domains", "behaviours", "adl_options", "default_adls", "visitor_types", "facility",
+                 "_reverse", "_any")
+
+    def __init__(self, version: str, domains: Mapping[str, Mapping[str, Tuple[str, ...]]],
+                 behaviours: Mapping[str, BehaviourEntry], adl_options: Tuple[str, ...] = (),
+                 default_adls: Mapping[str, frozenset] = MappingProxyType({}), visitor_types: Tuple[str, ...] = (),
+                 facility: str = "", reverse: Optional[Mapping[str, Index]] = None, any_field: Optional[Index] = None):
+        self.version = version
+        self.domains = domains
+        self.behaviours = behaviours
+        self.adl_options = adl_options
+        self.default_adls = default_adls
+        self.visitor_types = visitor_types
+        self.facility = facility
+        if reverse is None:
+            reverse = MappingProxyType({
+                f: _index(behaviours.values(), lambda e, f=f: getattr(e, f)) for f in LIST_FIELDS
+            })
+        if any_field is None:
+            any_field = _index(behaviours.values(), _all_items)
+        self._reverse = reverse
+        self._any = any_field
+
+    def get(self, behaviour: str) -> Optional[BehaviourEntry]:
+        return self.behaviours.get(behaviour)
+
+    def behaviours_with(self, item: str, field: Optional[str] = None) -> Tuple[str, ...]:
+        """Behaviours listing ``item`` under ``field`` (any field when omitted), in catalogue order."""
+        if field is None:
+            return self._any.get(item, ())
+        return self._reverse[field].get(item, ())
+
+    def options(self, field: str) -> Mapping[str, Tuple[str, ...]]:
+        """Behaviour → list view of one field, for callers that want the old dict shape."""
+        return MappingProxyType({name: getattr(e, field) for name, e in self.behaviours.items() if getattr(e, field)})
+
+    def in_domain(self, domain: str, subdomain: Optional[str] = None) -> Tuple[str, ...]:
+        subs = self.domains.get(domain, {})
+        if subdomain is not None:
+            return subs.get(subdomain, ())
+        return tuple(b for behs in subs.values() for b in behs)
+
+
+def _all_items(entry: BehaviourEntry) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(i for f in LIST_FIELDS for i in getattr(entry, f)))
+
+def _index(entries: Iterable[BehaviourEntry], items: Callable[[BehaviourEntry], Tuple[str, ...]]) -> Index:
+    by_item: Dict[str, List[str]] = {}
+    for entry in entries:
+        for item in items(entry):
+            by_item.setdefault(item, []).append(entry.name)
+    return MappingProxyType({item: tuple(names) for item, names in by_item.items()})
+
+def _interned(items: List[str], pool: Dict[Tuple[str, ...], Tuple[str, ...]]) -> Tuple[str, ...]:
+    t = tuple(sys.intern(i) for i in items)
+    return pool.setdefault(t, t)
+
+def parse_catalogue(raw: dict) -> Catalogue:
+    if raw.get("schema") != CATALOGUE_SCHEMA:
+        raise ValueError(f"Unsupported catalogue schema {raw.get('schema')!r} (expected {CATALOGUE_SCHEMA})")
+    pool: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    located: Dict[str, Tuple[str, str]] = {}
+    domains = {}
+    for domain, subs in raw["domains"].items():
+        domain = sys.intern(domain)
+        sub_map = {}
+        for subdomain, behs in subs.items():
+            subdomain = sys.intern(subdomain)
+            sub_map[subdomain] = _interned(behs, pool)
+            for beh in sub_map[subdomain]:
+                located.setdefault(beh, (domain, subdomain))
+        domains[domain] = MappingProxyType(sub_map)
+
+    for section in LIST_FIELDS:
+        unknown = set(raw.get(section, {})) - set(located)
+        if unknown:
+            raise ValueError(f"Catalogue section '{section}' lists behaviours not in any domain: {sorted(unknown)}")
+
+    behaviours = {}
+    for beh, (domain, subdomain) in located.items():
+        lists = {f: _interned(raw.get(f, {}).get(beh, []), pool) for f in LIST_FIELDS}
+        behaviours[beh] = BehaviourEntry(name=beh, domain=domain, subdomain=subdomain, **lists)
+
+    form = {f: _interned(raw.get(f, []), pool) for f in FORM_FIELDS}
+    default_adls = MappingProxyType({
+        sys.intern(shift): frozenset(_interned(adls, pool)) for shift, adls in raw.get("default_adls", {}).items()
+    })
+    return Catalogue(str(raw.get("version", "")), MappingProxyType(domains), MappingProxyType(behaviours),
+                     default_adls=default_adls, **form)
+
+@lru_cache(maxsize=None)
+def load_catalogue(path: Optional[str] = None) -> Catalogue:
+    """Parse the catalogue file once per process; later calls return the same object."""
+    with open(path or CATALOGUE_PATH, encoding="utf-8") as fh:
+        return parse_catalogue(json.load(fh))
+
+# =========================
+# Facility overlays
+# =========================
+def _patch(current: Tuple[str, ...], op, where: str) -> Tuple[str, ...]:
+    """A list replaces ``current``; {"add": [...], "remove": [...]} edits it in place order."""
+    if isinstance(op, list):
+        items = op
+    elif isinstance(op, dict) and set(op) <= {"add", "remove"}:
+        drop = set(op.get("remove", ()))
+        items = [i for i in current if i not in drop] + [i for i in op.get("add", ()) if i not in current]
+    else:
+        raise ValueError(f"{where}: expected a list or {{\"add\": [...], \"remove\": [...]}}")
+    return tuple(sys.intern(str(i)) for i in dict.fromkeys(items))
+
+def _patched_index(base: Index, changed: Mapping[str, BehaviourEntry], old: Mapping[str, BehaviourEntry],
+                   items: Callable[[BehaviourEntry], Tuple[str, ...]], order: Mapping[str, int]) -> Index:
+    """``base`` with only the buckets of items the changed behaviours gained or lost rebuilt."""
+    now = {name: set(items(e)) for name, e in changed.items()}
+    # Only items a behaviour gained or lost change bucket; the rest stay shared with the base
+    touched = set().union(*(now[name].symmetric_difference(items(old[name])) for name in changed))
+    delta = {}
+    for item in touched:
+        names = [n for n in base.get(item, ()) if n not in changed]
+        names += [n for n, has in now.items() if item in has]
+        delta[item] = tuple(sorted(names, key=order.__getitem__))
+    return MappingProxyType(ChainMap(delta, base)) if delta else base
+
+def apply_overlay(base: Catalogue, raw: dict, facility: str) -> Catalogue:
+    """Resolve one facility's overlay against the shared base catalogue."""
+    if raw.get("schema") != CATALOGUE_SCHEMA:
+        raise ValueError(f"Unsupported overlay schema {raw.get('schema')!r} (expected {CATALOGUE_SCHEMA})")
+    unknown = set(raw) - {"schema", "version", "facility", "behaviours", "default_adls", *FORM_FIELDS}
+    if unknown:
+        raise ValueError(f"Overlay {facility!r}: unknown sections {sorted(unknown)}")
+
+    changed: Dict[str, BehaviourEntry] = {}
+    for name, fields in raw.get("behaviours", {}).items():
+        entry = base.behaviours.get(name)
+        if entry is None:
+            raise ValueError(f"Overlay {facility!r} changes {name!r}, which is not in the base catalogue")
+        bad = set(fields) - set(LIST_FIELDS)
+        if bad:
+            raise ValueError(f"Overlay {facility!r}, {name}: unknown fields {sorted(bad)}")
+        changed[name] = replace(entry, **{
+            f: _patch(getattr(entry, f), op, f"{facility}/{name}/{f}") for f, op in fields.items()
+        })
+
+    reverse, any_field = base._reverse, base._any
+    if changed:
+        order = {name: i for i, name in enumerate(base.behaviours)}
+        reverse = MappingProxyType({
+            f: _patched_index(base._reverse[f], changed, base.behaviours, lambda e, f=f: getattr(e, f), order)
+            for f in LIST_FIELDS
+        })
+        any_field = _patched_index(base._any, changed, base.behaviours, _all_items, order)
+    behaviours = MappingProxyType(ChainMap(changed, base.behaviours)) if changed else base.behaviours
+
+    form = {f: _patch(getattr(base, f), raw[f], f"{facility}/{f}") if f in raw else getattr(base, f)
+            for f in FORM_FIELDS}
+    default_adls = base.default_adls
+    if "default_adls" in raw:
+        default_adls = MappingProxyType({**base.default_adls, **{
+            sys.intern(shift): frozenset(_patch(tuple(base.default_adls.get(shift, ())), op,
+                                                f"{facility}/default_adls/{shift}"))
+            for shift, op in raw["default_adls"].items()
+        }})
+    version = f"{base.version}+{facility}" + (f".{raw['version']}" if raw.get("version") else "")
+    return Catalogue(version, base.domains, behaviours, default_adls=default_adls, facility=facility,
+                     reverse=reverse, any_field=any_field, **form)
+
+def facilities_dir() -> Path:
+    return Path(os.environ.get("NOTE_AN_ACC_FACILITIES") or FACILITIES_DIR)
+
+def list_facilities() -> Tuple[str, ...]:
+    """Facilities with an overlay file, by file stem."""
+    d = facilities_dir()
+    return tuple(sorted(p.stem for p in d.glob("*.json"))) if d.is_dir() else ()
+
+@lru_cache(maxsize=None)
+def load_facility_catalogue(facility: str = "") -> Catalogue:
+    """The base catalogue with ``facility``'s overlay applied, resolved once per process."""
+    base = load_catalogue()
+    if not facility:
+        return base
+    with open(facilities_dir() / f"{facility}.json", encoding="utf-8") as fh:
+        return apply_overlay(base, json.load(fh), facility)
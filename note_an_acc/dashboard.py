@@ -0,0 +1,65 @@
+# note_an_acc/dashboard.py
+# Ward view over the maintained resident_stats aggregates.
+# A WardBoard only pulls rows whose version moved since its last refresh and applies them as deltas.
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+from .storage import ShiftStore
+
+
+@dataclass(frozen=True)
+class ResidentSummary:
+    resident_id: str
+    shifts: int = 0
+    included: int = 0
+    peak_sev: int = 0
+    sedatives: int = 0
+    settledness: str = ""
+    version: int = 0
+
+
+class WardBoard:
+    """Per-resident rows plus ward totals for one ward and day, kept current incrementally."""
+
+    def __init__(self, ward: str, shift_date: str):
+        self.ward = ward
+        self.shift_date = shift_date
+        self.rows: Dict[str, ResidentSummary] = {}
+        self.totals = {"residents": 0, "included": 0, "sedatives": 0, "unsettled": 0}
+        self.last_version = 0
+
+    def apply(self, new: ResidentSummary) -> None:
+        old = self.rows.get(new.resident_id)
+        if old is None:
+            self.totals["residents"] += 1
+            old = ResidentSummary(new.resident_id)
+        self.totals["included"] += new.included - old.included
+        self.totals["sedatives"] += new.sedatives - old.sedatives
+        self.totals["unsettled"] += (new.settledness == "Unsettled") - (old.settledness == "Unsettled")
+        self.rows[new.resident_id] = new
+        self.last_version = max(self.last_version, new.version)
+
+    def refresh(self, store: ShiftStore) -> int:
+        """Apply rows changed since the last refresh; returns how many residents changed."""
+        changed = store.stats_since(self.ward, self.shift_date, self.last_version)
+        for row in changed:
+            self.apply(ResidentSummary(
+                resident_id=row["resident_id"], shifts=row["shifts"], included=row["included"],
+                peak_sev=row["peak_sev"], sedatives=row["sedatives"],
+                settledness=row["settledness"], version=row["version"],
+            ))
+        return len(changed)
+
+    def table(self) -> List[dict]:
+        return [
+            {
+                "Resident": r.resident_id,
+                "Shifts": r.shifts,
+                "Included episodes": r.included,
+                "Peak severity": r.peak_sev,
+                "Sedatives": r.sedatives,
+                "Settledness": r.settledness,
+            }
+            for r in sorted(self.rows.values(), key=lambda r: r.resident_id)
+        ]
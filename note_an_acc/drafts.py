@@ -0,0 +1,148 @@
+# note_an_acc/drafts.py
+# Write-behind autosave of in-progress shift forms. Each rerun hands the form's current state to a
+# process-wide DraftWriter, which keeps only the latest state per draft (coalescing), waits until a
+# draft has been quiet for QUIET seconds (debouncing) and writes every due draft in one transaction at
+# most once per FLUSH_EVERY seconds, so storage writes per minute stay bounded however fast staff click.
+# A draft that keeps changing is still written once it has been pending for MAX_WAIT seconds.
+
+import atexit
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Mapping, Optional, Tuple
+
+from .storage import ShiftStore
+
+FLUSH_EVERY = 5.0
+QUIET = 2.0
+MAX_WAIT = 20.0
+DRAFT_TTL = 2 * 24 * 3600  # drafts untouched for two days are purged when the writer starts
+REMEMBERED = 1024  # last-written fingerprints kept, so unchanged reruns are not re-queued
+
+
+def encode_state(state: Mapping[str, object]) -> str:
+    """JSON for form state; dates round-trip through decode_state."""
+    return json.dumps(
+        {k: ({"$date": v.isoformat()} if isinstance(v, date) else v) for k, v in sorted(state.items())},
+        separators=(",", ":"), ensure_ascii=False,
+    )
+
+def decode_state(text: str) -> Dict[str, object]:
+    return {
+        k: (date.fromisoformat(v["$date"]) if isinstance(v, dict) and "$date" in v else v)
+        for k, v in json.loads(text).items()
+    }
+
+
+class DraftWriter:
+    """Debounced, coalescing write-behind cache in front of ShiftStore.save_drafts."""
+
+    def __init__(self, store: ShiftStore, flush_every: float = FLUSH_EVERY, quiet: float = QUIET,
+                 max_wait: float = MAX_WAIT):
+        self.store = store
+        self.flush_every = flush_every
+        self.quiet = quiet
+        self.max_wait = max_wait
+        # draft_key -> (state_json, first_queued, last_changed)
+        self.pending: Dict[str, Tuple[str, float, float]] = {}
+        self._written: "OrderedDict[str, str]" = OrderedDict()
+        self.updates = self.coalesced = self.flushes = self.rows_written = 0
+        self.lock = threading.Lock()
+        # Held across each storage write, so a discard can't land between a flush taking a draft
+        # and upserting it (which would bring an already-saved form back). Taken before ``lock``.
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "DraftWriter":
+        self.store.delete_drafts(older_than=time.time() - DRAFT_TTL)
+        self._thread = threading.Thread(target=self._run, name="draft-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    # ---- called from reruns
+    def update(self, draft_key: str, state: Mapping[str, object]) -> bool:
+        """Queue the latest form state; returns False when it matches what is already queued or stored."""
+        text = encode_state(state)
+        now = time.monotonic()
+        with self.lock:
+            self.updates += 1
+            queued = self.pending.get(draft_key)
+            if queued is not None:
+                if queued[0] == text:
+                    return False
+                self.coalesced += 1
+                self.pending[draft_key] = (text, queued[1], now)
+            elif self._written.get(draft_key) == text:
+                return False
+            else:
+                self.pending[draft_key] = (text, now, now)
+        return True
+
+    def load(self, draft_key: str) -> Optional[Dict[str, object]]:
+        """Latest state for a draft: still-pending state first, else what was stored."""
+        with self.lock:
+            queued = self.pending.get(draft_key)
+        text = queued[0] if queued else self.store.load_draft(draft_key)
+        return decode_state(text) if text else None
+
+    def discard(self, draft_key: str, state: Optional[Mapping[str, object]] = None) -> None:
+        """Forget a draft (e.g. once its shift is saved). ``state`` is remembered as written so the
+        same, already-saved form is not queued again by the next rerun."""
+        with self._write_lock:
+            with self.lock:
+                self.pending.pop(draft_key, None)
+                self._remember(draft_key, encode_state(state) if state is not None else None)
+            self.store.delete_drafts([draft_key])
+
+    # ---- background
+    def _remember(self, draft_key: str, text: Optional[str]) -> None:
+        self._written.pop(draft_key, None)
+        if text is not None:
+            self._written[draft_key] = text
+            while len(self._written) > REMEMBERED:
+                self._written.popitem(last=False)
+
+    def flush(self, force: bool = False) -> int:
+        """Write every due draft (all pending ones with ``force``) in one transaction."""
+        with self._write_lock:
+            now = time.monotonic()
+            with self.lock:
+                due = [
+                    (k, text) for k, (text, first, last) in self.pending.items()
+                    if force or now - last >= self.quiet or now - first >= self.max_wait
+                ]
+                for k, _ in due:
+                    del self.pending[k]
+            if not due:
+                return 0
+            try:
+                self.store.save_drafts(due)
+            except Exception:
+                # Put them back unless a newer state arrived meanwhile; the next flush retries
+                with self.lock:
+                    for k, text in due:
+                        self.pending.setdefault(k, (text, now, now))
+                raise
+            with self.lock:
+                for k, text in due:
+                    self._remember(k, text)
+                self.flushes += 1
+                self.rows_written += len(due)
+            return len(due)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_every):
+            try:
+                self.flush()
+            except Exception:
+                pass  # database busy or unavailable: drafts stay pending for the next tick
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_every + 1)
+        self.flush(force=True)
@@ -0,0 +1,104 @@
+# note_an_acc/effectiveness.py
+# Historical success of preventative strategies and interventions, per behaviour and per resident.
+# Counts are loaded once with grouped queries and then updated as shifts are saved; the ranked option
+# order for each (resident, behaviour, field) is cached until one of its counts changes, so ordering
+# the episode multiselects is a dict lookup per rerun.
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .engine import EFFECT_SCALE, Episode, ShiftRecord
+from .storage import ShiftStore
+
+# Catalogue option list -> Episode attribute / episodes column
+FIELDS = {"prevent": "prevent", "intervent": "interventions"}
+# Success points per effectiveness rating (Good, Limited, No effect)
+POINTS = {e: p for e, p in zip(EFFECT_SCALE, (2, 1, 0))}
+MAX_POINTS = max(POINTS.values())
+# Pseudo-uses pulling a resident's rate towards the behaviour-wide rate, and that towards PRIOR
+RESIDENT_WEIGHT = 3.0
+BEHAVIOUR_WEIGHT = 5.0
+PRIOR = 0.5
+
+Key = Tuple[str, str, str]  # (resident_id or "", behaviour, field)
+
+
+class EffectivenessIndex:
+    """
+    ``uses`` / ``points`` per (scope, behaviour, field, option), where scope is a resident id or ""
+    for the whole facility. ``rank`` blends a resident's record with the facility's for that
+    behaviour, so a strategy with one lucky outcome doesn't jump ahead of a proven one.
+    """
+
+    def __init__(self):
+        self.counts: Dict[Key, Dict[str, List[int]]] = {}
+        self._orders: Dict[Tuple[Key, Tuple[str, ...]], Tuple[str, ...]] = {}
+        self.lock = threading.Lock()  # shared across Streamlit sessions
+
+    def _add(self, key: Key, option: str, uses: int, points: int) -> None:
+        c = self.counts.setdefault(key, {}).setdefault(option, [0, 0])
+        c[0] += uses
+        c[1] += points
+
+    def _invalidate(self, touched) -> None:
+        # Every resident's order for a behaviour depends on the facility-wide counts for it
+        pairs = {(behaviour, field) for _, behaviour, field in touched}
+        for k in [k for k in self._orders if k[0][1:] in pairs]:
+            del self._orders[k]
+
+    def add_episode(self, resident_id: str, ep: Episode, sign: int = 1) -> List[Key]:
+        touched = []
+        points = POINTS.get(ep.eff, 0)
+        for field, attr in FIELDS.items():
+            for option in getattr(ep, attr):
+                for scope in (resident_id, ""):
+                    key = (scope, ep.behaviour, field)
+                    self._add(key, option, sign, sign * points)
+                    touched.append(key)
+        return touched
+
+    def apply_shift(self, record: ShiftRecord, previous: Optional[ShiftRecord] = None) -> None:
+        """Fold a newly saved shift in, backing out the earlier submission it replaces."""
+        with self.lock:
+            touched = []
+            if previous is not None:
+                for ep in previous.episodes:
+                    touched += self.add_episode(previous.resident_id, ep, -1)
+            for ep in record.episodes:
+                touched += self.add_episode(record.resident_id, ep)
+            self._invalidate(touched)
+
+    @classmethod
+    def load(cls, store: ShiftStore) -> "EffectivenessIndex":
+        """Build from one grouped query per field over the stored episodes."""
+        index = cls()
+        conn = store.connection()
+        for field, column in FIELDS.items():
+            rows = conn.execute(
+                f"SELECT e.resident_id, e.behaviour, j.value, e.eff, COUNT(*) "
+                f"FROM episodes e, json_each(e.{column}) j GROUP BY e.resident_id, e.behaviour, j.value, e.eff"
+            )
+            for resident_id, behaviour, option, eff, n in rows:
+                points = POINTS.get(eff, 0) * n
+                index._add((resident_id, behaviour, field), option, n, points)
+                index._add(("", behaviour, field), option, n, points)
+        return index
+
+    # ---- reads
+    def rate(self, resident_id: str, behaviour: str, field: str, option: str) -> Tuple[float, int]:
+        """(smoothed success rate 0–1, times used for this resident)."""
+        fac = self.counts.get(("", behaviour, field), {}).get(option, (0, 0))
+        res = self.counts.get((resident_id, behaviour, field), {}).get(option, (0, 0)) if resident_id else (0, 0)
+        fac_rate = (fac[1] / MAX_POINTS + BEHAVIOUR_WEIGHT * PRIOR) / (fac[0] + BEHAVIOUR_WEIGHT)
+        res_rate = (res[1] / MAX_POINTS + RESIDENT_WEIGHT * fac_rate) / (res[0] + RESIDENT_WEIGHT)
+        return res_rate, res[0]
+
+    def rank(self, resident_id: str, behaviour: str, field: str, options: Sequence[str]) -> Tuple[str, ...]:
+        """``options`` ordered by historical success, best first; untried options keep catalogue order."""
+        key = ((resident_id, behaviour, field), tuple(options))
+        order = self._orders.get(key)
+        if order is None:
+            with self.lock:
+                scored = [(-self.rate(resident_id, behaviour, field, o)[0], i, o) for i, o in enumerate(options)]
+                order = self._orders[key] = tuple(o for _, _, o in sorted(scored))
+        return order
@@ -0,0 +1,284 @@
+# note_an_acc/engine.py
+# Headless note engine: typed shift records in, shift note text out.
+# No Streamlit imports — safe to use from batch jobs and worker processes.
+
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils import oxford_join
+
+# =========================
+# Wording
+# =========================
+FREQ_WORDS = {1: "once", 2: "at times", 3: "often", 4: "very often"}
+SEV_WORDS = {1: "minimal", 2: "mild", 3: "moderate", 4: "severe"}
+DISR_MAP = {3: "moderate", 4: "severe"}
+EFF_WORDS = {"Good": "good effect", "Limited": "limited effect", "No effect": "no effect"}
+MED_WORDS = {"Effective": "effective", "Partial": "partial", "No effect": "no"}
+EFFECT_SCALE = tuple(EFF_WORDS)
+MED_EFFECT = tuple(MED_WORDS)
+ENGAGEMENT_WORDS = {
+    "Actively participated": "actively participated in",
+    "Observed only": "observed",
+    "Engaged minimally": "engaged minimally in",
+    "Passively engaged": "passively engaged in",
+    "Refused": "refused",
+}
+
+# =========================
+# Shift record model
+# =========================
+# Records are slotted and every vocabulary string (behaviour, slot, scale words, catalogue
+# items) is interned on the way in, so a session's episodes share one copy of each word.
+@dataclass(frozen=True, slots=True)
+class Episode:
+    behaviour: str
+    specifics: Tuple[str, ...] = ()
+    freq: int = 1
+    sev: int = 1
+    disrupt: int = 0
+    time: str = ""
+    trig_mod: Tuple[str, ...] = ()
+    trig_nonmod: Tuple[str, ...] = ()
+    trig_free: str = ""
+    prevent: Tuple[str, ...] = ()
+    interventions: Tuple[str, ...] = ()
+    eff: str = "Good"
+    med_given: bool = False
+    med_eff: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Episode":
+        return cls(**_coerce(cls, d))
+
+    def to_dict(self) -> dict:
+        return {f.name: _plain(getattr(self, f.name)) for f in fields(self)}
+
+
+@dataclass(frozen=True, slots=True)
+class ShiftRecord:
+    resident_id: str = ""
+    shift_date: str = ""  # ISO date
+    shift_type: str = "Morning"
+    adls_done: Tuple[str, ...] = ()
+    behaviour_management_done: bool = False
+    receptiveness: str = "Not receptive"
+    pa_assist: str = "1x"
+    adl_time: str = "Moderate"
+    intake: str = "¾"
+    meal_assist: Tuple[str, ...] = ()
+    engagement_level: str = "Actively participated"
+    engagement_behaviour_desc: str = ""
+    had_visitors: bool = False
+    visitor_types: Tuple[str, ...] = ()
+    visitor_times: Tuple[str, ...] = ()
+    episodes: Tuple[Episode, ...] = field(default_factory=tuple)
+    settledness: str = "Settled"
+    in_bed: bool = False
+    call_bell: bool = False
+    sensor_mats: int = 0
+    crash_mats: int = 0
+    ongoing: str = ""
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ShiftRecord":
+        d = dict(d)
+        d["episodes"] = tuple(
+            ep if isinstance(ep, Episode) else Episode.from_dict(ep)
+            for ep in d.get("episodes") or ()
+        )
+        return cls(**_coerce(cls, d))
+
+    def to_dict(self) -> dict:
+        out = {f.name: _plain(getattr(self, f.name)) for f in fields(self)}
+        out["episodes"] = [ep.to_dict() for ep in self.episodes]
+        return out
+
+
+def _coerce(cls, d: dict) -> dict:
+    # Lists become tuples so records stay hashable; unknown keys are ignored.
+    names = {f.name for f in fields(cls)}
+    return {k: _compact(v) for k, v in d.items() if k in names}
+
+def _compact(v):
+    if isinstance(v, str):
+        return sys.intern(v)
+    if isinstance(v, (list, tuple)):
+        return tuple(sys.intern(i) if isinstance(i, str) else i for i in v)
+    return v
+
+def _plain(v):
+    return list(v) if isinstance(v, tuple) else v
+
+# =========================
+# Inclusion Logic & Note Builder
+# =========================
+def include_episode(freq: int, sev: int, disrupt: int) -> bool:
+    """
+    Include if:
+      - freq >= 3 OR
+      - sev >= 3 OR
+      - freq * sev > 4 OR
+      - disruption >= 3
+    Otherwise do not include.
+    """
+    return (freq >= 3) or (sev >= 3) or (freq * sev > 4) or (disrupt >= 3)
+
+def included_episodes(record: ShiftRecord) -> List[Episode]:
+    return [ep for ep in record.episodes if include_episode(ep.freq, ep.sev, ep.disrupt)]
+
+def episode_sentence(ep: Episode) -> str:
+    spec = f" ({oxford_join(ep.specifics)})" if ep.specifics else ""
+    trig_bits = []
+    if ep.trig_mod: trig_bits.append(oxford_join(ep.trig_mod))
+    if ep.trig_nonmod: trig_bits.append(oxford_join(ep.trig_nonmod))
+    if ep.trig_free: trig_bits.append(ep.trig_free)
+    trig_txt = f" and potentially triggered by {oxford_join(trig_bits)}" if trig_bits else ""
+
+    disr_txt = ""
+    if ep.disrupt >= 3:
+        disr_txt = f" and caused {DISR_MAP.get(ep.disrupt, 'notable')} occupational disruption"
+
+    prev = oxford_join(ep.prevent)
+    prev_txt = f" Preventative strategies utilised included {prev}." if prev else ""
+
+    ints = oxford_join(ep.interventions)
+    ints_txt = f" Staff provided {ints} and made the care team aware." if ints else " Staff informed the care team."
+
+    eff_txt = ""
+    if prev or ints:
+        eff_txt = f" Strategies had {EFF_WORDS.get(ep.eff, ep.eff.lower())}."
+
+    med_txt = ""
+    if ep.med_given and ep.med_eff:
+        med_txt = f" Pharmacological intervention was administered with {MED_WORDS.get(ep.med_eff, ep.med_eff.lower())} reduction in behaviours."
+
+    when = f" at approximately {ep.time}" if ep.time else ""
+    return (
+        f"{ep.behaviour}{spec} was observed{when}, occurring {FREQ_WORDS.get(ep.freq, 'at times')} "
+        f"at a {SEV_WORDS.get(ep.sev, 'notable')} level{trig_txt}{disr_txt}.{prev_txt}{ints_txt}{eff_txt}{med_txt}"
+    )
+
+class SentenceCache:
+    """
+    Bounded LRU of rendered episode sentences, keyed by episode content.
+    Episodes are frozen, so equal content hashes equal and an edited episode is simply a new key;
+    stale sentences age out. Not thread-safe — keep one per session.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Episode, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def sentence(self, ep: Episode) -> str:
+        text = self._items.get(ep)
+        if text is not None:
+            self.hits += 1
+            self._items.move_to_end(ep)
+            return text
+        self.misses += 1
+        text = self._items[ep] = episode_sentence(ep)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+        return text
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"size": len(self._items), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate}
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.hits = self.misses = self.evictions = 0
+
+def build_note(record: ShiftRecord, cache: Optional[SentenceCache] = None) -> str:
+    """Render the shift note; pass a SentenceCache to reuse sentences for unchanged episodes."""
+    parts: List[str] = []
+
+    # Behaviours first so the baseline intro reflects whether anything was included
+    render = cache.sentence if cache is not None else episode_sentence
+    behaviour_parts = [render(ep) for ep in included_episodes(record)]
+    if behaviour_parts:
+        parts.append("Resident presented with the following behaviours of note this shift.")
+    else:
+        parts.append("Resident presented at baseline with no notable change in behaviour this shift.")
+
+    # ADLs
+    if record.adls_done:
+        parts.append(f"ADLs completed included {oxford_join(record.adls_done)}.")
+    if record.behaviour_management_done:
+        parts.append("Behaviour management strategies were implemented as required.")
+
+    # Behaviours
+    parts.extend(behaviour_parts)
+
+    # Care requirements
+    parts.append(
+        f"Resident was {record.receptiveness.lower()}, required {record.pa_assist} physical assistance "
+        f"and {record.adl_time.lower()} time to complete ADLs."
+    )
+
+    # Dietary intake
+    if record.intake == "None":
+        intake_txt = "Resident declined food and fluids at scheduled meal times"
+    elif record.intake == "All":
+        intake_txt = "Resident consumed all food and fluids at scheduled meal times"
+    else:
+        intake_txt = f"Resident consumed {record.intake} of food and fluids at scheduled meal times"
+    if record.meal_assist:
+        intake_txt += f" with {oxford_join([m.lower() for m in record.meal_assist])} assistance"
+    parts.append(intake_txt + ".")
+
+    # Activity & visitors
+    engagement = ENGAGEMENT_WORDS.get(record.engagement_level, record.engagement_level.lower())
+    parts.append(f"Resident {engagement} lifestyle activities.")
+    if record.engagement_behaviour_desc.strip():
+        parts.append(record.engagement_behaviour_desc.strip().rstrip(".") + ".")
+    if record.had_visitors:
+        who = oxford_join(record.visitor_types) or "visitors"
+        when = f" at approximately {oxford_join(record.visitor_times)}" if record.visitor_times else ""
+        parts.append(f"Resident was visited by {who}{when}.")
+
+    # End of shift
+    parts.append(f"At the end of shift, resident appeared {record.settledness.lower()}.")
+    if record.in_bed:
+        bed_bits = ["call bell left within reach"] if record.call_bell else []
+        if record.sensor_mats:
+            bed_bits.append(f"{record.sensor_mats} sensor mat{'s' if record.sensor_mats > 1 else ''} in situ")
+        if record.crash_mats:
+            bed_bits.append(f"{record.crash_mats} crash mat{'s' if record.crash_mats > 1 else ''} in situ")
+        bed_txt = f" with {oxford_join(bed_bits)}" if bed_bits else ""
+        parts.append(f"Resident was in bed at the time of report{bed_txt}.")
+    if record.ongoing.strip():
+        parts.append(f"Ongoing care/concerns: {record.ongoing.strip()}")
+
+    return " ".join(parts)
+
+# =========================
+# Batch rendering
+# =========================
+def iter_notes(records: Iterable[ShiftRecord], workers: int = 0, chunksize: int = 256) -> Iterator[str]:
+    """
+    Yield notes in input order. ``workers`` <= 1 renders in-process; otherwise
+    records are fanned out to a process pool in chunks of ``chunksize``.
+    """
+    if workers <= 1:
+        for record in records:
+            yield build_note(record)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(build_note, records, chunksize=chunksize)
+
+def render_notes(records: Iterable[ShiftRecord], workers: int = 0, chunksize: int = 256) -> List[str]:
+    return list(iter_notes(records, workers=workers, chunksize=chunksize))
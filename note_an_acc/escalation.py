@@ -0,0 +1,317 @@
+# note_an_acc/escalation.py
+# Streaming escalation detector over submitted episodes. Every saved shift is folded into state kept
+# per (resident, behaviour), and an alert is raised when, over the shifts in which that resident's
+# behaviour was recorded:
+#   - severity or frequency has climbed by Rules.rise or more within the last Rules.window shifts
+#     and this shift is a new high (e.g. sev 2 → 3 → 4);
+#   - the same manifestation (e.g. "Exit-seeking") has been recorded Rules.repeat shifts running;
+#   - sedative medication has had "No effect" Rules.no_effect administrations running.
+# Sightings more than Rules.max_gap_days apart start the behaviour's history afresh. Each track is a
+# fixed-size window plus a few counters, so an event costs the same however long the history is.
+#
+# Alerts are stored in the ``alerts`` table (shown on the ward dashboard until acknowledged);
+# --watch POSTs new ones to a local webhook:
+#
+#   POST <url>  {"alerts": [{"alert_id": ..., "resident_id": ..., "rule": ..., "detail": ..., ...}]}
+#
+# --replay runs the rules over stored history without recording anything, for tuning thresholds.
+#
+# Usage: python -m note_an_acc.escalation --replay [--from 2026-01-01] [--to 2026-03-31] [--rise 2] [--repeat 3]
+#        python -m note_an_acc.escalation --watch --url http://localhost:9000/alerts
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .engine import Episode, ShiftRecord
+from .outbox import post_json
+from .shifts import ShiftCalendar, load_calendar
+from .storage import DEFAULT_DB_PATH, ShiftStore, episode_from_row
+from .utils import oxford_join
+
+RULES = ("severity", "frequency", "manifestation", "medication")
+NO_EFFECT = "No effect"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass(frozen=True)
+class Rules:
+    rise: int = 2  # severity / frequency points gained within the window
+    window: int = 3  # shifts the rise is measured over
+    repeat: int = 3  # shifts running a manifestation must be recorded
+    no_effect: int = 2  # sedative administrations running with no effect
+    max_gap_days: int = 2
+
+    @property
+    def history_days(self) -> int:
+        """Days of history that can still contribute to an alert."""
+        return max(self.window, self.repeat, self.no_effect) * self.max_gap_days
+
+
+@dataclass(frozen=True)
+class Alert:
+    resident_id: str
+    ward: str
+    behaviour: str
+    rule: str  # one of RULES
+    shift_date: str
+    shift_type: str
+    detail: str
+
+
+class _Track:
+    """One resident's history of one behaviour: the last ``window`` shifts' peaks plus streak counters."""
+    __slots__ = ("last", "day", "sev", "freq", "streaks", "no_effect", "undo")
+
+    def __init__(self, window: int):
+        self.last: Optional[Tuple[str, int]] = None  # (shift_date, shift position) of the latest sighting
+        self.day: Optional[date] = None
+        self.sev: Deque[int] = deque(maxlen=window)
+        self.freq: Deque[int] = deque(maxlen=window)
+        self.streaks: Dict[str, int] = {}
+        self.no_effect = 0
+        self.undo: Optional[tuple] = None  # state before the latest sighting, for resubmissions
+
+    def _snapshot(self) -> tuple:
+        return self.last, self.day, tuple(self.sev), tuple(self.freq), self.streaks, self.no_effect
+
+    def _restore(self, snap: tuple) -> None:
+        self.last, self.day, sev, freq, self.streaks, self.no_effect = snap
+        self.sev.clear(); self.sev.extend(sev)
+        self.freq.clear(); self.freq.extend(freq)
+
+    def observe(self, order: Tuple[str, int], episodes: List[Episode], rules: Rules) -> List[Tuple[str, str]]:
+        """Fold in one shift's episodes of this behaviour; returns ``(rule, detail)`` for each alert."""
+        if self.last is not None and order < self.last:
+            return []  # a late submission for an earlier shift; --replay places it properly
+        if order == self.last and self.undo is not None:
+            self._restore(self.undo)  # the shift was resubmitted: replace its earlier version
+        day = date.fromisoformat(order[0])
+        if self.day is not None and (day - self.day).days > rules.max_gap_days:
+            self._restore((None, None, (), (), {}, 0))
+        self.undo = self._snapshot()
+        self.last, self.day = order, day
+
+        alerts = []
+        for name, scores, value in (("severity", self.sev, max(ep.sev for ep in episodes)),
+                                    ("frequency", self.freq, max(ep.freq for ep in episodes))):
+            scores.append(value)  # evicts the oldest first, so the rise is measured over the window only
+            previous = list(scores)[:-1]
+            low = min(scores)
+            if previous and value > max(previous) and value - low >= rules.rise:
+                alerts.append((name, f"{name.capitalize()} rose from {low} to {value} within {len(scores)} shifts"))
+
+        seen = {s for ep in episodes for s in ep.specifics}
+        self.streaks = {s: self.streaks.get(s, 0) + 1 for s in seen}
+        repeated = sorted(s for s in seen if self.streaks[s] == rules.repeat)
+        if repeated:
+            alerts.append(("manifestation", f"{oxford_join(repeated)} recorded {rules.repeat} shifts running"))
+
+        # Each administration, in the order recorded, extends or resets the run; one alert per shift
+        reached = False
+        for ep in episodes:
+            if ep.med_given:
+                self.no_effect = self.no_effect + 1 if ep.med_eff == NO_EFFECT else 0
+                reached = reached or self.no_effect == rules.no_effect
+        if reached:
+            alerts.append(("medication", f"Sedative had no effect {rules.no_effect} administrations running"))
+        return alerts
+
+    def withdraw(self, order: Tuple[str, int]) -> None:
+        """The shift at ``order`` was resubmitted without this behaviour: forget that sighting."""
+        if order == self.last and self.undo is not None:
+            self._restore(self.undo)
+            self.undo = None
+
+
+class EscalationDetector:
+    """
+    Per (resident, behaviour) tracks, shared across Streamlit sessions. ``apply_shift`` is called as
+    shifts are saved; ``load`` warms the tracks from recent history without raising anything.
+    """
+
+    def __init__(self, rules: Rules = Rules(), calendar: Optional[ShiftCalendar] = None):
+        self.rules = rules
+        self.shift_order = {name: i for i, name in enumerate((calendar or load_calendar()).names)}
+        self.tracks: Dict[Tuple[str, str], _Track] = {}
+        self.behaviours: Dict[str, Set[str]] = {}  # per resident, the behaviours with a track
+        self.events = 0
+        self.lock = threading.Lock()
+
+    def observe(self, resident_id: str, ward: str, shift_date: str, shift_type: str,
+                episodes: Iterable[Episode]) -> List[Alert]:
+        order = (shift_date, self.shift_order.get(shift_type, len(self.shift_order)))
+        by_behaviour: Dict[str, List[Episode]] = {}
+        for ep in episodes:
+            by_behaviour.setdefault(ep.behaviour, []).append(ep)
+        out = []
+        with self.lock:
+            known = self.behaviours.setdefault(resident_id, set())
+            for behaviour in known - by_behaviour.keys():
+                self.tracks[(resident_id, behaviour)].withdraw(order)
+            known.update(by_behaviour)
+            for behaviour, eps in by_behaviour.items():
+                track = self.tracks.get((resident_id, behaviour))
+                if track is None:
+                    track = self.tracks[(resident_id, behaviour)] = _Track(self.rules.window)
+                self.events += 1
+                out += [Alert(resident_id, ward, behaviour, rule, shift_date, shift_type, detail)
+                        for rule, detail in track.observe(order, eps, self.rules)]
+        return out
+
+    def apply_shift(self, record: ShiftRecord, ward: str = "") -> List[Alert]:
+        """
+        Fold a newly saved shift in; a resubmission replaces the earlier version of that shift,
+        including sightings of behaviours it no longer records.
+        """
+        return self.observe(record.resident_id, ward, record.shift_date, record.shift_type, record.episodes)
+
+    def replay(self, shifts: Iterable[Tuple[str, str, str, str, List[Episode]]]) -> Iterator[Alert]:
+        for shift in shifts:
+            yield from self.observe(*shift)
+
+    @classmethod
+    def load(cls, store: ShiftStore, as_of: date, rules: Rules = Rules(),
+             calendar: Optional[ShiftCalendar] = None) -> "EscalationDetector":
+        """Warm every track from the stored history that can still contribute to an alert."""
+        detector = cls(rules, calendar)
+        start = (as_of - timedelta(days=rules.history_days)).isoformat()
+        for _ in detector.replay(stored_shifts(store, start, as_of.isoformat(), detector.shift_order)):
+            pass
+        return detector
+
+def stored_shifts(store: ShiftStore, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                shift_order: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, str, str, str, List[Episode]]]:
+    """Stored shifts as ``(resident_id, ward, shift_date, shift_type, episodes)`` in shift order."""
+    names = sorted(shift_order or {}, key=(shift_order or {}).get)
+    rows = store.connection().execute(
+        "SELECT e.*, s.shift_type, r.ward FROM episodes e JOIN shifts s ON s.shift_id = e.shift_id "
+        "JOIN residents r ON r.resident_id = e.resident_id LEFT JOIN json_each(?) o ON o.value = s.shift_type "
+        "WHERE e.shift_date >= ? AND e.shift_date <= ? "
+        "ORDER BY e.shift_date, COALESCE(o.key, 1e9), s.shift_type, e.shift_id, e.episode_id",
+        (json.dumps(names), date_from or "", date_to or "9999"),
+    )
+    for _, group in groupby(rows, key=lambda r: r["shift_id"]):
+        group = list(group)
+        first = group[0]
+        yield (first["resident_id"], first["ward"], first["shift_date"], first["shift_type"],
+               [episode_from_row(r) for r in group])
+
+# =========================
+# Alert queue (the dashboard reads it, --watch delivers it)
+# =========================
+def record_alerts(store: ShiftStore, alerts: Iterable[Alert]) -> int:
+    """Store alerts, skipping any already raised for that shift; an empty ward is the resident's ward."""
+    with store.transaction() as conn:
+        return conn.executemany(
+            "INSERT INTO alerts (resident_id, ward, behaviour, rule, shift_date, shift_type, detail, created_at) "
+            "VALUES (?, COALESCE(NULLIF(?, ''), (SELECT ward FROM residents WHERE resident_id = ?), ''), "
+            "?, ?, ?, ?, ?, ?) ON CONFLICT (resident_id, behaviour, rule, shift_date, shift_type) DO NOTHING",
+            [(a.resident_id, a.ward, a.resident_id, a.behaviour, a.rule, a.shift_date, a.shift_type, a.detail, _now())
+             for a in alerts],
+        ).rowcount
+
+def open_alerts(store: ShiftStore, ward: str, limit: int = 50) -> List[dict]:
+    """The ward's unacknowledged alerts, newest first."""
+    rows = store.connection().execute(
+        "SELECT * FROM alerts WHERE ward = ? AND acknowledged_at IS NULL ORDER BY alert_id DESC LIMIT ?",
+        (ward, limit),
+    )
+    return [dict(r) for r in rows]
+
+def acknowledge(store: ShiftStore, alert_ids: Iterable[int]) -> None:
+    with store.transaction() as conn:
+        conn.executemany("UPDATE alerts SET acknowledged_at = ? WHERE alert_id = ?",
+                         [(_now(), i) for i in alert_ids])
+
+async def deliver(store: ShiftStore, url: str, batch: int = 50, timeout: float = 10.0) -> int:
+    """POST undelivered alerts in batches; returns how many were accepted. Failures stay queued."""
+    sent = 0
+    while True:
+        rows = await asyncio.to_thread(lambda: [dict(r) for r in store.connection().execute(
+            "SELECT * FROM alerts WHERE delivered_at IS NULL ORDER BY alert_id LIMIT ?", (batch,))])
+        if not rows:
+            return sent
+        status, body = await post_json(url, {"alerts": rows}, {}, timeout)
+        if not 200 <= status < 300:
+            raise OSError(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+
+        def mark() -> None:
+            with store.transaction() as conn:
+                conn.executemany("UPDATE alerts SET delivered_at = ? WHERE alert_id = ?",
+                                 [(_now(), r["alert_id"]) for r in rows])
+        await asyncio.to_thread(mark)
+        sent += len(rows)
+
+async def watch(store: ShiftStore, url: str, poll_interval: float = 2.0, timeout: float = 10.0) -> None:
+    while True:
+        try:
+            n = await deliver(store, url, timeout=timeout)
+            if n:
+                print(f"Delivered {n} alert(s)", file=sys.stderr)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError, asyncio.IncompleteReadError) as exc:
+            print(f"Delivery failed, will retry: {type(exc).__name__}: {exc}", file=sys.stderr)
+        await asyncio.sleep(poll_interval)
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Escalation alerts over stored episodes")
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--replay", action="store_true", help="run the rules over stored history and report")
+    mode.add_argument("--watch", action="store_true", help="POST new alerts to --url as they are raised")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--url", default=os.environ.get("NOTE_AN_ACC_ALERT_URL"))
+    ap.add_argument("--from", dest="date_from", help="first shift date (YYYY-MM-DD)")
+    ap.add_argument("--to", dest="date_to", help="last shift date (YYYY-MM-DD)")
+    ap.add_argument("--rise", type=int, default=Rules.rise)
+    ap.add_argument("--window", type=int, default=Rules.window)
+    ap.add_argument("--repeat", type=int, default=Rules.repeat)
+    ap.add_argument("--no-effect", type=int, default=Rules.no_effect)
+    ap.add_argument("--max-gap-days", type=int, default=Rules.max_gap_days)
+    ap.add_argument("--record", action="store_true", help="with --replay, also store the alerts it raises")
+    ap.add_argument("--jsonl", action="store_true", help="with --replay, print alerts as JSON lines")
+    args = ap.parse_args(argv)
+
+    store = ShiftStore(args.db)
+    if args.watch:
+        if not args.url:
+            ap.error("--url (or NOTE_AN_ACC_ALERT_URL) is required with --watch")
+        try:
+            asyncio.run(watch(store, args.url))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    rules = Rules(args.rise, args.window, args.repeat, args.no_effect, args.max_gap_days)
+    detector = EscalationDetector(rules)
+    started = time.perf_counter()
+    alerts = list(detector.replay(stored_shifts(store, args.date_from, args.date_to, detector.shift_order)))
+    elapsed = time.perf_counter() - started
+    for a in alerts:
+        if args.jsonl:
+            print(json.dumps(asdict(a), ensure_ascii=False))
+        else:
+            print(f"{a.shift_date} {a.shift_type:<9} {a.resident_id} ({a.ward or '-'})  {a.behaviour}: {a.detail}")
+    by_rule = Counter(a.rule for a in alerts)
+    print(f"{len(alerts)} alert(s) from {detector.events:,} behaviour-shifts in {elapsed:.2f}s; "
+          + ", ".join(f"{r} {by_rule[r]}" for r in RULES), file=sys.stderr)
+    if args.record:
+        print(f"Recorded {record_alerts(store, alerts)} new alert(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
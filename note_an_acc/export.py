@@ -0,0 +1,214 @@
+# note_an_acc/export.py
+# Streaming bulk export of shift records (with note text) and episodes to CSV, JSONL or Parquet.
+# Rows are pulled from SQLite in chunks and written as they arrive, so memory stays bounded.
+#
+# Usage: python -m note_an_acc.export --kind episodes --format parquet --out episodes.parquet \
+#            [--resident R0001] [--from 2026-01-01] [--to 2026-12-31] [--domain Agitation] [--subdomain Verbal]
+
+import argparse
+import csv
+import io
+import json
+import sys
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from .catalogue import load_catalogue
+from .storage import DEFAULT_DB_PATH, ShiftStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+KINDS = ("shifts", "episodes")
+FORMATS = ("csv", "jsonl", "parquet")
+CHUNK_SIZE = 5000
+
+SHIFT_COLUMNS = (
+    "resident_id", "ward", "shift_date", "shift_type", "settledness", "in_bed", "included",
+    "peak_sev", "sedatives", "submitted_by", "submitted_at", "note",
+)
+EPISODE_COLUMNS = (
+    "resident_id", "ward", "shift_date", "shift_type", "slot", "domain", "subdomain", "behaviour",
+    "freq", "sev", "disrupt", "included", "specifics", "trig_mod", "trig_nonmod", "trig_free",
+    "prevent", "interventions", "eff", "med_given", "med_eff",
+)
+LIST_COLUMNS = {"specifics", "trig_mod", "trig_nonmod", "prevent", "interventions"}
+INT_COLUMNS = {"in_bed", "included", "peak_sev", "sedatives", "freq", "sev", "disrupt", "med_given"}
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    resident_id: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    domain: Optional[str] = None
+    subdomain: Optional[str] = None
+
+    def behaviours(self) -> Optional[Tuple[str, ...]]:
+        if not self.domain:
+            return None
+        cat = load_catalogue()
+        if self.domain not in cat.domains:
+            raise ValueError(f"Unknown domain: {self.domain}")
+        if self.subdomain and self.subdomain not in cat.domains[self.domain]:
+            raise ValueError(f"Unknown subdomain for {self.domain}: {self.subdomain}")
+        return cat.in_domain(self.domain, self.subdomain or None)
+
+    def where(self, alias: str) -> Tuple[str, list]:
+        sql, args = [], []
+        if self.resident_id:
+            sql.append(f"{alias}.resident_id = ?"); args.append(self.resident_id)
+        if self.date_from:
+            sql.append(f"{alias}.shift_date >= ?"); args.append(self.date_from)
+        if self.date_to:
+            sql.append(f"{alias}.shift_date <= ?"); args.append(self.date_to)
+        return " AND ".join(sql) or "1 = 1", args
+
+
+def _fetch(store: ShiftStore, sql: str, args: list, chunk_size: int) -> Iterator[tuple]:
+    cur = store.connection().execute(sql, args)
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+def iter_rows(store: ShiftStore, kind: str, flt: ExportFilter = ExportFilter(),
+              chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield export rows one at a time, reading ``chunk_size`` rows per fetch."""
+    behaviours = flt.behaviours()
+    if kind == "shifts":
+        where, args = flt.where("s")
+        if behaviours is not None:
+            where += (f" AND EXISTS (SELECT 1 FROM episodes e WHERE e.shift_id = s.shift_id "
+                      f"AND e.behaviour IN ({', '.join('?' * len(behaviours))}))")
+            args += list(behaviours)
+        sql = (
+            "SELECT s.resident_id, r.ward, s.shift_date, s.shift_type, s.settledness, s.in_bed, s.included, "
+            "s.peak_sev, s.sedatives, s.submitted_by, s.submitted_at, COALESCE(n.body, '') "
+            "FROM shifts s JOIN residents r USING (resident_id) LEFT JOIN notes n USING (shift_id) "
+            f"WHERE {where} ORDER BY s.shift_date, s.resident_id, s.shift_type"
+        )
+        for row in _fetch(store, sql, args, chunk_size):
+            yield dict(zip(SHIFT_COLUMNS, row))
+    elif kind == "episodes":
+        where, args = flt.where("e")
+        if behaviours is not None:
+            where += f" AND e.behaviour IN ({', '.join('?' * len(behaviours))})"
+            args += list(behaviours)
+        sql = (
+            "SELECT e.resident_id, r.ward, e.shift_date, s.shift_type, e.slot, e.behaviour, e.freq, e.sev, "
+            "e.disrupt, e.included, e.specifics, e.trig_mod, e.trig_nonmod, e.trig_free, e.prevent, "
+            "e.interventions, e.eff, e.med_given, e.med_eff "
+            "FROM episodes e JOIN shifts s USING (shift_id) JOIN residents r ON r.resident_id = e.resident_id "
+            f"WHERE {where} ORDER BY e.shift_date, e.resident_id, e.slot"
+        )
+        cat = load_catalogue()
+        cols = [c for c in EPISODE_COLUMNS if c not in ("domain", "subdomain")]
+        for row in _fetch(store, sql, args, chunk_size):
+            d = dict(zip(cols, row))
+            entry = cat.get(d["behaviour"])
+            d["domain"] = entry.domain if entry else ""
+            d["subdomain"] = entry.subdomain if entry else ""
+            for c in LIST_COLUMNS:
+                d[c] = json.loads(d[c])
+            yield {c: d[c] for c in EPISODE_COLUMNS}
+    else:
+        raise ValueError(f"Unknown export kind: {kind} (expected one of {', '.join(KINDS)})")
+
+# =========================
+# Writers
+# =========================
+def columns_for(kind: str) -> Tuple[str, ...]:
+    return SHIFT_COLUMNS if kind == "shifts" else EPISODE_COLUMNS
+
+def write_csv(rows: Iterable[dict], fh: IO[str], columns: Tuple[str, ...]) -> int:
+    writer = csv.writer(fh)
+    writer.writerow(columns)
+    n = 0
+    for row in rows:
+        writer.writerow(["; ".join(row[c]) if c in LIST_COLUMNS else row[c] for c in columns])
+        n += 1
+    return n
+
+def write_jsonl(rows: Iterable[dict], fh: IO[str]) -> int:
+    n = 0
+    for row in rows:
+        fh.write(json.dumps(row, ensure_ascii=False))
+        fh.write("\n")
+        n += 1
+    return n
+
+def _arrow_schema(columns: Tuple[str, ...]):
+    def typ(c):
+        if c in LIST_COLUMNS:
+            return pa.list_(pa.string())
+        if c in INT_COLUMNS:
+            return pa.int32()
+        return pa.string()
+    return pa.schema([(c, typ(c)) for c in columns])
+
+def write_parquet(rows: Iterable[dict], sink, columns: Tuple[str, ...], chunk_size: int = CHUNK_SIZE) -> int:
+    """Write one Parquet row group per ``chunk_size`` rows."""
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet export (pip install pyarrow)")
+    schema = _arrow_schema(columns)
+    n = 0
+    with pq.ParquetWriter(sink, schema) as writer:
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                n += len(batch)
+                batch = []
+        if batch or not n:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+def export(store: ShiftStore, kind: str, fmt: str, out, flt: ExportFilter = ExportFilter(),
+           chunk_size: int = CHUNK_SIZE) -> int:
+    """Stream an export to ``out`` (a path, or a binary file object); returns the row count."""
+    rows = iter_rows(store, kind, flt, chunk_size)
+    columns = columns_for(kind)
+    if fmt == "parquet":
+        return write_parquet(rows, out, columns, chunk_size)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(FORMATS)})")
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8", newline="") as fh:
+            return write_csv(rows, fh, columns) if fmt == "csv" else write_jsonl(rows, fh)
+    fh = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        return write_csv(rows, fh, columns) if fmt == "csv" else write_jsonl(rows, fh)
+    finally:
+        fh.detach()
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Export shift records or episodes")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--kind", choices=KINDS, default="shifts")
+    ap.add_argument("--format", choices=FORMATS, default="csv")
+    ap.add_argument("--out", required=True, help="output file path")
+    ap.add_argument("--resident")
+    ap.add_argument("--from", dest="date_from", help="first shift date (YYYY-MM-DD)")
+    ap.add_argument("--to", dest="date_to", help="last shift date (YYYY-MM-DD)")
+    ap.add_argument("--domain")
+    ap.add_argument("--subdomain")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = ap.parse_args(argv)
+
+    flt = ExportFilter(args.resident, args.date_from, args.date_to, args.domain, args.subdomain)
+    n = export(ShiftStore(args.db), args.kind, args.format, args.out, flt, args.chunk_size)
+    print(f"Exported {n} {args.kind} row(s) to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
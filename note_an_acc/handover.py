@@ -0,0 +1,199 @@
+# note_an_acc/handover.py
+# Ward handover pack for the End of shift / ATOR window: for every resident on the ward, the shift
+# note, included episodes, sedative use, bed status and ongoing concerns, as one HTML document
+# (or PDF when WeasyPrint is installed). The ward's records are loaded with two queries; resident
+# sections are rendered (on a process pool for large wards) and streamed into the output in ward order.
+#
+# Usage: python -m note_an_acc.handover --ward A --date 2026-01-01 --shift Morning [--out handover.html]
+#        [--pdf] [--workers 4]
+
+import argparse
+import html
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .engine import ShiftRecord, included_episodes
+from .storage import DEFAULT_DB_PATH, ShiftStore, episode_from_row
+
+try:
+    import weasyprint
+except ImportError:  # only needed for PDF output
+    weasyprint = None
+
+CHUNKSIZE = 8
+# Rendering a section takes ~0.1 ms, so below this many residents pool start-up costs more than it saves
+POOL_MIN = 300
+
+STYLE = """
+body { font-family: system-ui, sans-serif; font-size: 11pt; margin: 1.5em; }
+h1 { margin-bottom: 0.2em; } .meta { color: #555; }
+.summary td { padding: 0.2em 1.2em 0.2em 0; }
+section.resident { border-top: 2px solid #333; padding-top: 0.6em; margin-top: 1.2em; page-break-inside: avoid; }
+section.missing { color: #a33; }
+table.episodes { border-collapse: collapse; width: 100%; margin: 0.4em 0; }
+table.episodes th, table.episodes td { border: 1px solid #bbb; padding: 0.2em 0.4em; text-align: left; vertical-align: top; }
+.flag { font-weight: bold; color: #a33; } .note { white-space: pre-wrap; }
+"""
+
+
+@dataclass(frozen=True)
+class HandoverEntry:
+    resident_id: str
+    name: str
+    record: Optional[ShiftRecord]  # None when no shift record was submitted
+    note: str = ""
+
+
+def load_ward(store: ShiftStore, ward: str, shift_date: str, shift_type: str) -> List[HandoverEntry]:
+    """Every resident on ``ward``, with their record and note for the shift where one exists."""
+    conn = store.connection()
+    rows = conn.execute(
+        "SELECT r.resident_id, r.name, s.shift_id, s.record, n.body FROM residents r "
+        "LEFT JOIN shifts s ON s.resident_id = r.resident_id AND s.shift_date = ? AND s.shift_type = ? "
+        "LEFT JOIN notes n ON n.shift_id = s.shift_id WHERE r.ward = ? ORDER BY r.resident_id",
+        (shift_date, shift_type, ward),
+    ).fetchall()
+    shift_ids = [r["shift_id"] for r in rows if r["shift_id"] is not None]
+    episodes = {}
+    for e in conn.execute(
+        "SELECT * FROM episodes WHERE shift_id IN (SELECT value FROM json_each(?)) ORDER BY shift_id, episode_id",
+        (json.dumps(shift_ids),),
+    ):
+        episodes.setdefault(e["shift_id"], []).append(episode_from_row(e))
+    entries = []
+    for r in rows:
+        record = None
+        if r["shift_id"] is not None:
+            d = json.loads(r["record"])
+            d["episodes"] = episodes.get(r["shift_id"], [])
+            record = ShiftRecord.from_dict(d)
+        entries.append(HandoverEntry(r["resident_id"], r["name"], record, r["body"] or ""))
+    return entries
+
+# =========================
+# Rendering
+# =========================
+def _e(text) -> str:
+    return html.escape(str(text))
+
+def _yes(flag: bool) -> str:
+    return "yes" if flag else "no"
+
+def render_section(entry: HandoverEntry) -> str:
+    """One resident's handover section (runs on the worker processes)."""
+    title = f"{_e(entry.name)} ({_e(entry.resident_id)})" if entry.name else _e(entry.resident_id)
+    r = entry.record
+    if r is None:
+        return (f'<section class="resident missing"><h2>{title}</h2>'
+                f"<p>No shift record submitted.</p></section>\n")
+
+    included = included_episodes(r)
+    sedatives = [ep for ep in r.episodes if ep.med_given]
+    out = [f'<section class="resident"><h2>{title}</h2>']
+    bed = (f"in bed; call bell within reach: {_yes(r.call_bell)}; sensor mats: {r.sensor_mats}; "
+           f"crash mats: {r.crash_mats}" if r.in_bed else "not in bed")
+    unsettled = ' class="flag"' if r.settledness != "Settled" else ""
+    out.append(f"<p><span{unsettled}>{_e(r.settledness)}</span> · {_e(bed)}</p>")
+
+    if included:
+        out.append('<table class="episodes"><tr><th>Time</th><th>Behaviour</th><th>F/S/D</th>'
+                   "<th>Triggers</th><th>Managed with</th><th>Effect</th></tr>")
+        for ep in included:
+            triggers = ", ".join(ep.trig_mod + ep.trig_nonmod + ((ep.trig_free,) if ep.trig_free else ()))
+            out.append(
+                f"<tr><td>{_e(ep.time)}</td><td>{_e(ep.behaviour)}</td><td>{ep.freq}/{ep.sev}/{ep.disrupt}</td>"
+                f"<td>{_e(triggers)}</td><td>{_e(', '.join(ep.prevent + ep.interventions))}</td><td>{_e(ep.eff)}</td></tr>"
+            )
+        out.append("</table>")
+    else:
+        out.append(f"<p>No episodes met the inclusion rules ({len(r.episodes)} recorded).</p>")
+
+    if sedatives:
+        given = "; ".join(f"{ep.behaviour} at {ep.time} ({ep.med_eff or 'effect not recorded'})" for ep in sedatives)
+        out.append(f'<p class="flag">Sedative medication: {_e(given)}</p>')
+    if r.ongoing:
+        out.append(f"<p><b>Ongoing concerns:</b> {_e(r.ongoing)}</p>")
+    if entry.note:
+        out.append(f'<p class="note">{_e(entry.note)}</p>')
+    out.append("</section>\n")
+    return "".join(out)
+
+def render_sections(entries: Sequence[HandoverEntry], workers: int = 0, pool_min: int = POOL_MIN) -> Iterator[str]:
+    """Sections in ward order; fanned out to a process pool when ``workers`` > 1 and there are enough."""
+    if workers <= 1 or len(entries) < pool_min:
+        yield from map(render_section, entries)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(render_section, entries, chunksize=CHUNKSIZE)
+
+def summary(entries: Sequence[HandoverEntry]) -> List[Tuple[str, int]]:
+    records = [e.record for e in entries if e.record is not None]
+    return [
+        ("Residents", len(entries)),
+        ("Not yet reported", len(entries) - len(records)),
+        ("Included episodes", sum(len(included_episodes(r)) for r in records)),
+        ("Sedatives given", sum(ep.med_given for r in records for ep in r.episodes)),
+        ("Unsettled", sum(r.settledness != "Settled" for r in records)),
+        ("In bed", sum(r.in_bed for r in records)),
+    ]
+
+def write_handover(out: TextIO, store: ShiftStore, ward: str, shift_date: str, shift_type: str,
+                   workers: int = 0, pool_min: int = POOL_MIN) -> int:
+    """Stream the ward's handover pack as HTML into ``out``; returns the number of residents."""
+    entries = load_ward(store, ward, shift_date, shift_type)
+    out.write(f'<!DOCTYPE html><html lang="en-AU"><head><meta charset="utf-8">'
+              f"<title>Handover – Ward {_e(ward)} – {_e(shift_date)} {_e(shift_type)}</title>"
+              f"<style>{STYLE}</style></head><body>\n")
+    out.write(f"<h1>Ward {_e(ward)} handover</h1>"
+              f'<p class="meta">{_e(shift_type)} shift, {_e(shift_date)} · generated {time.strftime("%H:%M")}</p>\n')
+    out.write('<table class="summary"><tr>' + "".join(f"<td>{k}: <b>{v}</b></td>" for k, v in summary(entries))
+              + "</tr></table>\n")
+    for section in render_sections(entries, workers, pool_min):
+        out.write(section)
+    out.write("</body></html>\n")
+    return len(entries)
+
+def html_to_pdf(document: str, out) -> None:
+    """Render a finished HTML document to PDF (needs WeasyPrint)."""
+    if weasyprint is None:
+        raise ImportError("weasyprint is required for PDF handover packs (pip install weasyprint)")
+    weasyprint.HTML(string=document).write_pdf(out)
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Ward handover pack")
+    ap.add_argument("--ward", required=True)
+    ap.add_argument("--date", required=True, help="shift date (YYYY-MM-DD)")
+    ap.add_argument("--shift", required=True, help="shift type, e.g. Morning")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--out", help="output file (default: stdout for HTML)")
+    ap.add_argument("--pdf", action="store_true", help="write PDF instead of HTML (needs weasyprint)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    store = ShiftStore(args.db)
+    started = time.perf_counter()
+    if args.pdf:
+        if not args.out:
+            ap.error("--pdf needs --out")
+        buf = io.StringIO()
+        n = write_handover(buf, store, args.ward, args.date, args.shift, args.workers)
+        html_to_pdf(buf.getvalue(), args.out)
+    elif args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            n = write_handover(fh, store, args.ward, args.date, args.shift, args.workers)
+    else:
+        n = write_handover(sys.stdout, store, args.ward, args.date, args.shift, args.workers)
+    print(f"{n} resident(s) in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
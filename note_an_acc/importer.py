@@ -0,0 +1,306 @@
+# note_an_acc/importer.py
+# Parallel bulk import of historical behaviour charts (CSV or JSONL, one episode per row).
+# Rows are read in chunks, validated against the catalogue on a process pool and written to the
+# store in batches; invalid rows are reported individually and never abort the import.
+#
+# Columns match the episodes export: resident_id, ward, shift_date, shift_type, slot, behaviour,
+# freq, sev, disrupt, specifics, trig_mod, trig_nonmod, trig_free, prevent, interventions, eff,
+# med_given, med_eff. List columns are "; "-separated in CSV and arrays in JSONL.
+#
+# Each imported episode is keyed by a digest of its validated content, so re-running an import, or
+# importing an export that overlaps an earlier one, skips rows already stored (reported as "already
+# present") whatever the files are called.
+#
+# Usage: python -m note_an_acc.importer charts.csv [--workers 4] [--errors import_errors.csv]
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .catalogue import Catalogue, load_facility_catalogue
+from .engine import EFFECT_SCALE, MED_EFFECT, Episode, ShiftRecord
+from .shifts import ShiftDef, load_calendar
+from .storage import DEFAULT_DB_PATH, ShiftStore
+
+CHUNK_SIZE = 10_000
+REQUIRED = ("resident_id", "shift_date", "shift_type", "slot", "behaviour", "freq", "sev", "disrupt")
+TRUE_WORDS = {"1", "true", "yes", "y"}
+# ShiftRecord fields by JSON type, for validate_record
+TEXT_FIELDS = ("receptiveness", "pa_assist", "adl_time", "intake", "engagement_level", "engagement_behaviour_desc",
+               "settledness", "ongoing")
+LIST_FIELDS = ("adls_done", "meal_assist", "visitor_types", "visitor_times")
+FLAG_FIELDS = ("behaviour_management_done", "had_visitors", "in_bed", "call_bell")
+
+# (resident_id, shift_date, shift_type, ward, episode, row_key) — the shape ShiftStore.import_episodes takes
+ImportRow = Tuple[str, str, str, str, Episode, str]
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    field: str
+    message: str
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    valid: int = 0
+    imported: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    @property
+    def skipped(self) -> int:
+        """Valid rows already stored, by an earlier import or earlier in this file."""
+        return self.valid - self.imported
+
+# =========================
+# Validation (runs in worker processes)
+# =========================
+def _score(raw: dict, name: str, lo: int, hi: int) -> int:
+    try:
+        v = int(str(raw.get(name, "")).strip())
+    except ValueError:
+        raise ValueError(f"{name}: must be a whole number") from None
+    if not lo <= v <= hi:
+        raise ValueError(f"{name}: must be within {lo}–{hi}")
+    return v
+
+def _items(value) -> Tuple[str, ...]:
+    if value is None or value == "":
+        return ()
+    if isinstance(value, list):
+        return tuple(str(v).strip() for v in value if str(v).strip())
+    return tuple(v.strip() for v in str(value).split(";") if v.strip())
+
+def _list(raw: dict, name: str) -> Tuple[str, ...]:
+    # JSON records: list fields must be arrays, never a bare string to be split into characters
+    value = raw.get(name)
+    if value is None:
+        return ()
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{name}: must be a list of strings")
+    return tuple(v.strip() for v in value if v.strip())
+
+def _text(raw: dict, name: str, default: str = "") -> str:
+    value = raw.get(name, default)
+    if not isinstance(value, str):
+        raise ValueError(f"{name}: must be a string")
+    return value.strip()
+
+def _shift(shift_type: str) -> ShiftDef:
+    shift = load_calendar().get(shift_type)
+    if shift is None:
+        raise ValueError(f"shift_type: unknown shift {shift_type!r}")
+    return shift
+
+def _iso_date(shift_date: str) -> str:
+    try:
+        date.fromisoformat(shift_date)
+    except ValueError:
+        raise ValueError(f"shift_date: not an ISO date (YYYY-MM-DD): {shift_date!r}") from None
+    return shift_date
+
+def _episode(raw: dict, cat: Catalogue, shift: ShiftDef, slot: str,
+             items: Callable[[dict, str], Tuple[str, ...]], slot_field: str = "slot") -> Episode:
+    """The episode-level rules shared by import rows and API records."""
+    if slot and slot not in shift.index:
+        raise ValueError(f"{slot_field}: {slot!r} is not a {shift.name} charting slot")
+    behaviour = str(raw["behaviour"]).strip()
+    entry = cat.get(behaviour)
+    if entry is None:
+        raise ValueError(f"behaviour: {behaviour!r} is not in the behaviour catalogue")
+    specifics = items(raw, "specifics")
+    unknown = [s for s in specifics if s not in entry.details]
+    if unknown:
+        raise ValueError(f"specifics: not listed for {behaviour}: {', '.join(unknown)}")
+
+    # Same bounds as the app's sliders
+    scores = {name: _score(raw, name, lo, hi) for name, lo, hi in (("freq", 1, 4), ("sev", 1, 4), ("disrupt", 0, 4))}
+
+    eff = str(raw.get("eff") or EFFECT_SCALE[0]).strip()
+    if eff not in EFFECT_SCALE:
+        raise ValueError(f"eff: expected one of {', '.join(EFFECT_SCALE)}")
+    med_given = str(raw.get("med_given", "")).strip().lower() in TRUE_WORDS
+    med_eff = str(raw.get("med_eff") or "").strip() or None
+    if med_given:
+        med_eff = med_eff or MED_EFFECT[0]
+        if med_eff not in MED_EFFECT:
+            raise ValueError(f"med_eff: expected one of {', '.join(MED_EFFECT)}")
+    else:
+        med_eff = None
+
+    return Episode(
+        behaviour=entry.name, specifics=specifics, time=slot,
+        trig_mod=items(raw, "trig_mod"), trig_nonmod=items(raw, "trig_nonmod"),
+        trig_free=str(raw.get("trig_free") or "").strip(),
+        prevent=items(raw, "prevent"), interventions=items(raw, "interventions"),
+        eff=eff, med_given=med_given, med_eff=med_eff, **scores,
+    )
+
+def row_key(resident_id: str, shift_date: str, shift_type: str, ep: Episode) -> str:
+    """Content digest identifying an imported episode, independent of the file and line it came from."""
+    data = json.dumps([resident_id, shift_date, shift_type, ep.to_dict()], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+def validate_row(raw: dict, facility: str = "") -> ImportRow:
+    """Return the import row for one input record, or raise ValueError naming the bad field."""
+    for name in REQUIRED:
+        if str(raw.get(name, "")).strip() == "":
+            raise ValueError(f"{name}: missing")
+    shift_date = _iso_date(str(raw["shift_date"]).strip())
+    shift = _shift(str(raw["shift_type"]).strip())
+    ep = _episode(raw, load_facility_catalogue(facility), shift, str(raw["slot"]).strip(),
+                  lambda r, name: _items(r.get(name)))
+    resident_id = str(raw["resident_id"]).strip()
+    return (resident_id, shift_date, shift.name, str(raw.get("ward") or "").strip(), ep,
+            row_key(resident_id, shift_date, shift.name, ep))
+
+def validate_record(raw: dict, facility: str = "") -> ShiftRecord:
+    """
+    Check a record in the ShiftRecord.to_dict() shape (as the note service receives it) with the
+    import rules, plus JSON types: list fields are arrays, flags are booleans, text is text. Raises
+    ValueError naming the bad field (``episodes[1].sev: …``).
+    """
+    shift_date = _text(raw, "shift_date")
+    shift = _shift(_text(raw, "shift_type") or load_calendar().default)
+    out = {name: _text(raw, name) for name in TEXT_FIELDS if name in raw}
+    out.update((name, _list(raw, name)) for name in LIST_FIELDS)
+    for name in FLAG_FIELDS:
+        if not isinstance(raw.get(name, False), bool):
+            raise ValueError(f"{name}: must be true or false")
+        out[name] = raw.get(name, False)
+    # Same bounds as the app's number inputs
+    out.update((name, _score(raw, name, 0, 2)) for name in ("sensor_mats", "crash_mats") if name in raw)
+
+    episodes = raw.get("episodes") or []
+    if not isinstance(episodes, list):
+        raise ValueError("episodes: must be a list")
+    cat = load_facility_catalogue(facility)
+    checked = []
+    for i, ep in enumerate(episodes):
+        try:
+            if not isinstance(ep, dict):
+                raise ValueError("episode: must be an object")
+            if not isinstance(ep.get("med_given", False), bool):
+                raise ValueError("med_given: must be true or false")
+            defaults = {"freq": 1, "sev": 1, "disrupt": 0}
+            checked.append(_episode({**defaults, **ep}, cat, shift, _text(ep, "time"), _list, "time"))
+        except KeyError:
+            raise ValueError(f"episodes[{i}].behaviour: missing") from None
+        except ValueError as exc:
+            raise ValueError(f"episodes[{i}].{exc}") from None
+    return ShiftRecord(resident_id=_text(raw, "resident_id"),
+                       shift_date=_iso_date(shift_date) if shift_date else "",
+                       shift_type=shift.name, episodes=tuple(checked), **out)
+
+def validate_chunk(chunk: Sequence[Tuple[int, object]], facility: str = "") -> Tuple[List[ImportRow], List[RowError]]:
+    """Validate ``(line, raw)`` pairs; raw is a dict (CSV) or an undecoded JSON line (JSONL)."""
+    rows, errors = [], []
+    for line, raw in chunk:
+        try:
+            if isinstance(raw, str):
+                try:
+                    raw = json.loads(raw)
+                except ValueError as exc:
+                    raise ValueError(f"row: invalid JSON ({exc.msg})") from None
+                if not isinstance(raw, dict):
+                    raise ValueError("row: expected a JSON object")
+            rows.append(validate_row(raw, facility))
+        except ValueError as exc:
+            name, _, message = str(exc).partition(": ")
+            errors.append(RowError(line, name, message))
+    return rows, errors
+
+# =========================
+# Reading
+# =========================
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Tuple[int, object]]]:
+    """Yield lists of ``(line, raw)``; CSV is parsed here, JSONL lines are decoded by the workers."""
+    chunk: List[Tuple[int, object]] = []
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+            rows = ((n, line) for n, line in enumerate(fh, start=1) if line.strip())
+        else:
+            reader = csv.DictReader(fh)
+            rows = ((reader.line_num, row) for row in reader)
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def import_file(path: str, store: ShiftStore, workers: int = 0, chunk_size: int = CHUNK_SIZE,
+                facility: str = "") -> ImportReport:
+    """
+    Validate ``path`` chunk by chunk (on ``workers`` processes when > 1) against ``facility``'s
+    catalogue and write each chunk's valid rows to ``store`` in one transaction.
+    """
+    report = ImportReport()
+
+    def consume(result: Tuple[List[ImportRow], List[RowError]]) -> None:
+        rows, errors = result
+        report.rows += len(rows) + len(errors)
+        report.valid += len(rows)
+        report.errors.extend(errors)
+        if rows:
+            report.imported += store.import_episodes(rows)
+
+    if workers <= 1:
+        for chunk in read_chunks(path, chunk_size):
+            consume(validate_chunk(chunk, facility))
+        return report
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in read_chunks(path, chunk_size):
+            pending.append(pool.submit(validate_chunk, chunk, facility))
+            # Bound the number of chunks in flight so memory stays flat on large files
+            while len(pending) >= workers * 2:
+                consume(pending.pop(0).result())
+        for fut in pending:
+            consume(fut.result())
+    return report
+
+def write_errors(errors: Sequence[RowError], path: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["line", "field", "message"])
+        writer.writerows((e.line, e.field, e.message) for e in errors)
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Import historical behaviour episodes")
+    ap.add_argument("path", help="CSV or JSONL file")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--errors", help="write per-row errors to this CSV file")
+    ap.add_argument("--facility", default="", help="validate against this facility's catalogue overlay")
+    args = ap.parse_args(argv)
+
+    report = import_file(args.path, ShiftStore(args.db), args.workers, args.chunk_size, args.facility)
+    print(f"Rows read: {report.rows}; imported: {report.imported}; already present: {report.skipped}; "
+          f"errors: {len(report.errors)}", file=sys.stderr)
+    if args.errors:
+        write_errors(report.errors, args.errors)
+    else:
+        for e in report.errors[:20]:
+            print(f"  line {e.line}: {e.field}: {e.message}", file=sys.stderr)
+        if len(report.errors) > 20:
+            print(f"  … {len(report.errors) - 20} more (use --errors FILE)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# note_an_acc/inclusion.py
+# Precomputed inclusion table and vectorised episode scoring.
+# The table is derived from engine.include_episode, so the scalar rule stays the single source of truth.
+
+from typing import Tuple
+
+from .engine import DISR_MAP, include_episode
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the bulk entry points
+    np = None
+
+FREQ_RANGE = range(1, 5)
+SEV_RANGE = range(1, 5)
+DISRUPT_RANGE = range(0, 5)
+
+# INCLUSION_TABLE[freq - 1][sev - 1][disrupt] — 4 × 4 × 5
+INCLUSION_TABLE: Tuple[Tuple[Tuple[bool, ...], ...], ...] = tuple(
+    tuple(
+        tuple(include_episode(f, s, d) for d in DISRUPT_RANGE)
+        for s in SEV_RANGE
+    )
+    for f in FREQ_RANGE
+)
+
+# Disruption wording by score; empty where the note adds no disruption clause
+DISRUPTION_LABELS: Tuple[str, ...] = tuple(
+    DISR_MAP.get(d, "notable") if d >= 3 else "" for d in DISRUPT_RANGE
+)
+
+def lookup(freq: int, sev: int, disrupt: int) -> bool:
+    return INCLUSION_TABLE[freq - 1][sev - 1][disrupt]
+
+# =========================
+# Vectorised (NumPy) path
+# =========================
+_FLAT = None
+
+def _numpy():
+    if np is None:
+        raise ImportError("numpy is required for vectorised episode scoring (pip install numpy)")
+    return np
+
+def _flat_table():
+    global _FLAT
+    if _FLAT is None:
+        _FLAT = _numpy().array(INCLUSION_TABLE, dtype=bool).ravel()
+    return _FLAT
+
+def _as_scores(name: str, values, lo: int, hi: int):
+    arr = _numpy().asarray(values, dtype=np.intp)
+    if arr.size and (arr.min() < lo or arr.max() > hi):
+        raise ValueError(f"{name} scores must be within {lo}–{hi}")
+    return arr
+
+def include_mask(freq, sev, disrupt):
+    """Boolean inclusion mask for equal-length arrays of freq (1–4), sev (1–4) and disrupt (0–4)."""
+    f = _as_scores("freq", freq, 1, 4)
+    s = _as_scores("sev", sev, 1, 4)
+    d = _as_scores("disrupt", disrupt, 0, 4)
+    idx = (f - 1) * 20 + (s - 1) * 5 + d
+    return _flat_table().take(idx)
+
+def disruption_labels(disrupt):
+    """Per-row disruption wording ("moderate"/"severe", else "")."""
+    d = _as_scores("disrupt", disrupt, 0, 4)
+    return _numpy().array(DISRUPTION_LABELS).take(d)
+
+def score_episodes(freq, sev, disrupt):
+    """Return ``(mask, labels)`` for a batch of episodes."""
+    return include_mask(freq, sev, disrupt), disruption_labels(disrupt)
@@ -0,0 +1,224 @@
+# note_an_acc/outbox.py
+# Asynchronous delivery of finalised notes to a downstream HTTP endpoint.
+# ShiftStore(outbox=True) queues each stored note in the ``outbox`` table inside the same transaction,
+# so carers never wait on the receiving system. A Dispatcher claims due rows in batches, POSTs them
+# with a bounded number of requests in flight, and reschedules failures with exponential backoff.
+#
+#   POST <url>  {"notes": [{"idempotency_key": ..., "resident_id": ..., "note": ..., ...}, ...]}
+#               header Idempotency-Key: key of the batch (derived from its notes' keys)
+#
+# Any 2xx marks the batch delivered; 408/429/5xx and network errors are retried; other 4xx
+# responses park the batch as 'failed' for a person to look at. Receivers should de-duplicate
+# on each note's idempotency_key, since a batch can be re-sent after a lost response.
+#
+# Usage: python -m note_an_acc.outbox --url http://ehr.local/notes [--batch 50] [--concurrency 4]
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .storage import DEFAULT_DB_PATH, ShiftStore
+
+RETRY_STATUSES = {408, 429}
+LEASE_SECONDS = 60.0  # a claimed batch becomes due again if its dispatcher dies mid-delivery
+
+
+@dataclass
+class OutboxStats:
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    requests: int = 0
+
+
+# =========================
+# Queue operations (synchronous; the dispatcher calls them off the event loop)
+# =========================
+def claim(store: ShiftStore, limit: int, now: Optional[float] = None) -> List[Tuple[int, int, dict]]:
+    """Lease up to ``limit`` due rows as ``(outbox_id, attempts, payload)``, oldest first."""
+    now = time.time() if now is None else now
+    with store.transaction() as conn:
+        rows = conn.execute(
+            "UPDATE outbox SET next_attempt_at = ?, attempts = attempts + 1 WHERE outbox_id IN ("
+            "SELECT outbox_id FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY outbox_id LIMIT ?) RETURNING outbox_id, attempts, payload",
+            (now + LEASE_SECONDS, now, limit),
+        ).fetchall()
+    return sorted((r[0], r[1], json.loads(r[2])) for r in rows)
+
+def mark_delivered(store: ShiftStore, ids: List[int]) -> None:
+    with store.transaction() as conn:
+        conn.executemany(
+            "UPDATE outbox SET status = 'delivered', delivered_at = ?, last_error = '' WHERE outbox_id = ?",
+            [(datetime.now().isoformat(timespec="seconds"), i) for i in ids],
+        )
+
+def reschedule(store: ShiftStore, ids: List[int], delay: float, error: str, failed: bool = False) -> None:
+    with store.transaction() as conn:
+        conn.executemany(
+            "UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ? WHERE outbox_id = ?",
+            [("failed" if failed else "pending", time.time() + delay, error[:500], i) for i in ids],
+        )
+
+def counts(store: ShiftStore) -> Dict[str, int]:
+    rows = store.connection().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+    return {status: n for status, n in rows}
+
+def requeue_failed(store: ShiftStore) -> int:
+    """Put parked rows back in the queue (e.g. after the receiver has been fixed)."""
+    with store.transaction() as conn:
+        return conn.execute(
+            "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 WHERE status = 'failed'"
+        ).rowcount
+
+# =========================
+# HTTP (stdlib asyncio streams; one connection per request)
+# =========================
+async def post_json(url: str, payload: dict, headers: Dict[str, str], timeout: float) -> Tuple[int, bytes]:
+    parts = urlsplit(url)
+    tls = parts.scheme == "https"
+    port = parts.port or (443 if tls else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = [f"POST {path} HTTP/1.1", f"Host: {parts.netloc}", "Content-Type: application/json",
+            f"Content-Length: {len(body)}", "Connection: close"]
+    head += [f"{k}: {v}" for k, v in headers.items()]
+
+    async def exchange() -> Tuple[int, bytes]:
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if tls else None)
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = None
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            data = await (reader.readexactly(length) if length is not None else reader.read())
+            return status, data
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+# =========================
+# Dispatcher
+# =========================
+class Dispatcher:
+    def __init__(self, store: ShiftStore, url: str, batch_size: int = 50, concurrency: int = 4,
+                 max_attempts: int = 10, base_delay: float = 1.0, max_delay: float = 300.0,
+                 timeout: float = 10.0, poll_interval: float = 1.0):
+        self.store = store
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.stats = OutboxStats()
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential backoff, so a recovering receiver isn't hit by every retry at once."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+    async def _deliver(self, batch: List[Tuple[int, int, dict]], slots: asyncio.Semaphore) -> None:
+        ids = [i for i, _, _ in batch]
+        notes = [p for _, _, p in batch]
+        batch_key = hashlib.sha256("".join(p["idempotency_key"] for p in notes).encode()).hexdigest()[:32]
+        async with slots:
+            self.stats.requests += 1
+            try:
+                status, body = await post_json(self.url, {"notes": notes}, {"Idempotency-Key": batch_key}, self.timeout)
+                error = "" if 200 <= status < 300 else f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}"
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError, asyncio.IncompleteReadError) as exc:
+                status, error = 0, f"{type(exc).__name__}: {exc}"
+        if not error:
+            await asyncio.to_thread(mark_delivered, self.store, ids)
+            self.stats.delivered += len(ids)
+            return
+        attempts = max(a for _, a, _ in batch)
+        retryable = status == 0 or status in RETRY_STATUSES or status >= 500
+        if retryable and attempts < self.max_attempts:
+            await asyncio.to_thread(reschedule, self.store, ids, self.backoff(attempts), error)
+            self.stats.retried += len(ids)
+        else:
+            await asyncio.to_thread(reschedule, self.store, ids, 0, error, True)
+            self.stats.failed += len(ids)
+
+    async def step(self) -> int:
+        """Claim one round of due rows, deliver them concurrently; returns rows claimed."""
+        rows = await asyncio.to_thread(claim, self.store, self.batch_size * self.concurrency)
+        if rows:
+            slots = asyncio.Semaphore(self.concurrency)
+            batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+            await asyncio.gather(*(self._deliver(b, slots) for b in batches))
+        return len(rows)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Deliver until ``stop`` is set, sleeping ``poll_interval`` whenever nothing is due."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            if not await self.step():
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain(self, deadline: float = 60.0) -> OutboxStats:
+        """Run until nothing is pending (including rows waiting out a backoff) or ``deadline`` passes."""
+        end = time.monotonic() + deadline
+        while time.monotonic() < end:
+            if not await self.step():
+                if not (await asyncio.to_thread(counts, self.store)).get("pending"):
+                    break
+                await asyncio.sleep(min(self.poll_interval, max(0.0, end - time.monotonic())))
+        return self.stats
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Deliver queued notes to a downstream endpoint")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--url", default=os.environ.get("NOTE_AN_ACC_OUTBOX_URL"))
+    ap.add_argument("--batch", type=int, default=50)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--max-attempts", type=int, default=10)
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    ap.add_argument("--requeue-failed", action="store_true", help="retry parked rows, then continue")
+    args = ap.parse_args(argv)
+    if not args.url:
+        ap.error("--url (or NOTE_AN_ACC_OUTBOX_URL) is required")
+
+    store = ShiftStore(args.db)
+    if args.requeue_failed:
+        print(f"Requeued {requeue_failed(store)} failed note(s)", file=sys.stderr)
+    dispatcher = Dispatcher(store, args.url, args.batch, args.concurrency, args.max_attempts, timeout=args.timeout)
+    try:
+        asyncio.run(dispatcher.drain(float("inf")) if args.drain else dispatcher.run())
+    except KeyboardInterrupt:
+        pass
+    s = dispatcher.stats
+    print(f"Delivered {s.delivered}; retried {s.retried}; failed {s.failed}; queue {counts(store)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# note_an_acc/profiling.py
+# Opt-in rerun profiling: per-section wall time plus widget, episode and session-state counts for each
+# script or fragment rerun. Kept in a process-wide Profiler that can append JSON lines to a log and
+# serve Prometheus text on /metrics. No Streamlit imports; the app feeds it through note_an_acc.ui.
+#
+# Enable with NOTE_AN_ACC_PROFILE=1; optionally NOTE_AN_ACC_PROFILE_LOG=reruns.jsonl and
+# NOTE_AN_ACC_METRICS_PORT=9108 (GET /metrics for Prometheus, GET /reruns for recent JSON).
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+PROFILE_ENABLED = os.environ.get("NOTE_AN_ACC_PROFILE", "") not in ("", "0")
+PROFILE_LOG = os.environ.get("NOTE_AN_ACC_PROFILE_LOG")
+METRICS_PORT = int(os.environ.get("NOTE_AN_ACC_METRICS_PORT") or 0)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+KEEP = 500  # reruns kept for /reruns and the debug panel
+
+
+@dataclass
+class RerunProfile:
+    """One script or fragment rerun. Section times are inclusive, so nested sections overlap."""
+    scope: str
+    started: float = field(default_factory=time.time)
+    sections: Dict[str, float] = field(default_factory=dict)
+    total_s: float = 0.0
+    widgets: Optional[int] = None
+    episodes: int = 0
+    state_keys: int = 0
+    state_bytes: int = 0
+    closed: bool = False
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + time.perf_counter() - t0
+
+    def finish(self, widgets: Optional[int], episodes: int, state: Dict[str, object]) -> None:
+        self.total_s = time.perf_counter() - self._t0
+        self.widgets = widgets
+        self.episodes = episodes
+        self.state_keys = len(state)
+        # Shallow sizes: enough to spot state that grows run over run
+        self.state_bytes = sum(sys.getsizeof(v) for v in state.values())
+        self.closed = True
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        del d["_t0"], d["closed"]
+        return d
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self.count += 1
+        self.sum += v
+        for i, b in enumerate(BUCKETS):
+            if v <= b:
+                self.buckets[i] += 1
+
+
+class Profiler:
+    """Process-wide rerun metrics shared by every session."""
+
+    def __init__(self, log_path: Optional[str] = None, keep: int = KEEP):
+        self.log_path = log_path
+        self.reruns: Deque[RerunProfile] = deque(maxlen=keep)
+        self.rerun_seconds: Dict[str, _Histogram] = {}
+        self.section_seconds: Dict[str, _Histogram] = {}
+        self.last: Optional[RerunProfile] = None
+        self.lock = threading.Lock()
+
+    def record(self, run: RerunProfile) -> None:
+        with self.lock:
+            self.reruns.append(run)
+            self.last = run
+            self.rerun_seconds.setdefault(run.scope, _Histogram()).observe(run.total_s)
+            for name, s in run.sections.items():
+                self.section_seconds.setdefault(name, _Histogram()).observe(s)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(run.to_dict()) + "\n")
+
+    def prometheus(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for metric, label, hists, help_ in (
+                ("note_an_acc_rerun_seconds", "scope", self.rerun_seconds, "Script or fragment rerun wall time"),
+                ("note_an_acc_section_seconds", "section", self.section_seconds, "Wall time per app section"),
+            ):
+                lines += [f"# HELP {metric} {help_}.", f"# TYPE {metric} histogram"]
+                for name, h in sorted(hists.items()):
+                    lab = f'{label}="{_escape(name)}"'
+                    for b, n in zip(BUCKETS, h.buckets):
+                        lines.append(f'{metric}_bucket{{{lab},le="{b}"}} {n}')
+                    lines.append(f'{metric}_bucket{{{lab},le="+Inf"}} {h.count}')
+                    lines.append(f"{metric}_sum{{{lab}}} {h.sum:.6f}")
+                    lines.append(f"{metric}_count{{{lab}}} {h.count}")
+            if self.last is not None:
+                for metric, value, help_ in (
+                    ("note_an_acc_last_rerun_widgets", self.last.widgets or 0, "Widgets rendered by the last rerun"),
+                    ("note_an_acc_last_rerun_episodes", self.last.episodes, "Episodes on the form in the last rerun"),
+                    ("note_an_acc_last_session_state_keys", self.last.state_keys, "Session-state keys after the last rerun"),
+                    ("note_an_acc_last_session_state_bytes", self.last.state_bytes, "Shallow session-state size after the last rerun"),
+                ):
+                    lines += [f"# HELP {metric} {help_}.", f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def slowest_sections(reruns: Iterable[RerunProfile]) -> List[dict]:
+    """Per-section runs, mean, p95 and max milliseconds over ``reruns``, slowest p95 first."""
+    times: Dict[str, List[float]] = {}
+    for run in reruns:
+        for name, s in run.sections.items():
+            times.setdefault(name, []).append(s * 1000)
+    rows = []
+    for name, ms in times.items():
+        ms.sort()
+        rows.append({
+            "Section": name, "Runs": len(ms), "Mean ms": round(sum(ms) / len(ms), 1),
+            "p95 ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 1), "Max ms": round(ms[-1], 1),
+        })
+    return sorted(rows, key=lambda r: -r["p95 ms"])
+
+# =========================
+# Metrics endpoint
+# =========================
+def serve_metrics(profiler: Profiler, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /reruns (JSON) from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                body, ctype = profiler.prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/reruns":
+                with profiler.lock:
+                    runs = [r.to_dict() for r in profiler.reruns]
+                body, ctype = json.dumps(runs).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
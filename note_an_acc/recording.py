@@ -0,0 +1,60 @@
+# note_an_acc/recording.py
+# Opt-in recording of real form interactions, for replaying carers' sessions in the load harness
+# (python -m benchmarks.load_sessions). With NOTE_AN_ACC_RECORD=sessions.jsonl, every rerun appends what
+# the user changed since the session's previous rerun, one JSON line per user action:
+#
+#   {"session": "3f2a…", "at": 12.4, "set": {"ep_problem_wandering_sev": 3}}
+#
+# Only widgets that already existed are recorded; widgets the app draws as a consequence of a change
+# (a newly picked behaviour's sliders) are left for the replayed app to draw again. Dates use the
+# draft encoding ({"$date": "2026-01-01"}). No Streamlit imports; the app feeds it through note_an_acc.ui.
+
+import json
+import os
+import threading
+from datetime import date
+from typing import Dict, List, Mapping
+
+from .drafts import decode_state
+
+RECORD_PATH = os.environ.get("NOTE_AN_ACC_RECORD")
+
+Step = Dict[str, object]  # {"session": str, "at": float, "set": {key: value}}
+
+
+def _encode(state: Mapping[str, object]) -> str:
+    # Like drafts.encode_state, but kept in form order rather than sorted: replay applies them in turn
+    return json.dumps({k: ({"$date": v.isoformat()} if isinstance(v, date) else v) for k, v in state.items()},
+                      separators=(",", ":"), ensure_ascii=False)
+
+def changes(before: Mapping[str, object], after: Mapping[str, object]) -> Dict[str, object]:
+    """Keys present in both states whose value moved, in ``after``'s (form) order."""
+    return {k: v for k, v in after.items() if k in before and before[k] != v}
+
+
+class InteractionLog:
+    """Process-wide JSONL writer shared by every session."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.steps = 0
+        self.lock = threading.Lock()
+
+    def write(self, session: str, at: float, changed: Mapping[str, object]) -> None:
+        line = f'{{"session":{json.dumps(session)},"at":{at:.2f},"set":{_encode(changed)}}}\n'
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+            self.steps += 1
+
+
+def load_scripts(path: str) -> Dict[str, List[Step]]:
+    """Recorded (or generated) steps grouped by session, in file order, with dates decoded."""
+    scripts: Dict[str, List[Step]] = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                step = json.loads(line)
+                step["set"] = decode_state(json.dumps(step["set"]))
+                scripts.setdefault(step["session"], []).append(step)
+    return scripts
@@ -0,0 +1,138 @@
+# note_an_acc/scoring.py
+# Behaviour burden per resident over an assessment period, for AN-ACC funding reviews: episode counts,
+# frequency × severity, disruption and sedative use, by domain and subdomain of the catalogue.
+#
+# Stored episodes are grouped per (resident, behaviour) in SQL, then scattered into a
+# residents × subdomains × measures array with NumPy in one pass. A BurdenScores is cached per period
+# and kept current like the ward dashboard: ``refresh`` reads which residents' resident_stats rows moved
+# since the last version seen, and recomputes only those residents.
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .catalogue import Catalogue, load_catalogue
+from .storage import ShiftStore, _json_list
+
+try:
+    import numpy as np
+except ImportError:  # only needed once a BurdenScores is built
+    np = None
+
+# Per (resident, subdomain): episodes, included episodes, Σ freq × sev, Σ disruption, sedatives given
+MEASURES = ("episodes", "included", "burden", "disrupt", "sedatives")
+MEASURE_LABELS = {
+    "episodes": "Episodes", "included": "Included", "burden": "Freq × Sev",
+    "disrupt": "Disruption", "sedatives": "Sedatives",
+}
+
+_GROUPED_SQL = (
+    "SELECT e.resident_id, e.behaviour, COUNT(*), SUM(e.included), SUM(e.freq * e.sev), SUM(e.disrupt), "
+    "SUM(e.med_given) FROM episodes e WHERE e.shift_date BETWEEN ? AND ?"
+)
+
+
+class BurdenScores:
+    """
+    Burden for every resident with episodes in [date_from, date_to]. ``values[resident]`` is a
+    subdomains × MEASURES int array; columns follow ``subdomains`` (catalogue order).
+    Episodes for behaviours no longer in the catalogue are left out.
+    """
+
+    def __init__(self, date_from: str, date_to: str, catalogue: Optional[Catalogue] = None,
+                 included_only: bool = False):
+        if np is None:
+            raise ImportError("numpy is required for burden scoring (pip install numpy)")
+        self.date_from = date_from
+        self.date_to = date_to
+        self.included_only = included_only
+        cat = catalogue or load_catalogue()
+        self.subdomains: Tuple[Tuple[str, str], ...] = tuple(
+            (d, s) for d, subs in cat.domains.items() for s in subs
+        )
+        self.domains: Tuple[str, ...] = tuple(cat.domains)
+        col = {pair: i for i, pair in enumerate(self.subdomains)}
+        self._column = {b: col[(e.domain, e.subdomain)] for b, e in cat.behaviours.items()}
+        # subdomain column → domain index, for rolling columns up to domains
+        self._domain_of = np.array([self.domains.index(d) for d, _ in self.subdomains], dtype=np.intp)
+        self.values: Dict[str, "np.ndarray"] = {}
+        self.version: Optional[int] = None  # resident_stats version reflected; None until the first refresh
+        self.recomputed = 0  # residents recomputed by the last refresh
+        self.lock = threading.Lock()
+
+    # ---- computation
+    def _compute(self, store: ShiftStore, residents: Optional[Sequence[str]] = None) -> Dict[str, "np.ndarray"]:
+        sql, args = _GROUPED_SQL, [self.date_from, self.date_to]
+        if self.included_only:
+            sql += " AND e.included = 1"
+        if residents is not None:
+            sql += " AND e.resident_id IN (SELECT value FROM json_each(?))"
+            args.append(_json_list(residents))
+        rows = store.connection().execute(sql + " GROUP BY e.resident_id, e.behaviour", args).fetchall()
+
+        rows = [r for r in rows if r[1] in self._column]
+        if not rows:
+            return {}
+        resident_ids, behaviours, *counts = zip(*rows)
+        names, res_idx = np.unique(np.array(resident_ids, dtype=object), return_inverse=True)
+        col_idx = np.fromiter((self._column[b] for b in behaviours), dtype=np.intp, count=len(rows))
+        totals = np.zeros((len(names), len(self.subdomains), len(MEASURES)), dtype=np.int64)
+        np.add.at(totals, (res_idx, col_idx), np.array(counts, dtype=np.int64).T)
+        return dict(zip(names.tolist(), totals))
+
+    def refresh(self, store: ShiftStore) -> int:
+        """Recompute residents whose records changed since the last refresh (all of them the first time)."""
+        conn = store.connection()
+        with self.lock:
+            # Read the watermark first: anything written during the recompute is picked up next time
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM resident_stats").fetchone()[0]
+            if self.version is None:
+                self.values = self._compute(store)
+                self.recomputed = len(self.values)
+            elif version > self.version:
+                changed = [r for (r,) in conn.execute(
+                    "SELECT DISTINCT resident_id FROM resident_stats "
+                    "WHERE version > ? AND shift_date BETWEEN ? AND ?",
+                    (self.version, self.date_from, self.date_to),
+                )]
+                fresh = self._compute(store, changed) if changed else {}
+                for resident_id in changed:
+                    if resident_id in fresh:
+                        self.values[resident_id] = fresh[resident_id]
+                    else:
+                        self.values.pop(resident_id, None)
+                self.recomputed = len(changed)
+            else:
+                self.recomputed = 0
+            self.version = version
+        return self.recomputed
+
+    # ---- reads
+    def by_subdomain(self, resident_id: str) -> Dict[Tuple[str, str], Dict[str, int]]:
+        values = self.values.get(resident_id)
+        if values is None:
+            return {}
+        return {pair: dict(zip(MEASURES, row.tolist())) for pair, row in zip(self.subdomains, values) if row[0]}
+
+    def by_domain(self, resident_id: str) -> Dict[str, Dict[str, int]]:
+        values = self.values.get(resident_id)
+        if values is None:
+            return {}
+        rolled = np.zeros((len(self.domains), len(MEASURES)), dtype=np.int64)
+        np.add.at(rolled, self._domain_of, values)
+        return {d: dict(zip(MEASURES, row.tolist())) for d, row in zip(self.domains, rolled) if row[0]}
+
+    def totals(self, resident_id: str) -> Dict[str, int]:
+        values = self.values.get(resident_id)
+        sums = values.sum(axis=0).tolist() if values is not None else [0] * len(MEASURES)
+        return dict(zip(MEASURES, sums))
+
+    def table(self, residents: Optional[Iterable[str]] = None, domain: Optional[str] = None) -> List[dict]:
+        """One row per resident, highest burden first; ``domain`` restricts the sums to that domain."""
+        rows = []
+        for resident_id in (self.values if residents is None else residents):
+            if resident_id not in self.values:
+                continue
+            t = self.by_domain(resident_id).get(domain, {}) if domain else self.totals(resident_id)
+            if t.get("episodes"):
+                rows.append({"Resident": resident_id, **{MEASURE_LABELS[m]: t[m] for m in MEASURES}})
+        return sorted(rows, key=lambda r: (-r[MEASURE_LABELS["burden"]], r["Resident"]))
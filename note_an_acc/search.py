@@ -0,0 +1,164 @@
+# note_an_acc/search.py
+# Ranked full-text search over stored notes and the free-text inputs (trigger context, engagement
+# description, ongoing concerns), backed by the note_search FTS5 index the store keeps current.
+#
+# Queries: bare words must all appear (stemmed, so "responding" matches "respond"); "quoted text" is a
+# phrase; a trailing * is a prefix match. Hyphenated terms such as exit-seeking are treated as phrases.
+#
+# Usage: python -m note_an_acc.search "exit-seeking" [--resident R0001] [--from 2026-01-01] [--domain Agitation]
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .export import ExportFilter
+from .storage import DEFAULT_DB_PATH, ShiftStore
+
+MARKS = ("**", "**")  # Markdown bold around matched terms
+SNIPPET_TOKENS = 24
+# Ranking is over the CANDIDATES most recent matches by shift date, so a term that appears in nearly
+# every note doesn't score years of history; SearchResults.cutoff tells the caller when that happened
+CANDIDATES = 5000
+# bm25 column weights: note body, free text (free text is short and written by the carer)
+WEIGHTS = (1.0, 2.0)
+
+_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    shift_id: int
+    resident_id: str
+    ward: str
+    shift_date: str
+    shift_type: str
+    score: float  # bm25; lower is better
+    note: str  # snippet of the note with matches marked
+    free_text: str  # snippet of the free-text inputs, "" when nothing matched there
+
+
+@dataclass(frozen=True)
+class SearchResults:
+    hits: List[SearchHit]
+    cutoff: Optional[str] = None  # set when too many notes matched: those on or before this date weren't ranked
+
+
+def fts_query(text: str) -> str:
+    """Turn user input into a safe FTS5 query: every term becomes a quoted phrase, ANDed together."""
+    terms = []
+    for phrase, word in _TERM.findall(text):
+        term = phrase if phrase else word
+        prefix = not phrase and term.endswith("*")
+        term = term.rstrip("*").strip()
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def _first_shift(conn, shift_date: str) -> int:
+    """Lowest id of a shift on or after ``shift_date``: a rowid bound FTS5 can apply from its index."""
+    row = conn.execute("SELECT MIN(shift_id) FROM shifts INDEXED BY ix_shifts_date WHERE shift_date >= ?",
+                       (shift_date,)).fetchone()
+    return row[0] or 0
+
+def _cutoff(conn, match: str, where: str, args: list) -> Optional[Tuple[str, int]]:
+    """
+    The newest shift date that leaves at most CANDIDATES matches after it, with the lowest rowid among
+    those matches; None when all fit. Candidates go by shift date, not rowid: rowid is insertion
+    order, and a bulk import of old charts would otherwise count as recent. Whole days are kept together.
+    """
+    # The newest CANDIDATES + 1 matches by rowid are cheap to find and already enough candidates, so
+    # the cutoff is no older than the oldest of their dates
+    newest = conn.execute(
+        "SELECT s.shift_date, note_search.rowid FROM note_search CROSS JOIN shifts s "
+        f"ON s.shift_id = note_search.rowid WHERE note_search MATCH ? AND {where} "
+        f"ORDER BY note_search.rowid DESC LIMIT {CANDIDATES + 1}",
+        [match, *args],
+    ).fetchall()
+    if len(newest) <= CANDIDATES:
+        return None
+    oldest = min(d for d, _ in newest)
+    # Lower rowids can still hold shifts from then on (late submissions, imports): count those too
+    newest += conn.execute(
+        "SELECT s.shift_date, note_search.rowid FROM note_search CROSS JOIN shifts s "
+        f"ON s.shift_id = note_search.rowid WHERE note_search MATCH ? AND {where} "
+        "AND s.shift_date >= ? AND note_search.rowid >= ? AND note_search.rowid < ?",
+        [match, *args, oldest, _first_shift(conn, oldest), newest[-1][1]],
+    ).fetchall()
+    newest.sort(key=tuple, reverse=True)
+    cutoff = newest[CANDIDATES][0]
+    first = min((rowid for d, rowid in newest if d > cutoff), default=None)
+    return None if first is None else (cutoff, first)  # None: one day alone holds them all, rank everything
+
+def search(store: ShiftStore, query: str, flt: ExportFilter = ExportFilter(), limit: int = 50,
+           marks: Tuple[str, str] = MARKS) -> SearchResults:
+    """
+    Best ``limit`` matches for ``query`` within the resident, date and domain filters, ranked over the
+    most recent CANDIDATES matching shifts (see SearchResults.cutoff).
+    """
+    match = fts_query(query)
+    if not match:
+        return SearchResults([])
+    where, args = flt.where("s")
+    behaviours = flt.behaviours()
+    if behaviours is not None:
+        where += (f" AND EXISTS (SELECT 1 FROM episodes e WHERE e.shift_id = s.shift_id "
+                  f"AND e.behaviour IN ({', '.join('?' * len(behaviours))}))")
+        args += list(behaviours)
+    conn = store.connection()
+    bound = _cutoff(conn, match, where, args)
+    if bound:
+        where += " AND s.shift_date > ? AND note_search.rowid >= ?"
+        args += bound
+    open_, close = marks
+    sql = (
+        "SELECT s.shift_id, s.resident_id, r.ward, s.shift_date, s.shift_type, "
+        f"bm25(note_search, {WEIGHTS[0]}, {WEIGHTS[1]}) AS score, "
+        f"snippet(note_search, 0, ?, ?, '…', {SNIPPET_TOKENS}), "
+        f"snippet(note_search, 1, ?, ?, '…', {SNIPPET_TOKENS}) "
+        # CROSS JOIN keeps FTS5 driving; otherwise a resident filter makes SQLite re-run the match per shift
+        "FROM note_search CROSS JOIN shifts s ON s.shift_id = note_search.rowid JOIN residents r USING (resident_id) "
+        f"WHERE note_search MATCH ? AND {where} ORDER BY score LIMIT ?"
+    )
+    rows = conn.execute(sql, [open_, close, open_, close, match, *args, limit]).fetchall()
+    return SearchResults([
+        SearchHit(shift_id, resident_id, ward, shift_date, shift_type, score, note,
+                  free_text if open_ in free_text else "")
+        for shift_id, resident_id, ward, shift_date, shift_type, score, note, free_text in rows
+    ], bound[0] if bound else None)
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Search stored shift notes")
+    ap.add_argument("query")
+    ap.add_argument("--db", default=DEFAULT_DB_PATH)
+    ap.add_argument("--resident")
+    ap.add_argument("--from", dest="date_from", help="first shift date (YYYY-MM-DD)")
+    ap.add_argument("--to", dest="date_to", help="last shift date (YYYY-MM-DD)")
+    ap.add_argument("--domain")
+    ap.add_argument("--subdomain")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--rebuild", action="store_true", help="re-index all stored shifts first")
+    args = ap.parse_args(argv)
+
+    store = ShiftStore(args.db)
+    if args.rebuild:
+        store.rebuild_search()
+    flt = ExportFilter(args.resident, args.date_from, args.date_to, args.domain, args.subdomain)
+    results = search(store, args.query, flt, args.limit, marks=("[", "]"))
+    for h in results.hits:
+        print(f"{h.shift_date} {h.shift_type:<9} {h.resident_id} ({h.ward or '-'})  {h.score:.2f}")
+        print(f"    {h.note}")
+        if h.free_text:
+            print(f"    free text: {h.free_text}")
+    print(f"{len(results.hits)} result(s)", file=sys.stderr)
+    if results.cutoff:
+        print(f"Over {CANDIDATES} notes matched; only shifts after {results.cutoff} were ranked "
+              f"(use --to to search earlier ones)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
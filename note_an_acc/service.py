@@ -0,0 +1,197 @@
+# note_an_acc/service.py
+# Stateless HTTP/JSON note rendering service for systems that need notes without a browser.
+# Requests are parsed on a thread per connection; rendering runs on a pool of worker processes.
+#
+#   POST /notes    {"record": {...}} or {"records": [{...}, ...]}
+#               -> {"results": [{"note": "...", "included": [{episode}, ...]}, ...]}
+#   GET  /health   -> {"status": "ok", "workers": N}
+#
+# Records use the ShiftRecord.to_dict() shape and are checked with the importer's rules (types, catalogue,
+# score bounds); a bad record fails the request with 400 rather than rendering a corrupt note. Stdlib only.
+# Usage: python -m note_an_acc.service [--host 127.0.0.1] [--port 8765] [--workers 4]
+
+import argparse
+import http.client
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .engine import ShiftRecord, build_note, included_episodes
+from .importer import validate_record
+
+MAX_BODY = 16 * 1024 * 1024
+MAX_RECORDS = 1000
+CHUNK_SIZE = 32
+
+
+class RequestError(ValueError):
+    """A client error, reported as HTTP 400."""
+
+
+# =========================
+# Rendering (runs in worker processes)
+# =========================
+def render_one(raw: dict) -> dict:
+    if not isinstance(raw, dict):
+        raise RequestError("each record must be a JSON object")
+    try:
+        # The importer's rules (catalogue, score bounds) plus JSON types, so nothing malformed is rendered
+        record = validate_record(raw)
+    except ValueError as exc:
+        raise RequestError(f"invalid record: {exc}") from None
+    return {"note": build_note(record), "included": [ep.to_dict() for ep in included_episodes(record)]}
+
+def render_batch(records: Sequence[dict]) -> List[dict]:
+    return [render_one(raw) for raw in records]
+
+def parse_request(body: bytes) -> List[dict]:
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise RequestError(f"body is not valid JSON: {exc}") from None
+    if not isinstance(payload, dict) or ("record" in payload) == ("records" in payload):
+        raise RequestError('expected an object with either "record" or "records"')
+    records = [payload["record"]] if "record" in payload else payload["records"]
+    if not isinstance(records, list):
+        raise RequestError('"records" must be a list')
+    if len(records) > MAX_RECORDS:
+        raise RequestError(f"at most {MAX_RECORDS} records per request")
+    return records
+
+# =========================
+# Server
+# =========================
+class NoteService(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the stdlib default of 5 resets connections during bursts
+
+    def __init__(self, address: Tuple[str, int], workers: int = 0):
+        super().__init__(address, NoteHandler)
+        self.workers = workers
+        # workers <= 1 renders on the request thread, which is simplest for local testing
+        self.pool: Optional[Executor] = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def render(self, records: List[dict]) -> List[dict]:
+        if self.pool is None:
+            return render_batch(records)
+        if len(records) <= CHUNK_SIZE:
+            return self.pool.submit(render_batch, records).result()
+        chunks = [records[i:i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)]
+        return [r for batch in self.pool.map(render_batch, chunks) for r in batch]
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+
+class NoteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for clients that send many requests
+    server: NoteService
+
+    def log_message(self, format, *args) -> None:  # quiet by default; errors still go to stderr
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _content_length(self) -> Optional[int]:
+        value = self.headers.get("Content-Length")
+        if value is None:
+            return None
+        if not value.strip().isdigit():
+            # The body can't be delimited, so the connection can't be reused either
+            self.close_connection = True
+            raise RequestError(f"invalid Content-Length: {value!r}")
+        return int(value)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "workers": self.server.workers})
+        else:
+            self._send(404, {"error": f"no such endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/notes":
+            self._send(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        try:
+            length = self._content_length()
+            if length is None:
+                self.close_connection = True
+                self._send(411, {"error": "Content-Length required"})
+                return
+            if length > MAX_BODY:
+                self.close_connection = True
+                self._send(413, {"error": f"body larger than {MAX_BODY} bytes"})
+                return
+            results = self.server.render(parse_request(self.rfile.read(length)))
+        except RequestError as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        except Exception as exc:
+            print(f"note service: {type(exc).__name__}: {exc}", file=sys.stderr)
+            self._send(500, {"error": "internal error"})
+            return
+        self._send(200, {"results": results})
+
+# =========================
+# Client
+# =========================
+class NoteClient:
+    """Minimal keep-alive client for the service; one instance per thread."""
+
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 30.0):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.conn.request(method, path, body=body, headers=headers)
+        resp = self.conn.getresponse()
+        data = json.loads(resp.read())
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {data.get('error', '')}")
+        return data
+
+    def render(self, records: Sequence[ShiftRecord]) -> List[dict]:
+        return self._request("POST", "/notes", {"records": [r.to_dict() for r in records]})["results"]
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def close(self) -> None:
+        self.conn.close()
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Serve shift notes over HTTP")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    server = NoteService((args.host, args.port), args.workers)
+    print(f"Serving notes on http://{args.host}:{server.server_port} with {args.workers} worker(s)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# note_an_acc/shifts.py
+# Shift calendar: shift definitions (start, end, charting interval, schedule guide) loaded once per
+# process from a versioned JSON file. Each shift's charting slots are precomputed as an interned tuple
+# with a slot → index map, so the UI, importer and analytics share one table instead of rebuilding
+# time lists per rerun. Shifts may cross midnight (Night 21:00–07:00); a shift is dated by the day it starts.
+#
+# Sites with their own rosters or 15-minute charting point NOTE_AN_ACC_SHIFTS at another file.
+
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+SHIFTS_PATH = Path(__file__).parent / "data" / "shifts.json"
+SHIFTS_SCHEMA = 1
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_hhmm(value: str) -> int:
+    """'HH:MM' → minutes after midnight."""
+    hh, sep, mm = str(value).partition(":")
+    if not (sep and hh.isdigit() and mm.isdigit() and int(hh) < 24 and int(mm) < 60):
+        raise ValueError(f"Expected a 24-hour HH:MM time, got {value!r}")
+    return int(hh) * 60 + int(mm)
+
+def format_hhmm(minutes: int) -> str:
+    minutes %= MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@dataclass(frozen=True)
+class ShiftDef:
+    """
+    One shift. ``slots`` runs from start to end inclusive every ``step`` minutes (the end slot is
+    shared with the next shift, as charts have always done); ``index`` is its inverse.
+    """
+    name: str
+    start: int  # minutes after midnight
+    end: int
+    step: int
+    schedule: Tuple[str, ...]
+    slots: Tuple[str, ...]
+    index: Mapping[str, int]
+
+    @property
+    def crosses_midnight(self) -> bool:
+        return self.end <= self.start
+
+    @property
+    def minutes(self) -> int:
+        return (self.end - self.start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+    def offset(self, slot: str) -> Optional[int]:
+        """Minutes from the start of the shift to ``slot``; None when it is not one of its slots."""
+        i = self.index.get(slot)
+        return None if i is None else i * self.step
+
+    def day_offset(self, slot: str) -> Optional[int]:
+        """1 for slots after midnight on a shift that crosses it, else 0 (None when not a slot)."""
+        off = self.offset(slot)
+        return None if off is None else (self.start + off) // MINUTES_PER_DAY
+
+
+class ShiftCalendar:
+    """
+    Read-only set of shifts, in file order (the first is the default). ``grid`` is every slot any
+    shift charts, on one clock ordered from the first shift's start, for analytics.
+    """
+    __slots__ = ("version", "shifts", "grid", "grid_index")
+
+    def __init__(self, version: str, shifts: Mapping[str, ShiftDef]):
+        self.version = version
+        self.shifts = shifts
+        first = next(iter(shifts.values()))
+        clock = {s: parse_hhmm(s) for shift in shifts.values() for s in shift.slots}
+        self.grid: Tuple[str, ...] = tuple(sorted(clock, key=lambda s: (clock[s] - first.start) % MINUTES_PER_DAY))
+        self.grid_index: Mapping[str, int] = MappingProxyType({s: i for i, s in enumerate(self.grid)})
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self.shifts)
+
+    @property
+    def default(self) -> str:
+        return next(iter(self.shifts))
+
+    def get(self, name: str) -> Optional[ShiftDef]:
+        return self.shifts.get(name)
+
+    def slots(self, name: str) -> Tuple[str, ...]:
+        shift = self.shifts.get(name)
+        return shift.slots if shift else ()
+
+    def slot_index(self, name: str, slot: str) -> Optional[int]:
+        shift = self.shifts.get(name)
+        return shift.index.get(slot) if shift else None
+
+
+def _slots(start: int, minutes: int, step: int, pool: Dict[str, str]) -> Tuple[str, ...]:
+    out = []
+    # Inclusive of the end slot, except for a 24-hour shift whose end is its own start
+    for off in range(0, minutes + (minutes < MINUTES_PER_DAY), step):
+        s = format_hhmm(start + off)
+        out.append(pool.setdefault(s, sys.intern(s)))
+    return tuple(out)
+
+def parse_calendar(raw: dict) -> ShiftCalendar:
+    if raw.get("schema") != SHIFTS_SCHEMA:
+        raise ValueError(f"Unsupported shifts schema {raw.get('schema')!r} (expected {SHIFTS_SCHEMA})")
+    if not raw.get("shifts"):
+        raise ValueError("Shift calendar defines no shifts")
+    default_step = int(raw.get("step", 30))
+    pool: Dict[str, str] = {}
+    shifts = {}
+    for spec in raw["shifts"]:
+        name = sys.intern(str(spec["name"]))
+        if name in shifts:
+            raise ValueError(f"Shift {name!r} is defined twice")
+        start, end = parse_hhmm(spec["start"]), parse_hhmm(spec["end"])
+        step = int(spec.get("step", default_step))
+        minutes = (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+        if step <= 0 or MINUTES_PER_DAY % step or minutes % step:
+            raise ValueError(f"Shift {name!r}: a {step}-minute interval does not divide the day and the shift evenly")
+        slots = _slots(start, minutes, step, pool)
+        shifts[name] = ShiftDef(
+            name=name, start=start, end=end, step=step,
+            schedule=tuple(spec.get("schedule", ())),
+            slots=slots,
+            index=MappingProxyType({s: i for i, s in enumerate(slots)}),
+        )
+    return ShiftCalendar(str(raw.get("version", "")), MappingProxyType(shifts))
+
+@lru_cache(maxsize=None)
+def load_calendar(path: Optional[str] = None) -> ShiftCalendar:
+    """Parse the shift file once per process (NOTE_AN_ACC_SHIFTS, else the bundled one)."""
+    with open(path or os.environ.get("NOTE_AN_ACC_SHIFTS") or SHIFTS_PATH, encoding="utf-8") as fh:
+        return parse_calendar(json.load(fh))
@@ -0,0 +1,535 @@
+# note_an_acc/storage.py
+# Durable SQLite store for residents, shift records, episodes and generated notes.
+# WAL mode lets carers keep reading while another submission commits; writes are batched per transaction.
+
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .engine import Episode, ShiftRecord, build_note, include_episode
+
+DEFAULT_DB_PATH = os.environ.get("NOTE_AN_ACC_DB", "note_an_acc.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS residents (
+    resident_id TEXT PRIMARY KEY,
+    name        TEXT NOT NULL DEFAULT '',
+    ward        TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS shifts (
+    shift_id     INTEGER PRIMARY KEY,
+    resident_id  TEXT NOT NULL REFERENCES residents(resident_id),
+    shift_date   TEXT NOT NULL,
+    shift_type   TEXT NOT NULL,
+    settledness  TEXT NOT NULL,
+    in_bed       INTEGER NOT NULL,
+    included     INTEGER NOT NULL DEFAULT 0,
+    peak_sev     INTEGER NOT NULL DEFAULT 0,
+    sedatives    INTEGER NOT NULL DEFAULT 0,
+    record       TEXT NOT NULL,
+    submitted_by TEXT NOT NULL DEFAULT '',
+    submitted_at TEXT NOT NULL,
+    UNIQUE (resident_id, shift_date, shift_type)
+);
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_id    INTEGER PRIMARY KEY,
+    shift_id      INTEGER NOT NULL REFERENCES shifts(shift_id) ON DELETE CASCADE,
+    resident_id   TEXT NOT NULL,
+    shift_date    TEXT NOT NULL,
+    slot          TEXT NOT NULL,
+    behaviour     TEXT NOT NULL,
+    freq          INTEGER NOT NULL,
+    sev           INTEGER NOT NULL,
+    disrupt       INTEGER NOT NULL,
+    included      INTEGER NOT NULL,
+    specifics     TEXT NOT NULL,
+    trig_mod      TEXT NOT NULL,
+    trig_nonmod   TEXT NOT NULL,
+    trig_free     TEXT NOT NULL,
+    prevent       TEXT NOT NULL,
+    interventions TEXT NOT NULL,
+    eff           TEXT NOT NULL,
+    med_given     INTEGER NOT NULL,
+    med_eff       TEXT,
+    source        TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_episodes_resident_date_slot ON episodes (resident_id, shift_date, slot);
+CREATE INDEX IF NOT EXISTS ix_episodes_shift ON episodes (shift_id);
+-- Content digest of imported rows (importer.row_key) so re-running an import doesn't duplicate history
+CREATE UNIQUE INDEX IF NOT EXISTS ux_episodes_source ON episodes (source);
+-- Per resident per day, maintained by deltas on every shift write (ward dashboard)
+CREATE TABLE IF NOT EXISTS resident_stats (
+    resident_id TEXT NOT NULL,
+    shift_date  TEXT NOT NULL,
+    ward        TEXT NOT NULL,
+    shifts      INTEGER NOT NULL,
+    included    INTEGER NOT NULL,
+    peak_sev    INTEGER NOT NULL,
+    sedatives   INTEGER NOT NULL,
+    settledness TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    PRIMARY KEY (resident_id, shift_date)
+);
+CREATE INDEX IF NOT EXISTS ix_resident_stats_ward ON resident_stats (ward, shift_date, version);
+CREATE INDEX IF NOT EXISTS ix_resident_stats_version ON resident_stats (version);
+CREATE TABLE IF NOT EXISTS notes (
+    note_id    INTEGER PRIMARY KEY,
+    shift_id   INTEGER NOT NULL UNIQUE REFERENCES shifts(shift_id) ON DELETE CASCADE,
+    body       TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+-- Finalised notes awaiting delivery downstream; written in the same transaction as the note
+-- and drained by note_an_acc.outbox
+CREATE TABLE IF NOT EXISTS outbox (
+    outbox_id       INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    shift_id        INTEGER NOT NULL REFERENCES shifts(shift_id) ON DELETE CASCADE,
+    payload         TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error      TEXT NOT NULL DEFAULT '',
+    created_at      TEXT NOT NULL,
+    delivered_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox (next_attempt_at) WHERE status = 'pending';
+-- In-progress form state per browser draft id, written behind by note_an_acc.drafts
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_key  TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- Escalations raised by note_an_acc.escalation: listed on the ward dashboard until acknowledged,
+-- POSTed to a local webhook by its --watch loop
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id        INTEGER PRIMARY KEY,
+    resident_id     TEXT NOT NULL,
+    ward            TEXT NOT NULL,
+    behaviour       TEXT NOT NULL,
+    rule            TEXT NOT NULL,
+    shift_date      TEXT NOT NULL,
+    shift_type      TEXT NOT NULL,
+    detail          TEXT NOT NULL,
+    created_at      TEXT NOT NULL,
+    acknowledged_at TEXT,
+    delivered_at    TEXT,
+    UNIQUE (resident_id, behaviour, rule, shift_date, shift_type)
+);
+CREATE INDEX IF NOT EXISTS ix_alerts_open ON alerts (ward, alert_id) WHERE acknowledged_at IS NULL;
+CREATE INDEX IF NOT EXISTS ix_alerts_undelivered ON alerts (alert_id) WHERE delivered_at IS NULL;
+-- Date-ordered walks (search candidate cutoff)
+CREATE INDEX IF NOT EXISTS ix_shifts_date ON shifts (shift_date);
+-- Full-text index over note text and the free-text inputs, rowid = shift_id (note_an_acc.search)
+CREATE VIRTUAL TABLE IF NOT EXISTS note_search USING fts5(
+    body, free_text, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+# Rebuilds note_search rows from stored shifts; callers append a WHERE on s.shift_id
+_REINDEX_SQL = (
+    "INSERT OR REPLACE INTO note_search (rowid, body, free_text) "
+    "SELECT s.shift_id, COALESCE(n.body, ''), "
+    "json_extract(s.record, '$.engagement_behaviour_desc') || ' ' || json_extract(s.record, '$.ongoing') || ' ' || "
+    "COALESCE((SELECT group_concat(e.trig_free, ' ') FROM episodes e WHERE e.shift_id = s.shift_id "
+    "AND e.trig_free != ''), '') "
+    "FROM shifts s LEFT JOIN notes n USING (shift_id) "
+)
+
+EPISODE_COLUMNS = (
+    "shift_id", "resident_id", "shift_date", "slot", "behaviour", "freq", "sev", "disrupt", "included",
+    "specifics", "trig_mod", "trig_nonmod", "trig_free", "prevent", "interventions", "eff", "med_given", "med_eff",
+)
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+def _record_json(record: ShiftRecord) -> str:
+    d = record.to_dict()
+    del d["episodes"]  # stored row-per-episode
+    return json.dumps(d, ensure_ascii=False)
+
+def _json_list(items: Sequence[str]) -> str:
+    return json.dumps(list(items), ensure_ascii=False)
+
+def _episode_row(shift_id: int, resident_id: str, shift_date: str, ep: Episode) -> tuple:
+    return (
+        shift_id, resident_id, shift_date, ep.time, ep.behaviour,
+        ep.freq, ep.sev, ep.disrupt, int(include_episode(ep.freq, ep.sev, ep.disrupt)),
+        _json_list(ep.specifics), _json_list(ep.trig_mod), _json_list(ep.trig_nonmod), ep.trig_free,
+        _json_list(ep.prevent), _json_list(ep.interventions), ep.eff, int(ep.med_given), ep.med_eff,
+    )
+
+def note_key(record: ShiftRecord, note: str) -> str:
+    """Idempotency key for delivering ``note``: stable across resubmits of identical text."""
+    raw = "\x1f".join((record.resident_id, record.shift_date, record.shift_type, note))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def search_text(record: ShiftRecord) -> str:
+    """The record's free-text inputs as indexed for search (next to the note body)."""
+    parts = [record.engagement_behaviour_desc, record.ongoing] + [ep.trig_free for ep in record.episodes]
+    return " ".join(p for p in parts if p)
+
+def shift_summary(record: ShiftRecord) -> Tuple[int, int, int]:
+    """(included episodes, peak severity, sedative administrations) for one shift."""
+    included = sum(include_episode(ep.freq, ep.sev, ep.disrupt) for ep in record.episodes)
+    peak = max((ep.sev for ep in record.episodes), default=0)
+    return included, peak, sum(ep.med_given for ep in record.episodes)
+
+def episode_from_row(row: sqlite3.Row) -> Episode:
+    return Episode(
+        behaviour=row["behaviour"],
+        specifics=tuple(json.loads(row["specifics"])),
+        freq=row["freq"], sev=row["sev"], disrupt=row["disrupt"], time=row["slot"],
+        trig_mod=tuple(json.loads(row["trig_mod"])),
+        trig_nonmod=tuple(json.loads(row["trig_nonmod"])),
+        trig_free=row["trig_free"],
+        prevent=tuple(json.loads(row["prevent"])),
+        interventions=tuple(json.loads(row["interventions"])),
+        eff=row["eff"], med_given=bool(row["med_given"]), med_eff=row["med_eff"],
+    )
+
+
+class ShiftStore:
+    """
+    One connection per thread, shared database file. ``save_shifts`` writes a whole
+    batch (shift rows, episodes, notes) in a single IMMEDIATE transaction.
+    ``submit`` hands a record to a background writer that group-commits everything
+    queued since its last transaction, so concurrent submitters don't contend for the lock.
+    With ``outbox`` set, every stored note is also queued for downstream delivery.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, timeout: float = 30.0, max_batch: int = 256,
+                 outbox: bool = False):
+        self.path = path
+        self.outbox = outbox
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self._local = threading.local()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.connection().executescript(SCHEMA)
+        conn = self.connection()
+        if conn.execute("SELECT 1 FROM shifts LIMIT 1").fetchone() and not conn.execute(
+                "SELECT 1 FROM note_search LIMIT 1").fetchone():
+            self.rebuild_search()  # database created before the search index existed
+
+    # ---- connections
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---- writes
+    def upsert_residents(self, residents: Iterable[Tuple[str, str, str]]) -> None:
+        """``(resident_id, name, ward)`` tuples."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO residents (resident_id, name, ward) VALUES (?, ?, ?) "
+                "ON CONFLICT (resident_id) DO UPDATE SET name = excluded.name, ward = excluded.ward",
+                residents,
+            )
+
+    def ward_residents(self, ward: str) -> List[str]:
+        return [r for (r,) in self.connection().execute(
+            "SELECT resident_id FROM residents WHERE ward = ? ORDER BY resident_id", (ward,))]
+
+    def _write_shift(self, conn: sqlite3.Connection, record: ShiftRecord, note: str,
+                     ward: str, submitted_by: str) -> Tuple[int, str]:
+        """Returns the shift id and the ward the shift was counted under (a blank ``ward`` keeps the resident's)."""
+        if not record.resident_id or not record.shift_date:
+            raise ValueError("Shift records need a resident_id and shift_date before they can be stored")
+        ward = conn.execute(
+            "INSERT INTO residents (resident_id, ward) VALUES (?, ?) ON CONFLICT (resident_id) DO UPDATE "
+            "SET ward = CASE WHEN excluded.ward != '' THEN excluded.ward ELSE residents.ward END RETURNING ward",
+            (record.resident_id, ward),
+        ).fetchone()[0]
+        key = (record.resident_id, record.shift_date, record.shift_type)
+        old = conn.execute(
+            "SELECT included, sedatives FROM shifts WHERE resident_id = ? AND shift_date = ? AND shift_type = ?", key
+        ).fetchone()
+        summary = shift_summary(record)
+        shift_id = conn.execute(
+            "INSERT INTO shifts (resident_id, shift_date, shift_type, settledness, in_bed, included, peak_sev, sedatives, "
+            "record, submitted_by, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (resident_id, shift_date, shift_type) DO UPDATE SET "
+            "settledness = excluded.settledness, in_bed = excluded.in_bed, included = excluded.included, "
+            "peak_sev = excluded.peak_sev, sedatives = excluded.sedatives, record = excluded.record, "
+            "submitted_by = excluded.submitted_by, submitted_at = excluded.submitted_at RETURNING shift_id",
+            (*key, record.settledness, int(record.in_bed), *summary,
+             _record_json(record), submitted_by, _now()),
+        ).fetchone()[0]
+        self._apply_stats(conn, record, ward, summary, old)
+        # A resubmitted shift replaces its episodes and note
+        conn.execute("DELETE FROM episodes WHERE shift_id = ?", (shift_id,))
+        conn.executemany(
+            f"INSERT INTO episodes ({', '.join(EPISODE_COLUMNS)}) VALUES ({', '.join('?' * len(EPISODE_COLUMNS))})",
+            [_episode_row(shift_id, record.resident_id, record.shift_date, ep) for ep in record.episodes],
+        )
+        conn.execute(
+            "INSERT INTO notes (shift_id, body, created_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (shift_id) DO UPDATE SET body = excluded.body, created_at = excluded.created_at",
+            (shift_id, note, _now()),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO note_search (rowid, body, free_text) VALUES (?, ?, ?)",
+            (shift_id, note, search_text(record)),
+        )
+        if self.outbox:
+            key = note_key(record, note)
+            payload = {
+                "idempotency_key": key, "resident_id": record.resident_id, "ward": ward,
+                "shift_date": record.shift_date, "shift_type": record.shift_type,
+                "note": note, "submitted_by": submitted_by, "submitted_at": _now(),
+            }
+            conn.execute(
+                "INSERT INTO outbox (idempotency_key, shift_id, payload, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (idempotency_key) DO NOTHING",
+                (key, shift_id, json.dumps(payload, ensure_ascii=False), _now()),
+            )
+        return shift_id, ward
+
+    def _apply_stats(self, conn: sqlite3.Connection, record: ShiftRecord, ward: str,
+                     summary: Tuple[int, int, int], old: Optional[sqlite3.Row]) -> None:
+        # Counts move by the difference from any earlier submission of this shift;
+        # peak severity isn't invertible, so it is re-read from the resident's shifts that day.
+        included, _, sedatives = summary
+        d_shifts, d_included, d_sedatives = 1, included, sedatives
+        if old is not None:
+            d_shifts, d_included, d_sedatives = 0, included - old["included"], sedatives - old["sedatives"]
+        peak = conn.execute(
+            "SELECT MAX(peak_sev) FROM shifts WHERE resident_id = ? AND shift_date = ?",
+            (record.resident_id, record.shift_date),
+        ).fetchone()[0]
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM resident_stats").fetchone()[0]
+        conn.execute(
+            "INSERT INTO resident_stats (resident_id, shift_date, ward, shifts, included, peak_sev, sedatives, "
+            "settledness, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (resident_id, shift_date) DO UPDATE SET ward = excluded.ward, "
+            "shifts = shifts + excluded.shifts, included = included + excluded.included, "
+            "peak_sev = excluded.peak_sev, sedatives = sedatives + excluded.sedatives, "
+            "settledness = excluded.settledness, version = excluded.version",
+            (record.resident_id, record.shift_date, ward, d_shifts, d_included, peak, d_sedatives,
+             record.settledness, version),
+        )
+
+    def import_episodes(self, rows: Sequence[Tuple[str, str, str, str, Episode, str]]) -> int:
+        """
+        Append historical episodes given as ``(resident_id, shift_date, shift_type, ward, episode, source)``
+        in one transaction, creating shift rows as needed. Rows whose ``source`` is already stored are
+        skipped; returns the number inserted.
+        """
+        keys = list(dict.fromkeys((r, d, t) for r, d, t, _, _, _ in rows))
+        wards = {r: w for r, _, _, w, _, _ in rows if w}
+        with self.transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_keys (resident_id TEXT, shift_date TEXT, shift_type TEXT)")
+            conn.execute("DELETE FROM import_keys")
+            conn.executemany("INSERT INTO import_keys VALUES (?, ?, ?)", keys)
+            conn.executemany(
+                "INSERT INTO residents (resident_id, ward) VALUES (?, ?) ON CONFLICT (resident_id) DO UPDATE "
+                "SET ward = CASE WHEN excluded.ward != '' THEN excluded.ward ELSE residents.ward END",
+                [(r, wards.get(r, "")) for r in dict.fromkeys(k[0] for k in keys)],
+            )
+            # Shifts known only from imported episodes get a blank record with their identity filled in
+            conn.execute(
+                "INSERT INTO shifts (resident_id, shift_date, shift_type, settledness, in_bed, record, "
+                "submitted_by, submitted_at) SELECT resident_id, shift_date, shift_type, 'Settled', 0, "
+                "json_set(?, '$.resident_id', resident_id, '$.shift_date', shift_date, '$.shift_type', shift_type), "
+                "'import', ? FROM import_keys WHERE true ON CONFLICT (resident_id, shift_date, shift_type) DO NOTHING",
+                (_record_json(ShiftRecord()), _now()),
+            )
+            shift_ids = {
+                (r, d, t): i for r, d, t, i in conn.execute(
+                    "SELECT k.resident_id, k.shift_date, k.shift_type, s.shift_id FROM import_keys k "
+                    "JOIN shifts s USING (resident_id, shift_date, shift_type)"
+                )
+            }
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT INTO episodes ({', '.join(EPISODE_COLUMNS)}, source) "
+                f"VALUES ({', '.join('?' * (len(EPISODE_COLUMNS) + 1))}) ON CONFLICT DO NOTHING",
+                [(*_episode_row(shift_ids[r, d, t], r, d, ep), source) for r, d, t, _, ep, source in rows],
+            )
+            inserted = conn.total_changes - before
+            conn.execute(
+                _REINDEX_SQL + "WHERE s.shift_id IN (SELECT s2.shift_id FROM shifts s2 "
+                "JOIN import_keys k USING (resident_id, shift_date, shift_type))"
+            )
+
+            # Bulk path: rebuild the touched shift summaries and resident-days rather than applying deltas
+            conn.execute(
+                "UPDATE shifts SET included = agg.included, peak_sev = agg.peak_sev, sedatives = agg.sedatives "
+                "FROM (SELECT e.shift_id, SUM(e.included) AS included, MAX(e.sev) AS peak_sev, "
+                "SUM(e.med_given) AS sedatives FROM episodes e JOIN shifts s USING (shift_id) "
+                "JOIN import_keys k USING (resident_id, shift_date, shift_type) GROUP BY e.shift_id) AS agg "
+                "WHERE shifts.shift_id = agg.shift_id"
+            )
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM resident_stats").fetchone()[0]
+            conn.execute(
+                "INSERT INTO resident_stats (resident_id, shift_date, ward, shifts, included, peak_sev, sedatives, "
+                "settledness, version) SELECT s.resident_id, s.shift_date, r.ward, COUNT(*), SUM(s.included), "
+                "MAX(s.peak_sev), SUM(s.sedatives), MAX(s.settledness), ? FROM shifts s "
+                "JOIN residents r USING (resident_id) "
+                "WHERE (s.resident_id, s.shift_date) IN (SELECT resident_id, shift_date FROM import_keys) "
+                "GROUP BY s.resident_id, s.shift_date ON CONFLICT (resident_id, shift_date) DO UPDATE SET "
+                "ward = excluded.ward, shifts = excluded.shifts, included = excluded.included, "
+                "peak_sev = excluded.peak_sev, sedatives = excluded.sedatives, settledness = excluded.settledness, "
+                "version = excluded.version",
+                (version,),
+            )
+        return inserted
+
+    def rebuild_search(self) -> None:
+        """Re-index every stored shift for full-text search."""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM note_search")
+            conn.execute(_REINDEX_SQL)
+
+    def save_drafts(self, drafts: Sequence[Tuple[str, str]]) -> None:
+        """Upsert ``(draft_key, state_json)`` pairs in one transaction."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO drafts (draft_key, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (draft_key) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                [(k, s, now) for k, s in drafts],
+            )
+
+    def delete_drafts(self, keys: Sequence[str] = (), older_than: Optional[float] = None) -> int:
+        """Drop the given drafts, or every draft last written before ``older_than`` (epoch seconds)."""
+        with self.transaction() as conn:
+            n = conn.executemany("DELETE FROM drafts WHERE draft_key = ?", [(k,) for k in keys]).rowcount
+            if older_than is not None:
+                n += conn.execute("DELETE FROM drafts WHERE updated_at < ?", (older_than,)).rowcount
+        return n
+
+    def save_shifts(self, records: Sequence[ShiftRecord], notes: Optional[Sequence[str]] = None,
+                    ward: str = "", submitted_by: str = "") -> List[int]:
+        """Store a batch of shift records and their notes atomically; returns shift ids in order."""
+        if notes is None:
+            notes = [build_note(r) for r in records]
+        with self.transaction() as conn:
+            return [self._write_shift(conn, r, n, ward, submitted_by)[0] for r, n in zip(records, notes)]
+
+    def save_shift(self, record: ShiftRecord, note: Optional[str] = None,
+                   ward: str = "", submitted_by: str = "") -> int:
+        return self.save_shifts([record], None if note is None else [note], ward, submitted_by)[0]
+
+    def submit(self, record: ShiftRecord, note: Optional[str] = None,
+               ward: str = "", submitted_by: str = "") -> "Future[Tuple[int, str]]":
+        """
+        Queue a shift for the group-commit writer; the future resolves to its shift id and the ward it
+        was stored under, which is the resident's existing ward when ``ward`` is blank.
+        """
+        fut: "Future[Tuple[int, str]]" = Future()
+        self._queue.put((record, build_note(record) if note is None else note, ward, submitted_by, fut))
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="shift-writer", daemon=True)
+                    self._writer.start()
+        return fut
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.transaction() as conn:
+                    saved = [self._write_shift(conn, rec, note, ward, by) for rec, note, ward, by, _ in batch]
+            except Exception:
+                # Retry one by one so a single bad record doesn't fail the whole batch
+                for rec, note, ward, by, fut in batch:
+                    try:
+                        with self.transaction() as conn:
+                            result = self._write_shift(conn, rec, note, ward, by)
+                    except Exception as exc:
+                        fut.set_exception(exc)
+                    else:
+                        fut.set_result(result)
+                continue
+            for (*_, fut), result in zip(batch, saved):
+                fut.set_result(result)
+
+    # ---- reads
+    def _record_from_row(self, row: sqlite3.Row) -> ShiftRecord:
+        eps = self.connection().execute(
+            "SELECT * FROM episodes WHERE shift_id = ? ORDER BY episode_id", (row["shift_id"],)
+        ).fetchall()
+        d = json.loads(row["record"])
+        d["episodes"] = [episode_from_row(e) for e in eps]
+        return ShiftRecord.from_dict(d)
+
+    def stats_since(self, ward: str, shift_date: str, version: int = 0) -> List[sqlite3.Row]:
+        """resident_stats rows for one ward and day changed after ``version``."""
+        return self.connection().execute(
+            "SELECT * FROM resident_stats WHERE ward = ? AND shift_date = ? AND version > ? ORDER BY version",
+            (ward, shift_date, version),
+        ).fetchall()
+
+    def load_shift(self, resident_id: str, shift_date: str, shift_type: str) -> Optional[ShiftRecord]:
+        row = self.connection().execute(
+            "SELECT * FROM shifts WHERE resident_id = ? AND shift_date = ? AND shift_type = ?",
+            (resident_id, shift_date, shift_type),
+        ).fetchone()
+        return self._record_from_row(row) if row else None
+
+    def load_draft(self, draft_key: str) -> Optional[str]:
+        row = self.connection().execute("SELECT state FROM drafts WHERE draft_key = ?", (draft_key,)).fetchone()
+        return row[0] if row else None
+
+    def load_note(self, resident_id: str, shift_date: str, shift_type: str) -> Optional[str]:
+        row = self.connection().execute(
+            "SELECT n.body FROM notes n JOIN shifts s USING (shift_id) "
+            "WHERE s.resident_id = ? AND s.shift_date = ? AND s.shift_type = ?",
+            (resident_id, shift_date, shift_type),
+        ).fetchone()
+        return row[0] if row else None
+
+    def iter_shifts(self, resident_id: Optional[str] = None, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None) -> Iterator[ShiftRecord]:
+        sql, args = "SELECT * FROM shifts WHERE 1 = 1", []
+        if resident_id:
+            sql += " AND resident_id = ?"; args.append(resident_id)
+        if date_from:
+            sql += " AND shift_date >= ?"; args.append(date_from)
+        if date_to:
+            sql += " AND shift_date <= ?"; args.append(date_to)
+        for row in self.connection().execute(sql + " ORDER BY shift_date, resident_id, shift_type", args).fetchall():
+            yield self._record_from_row(row)
@@ -0,0 +1,188 @@
+# note_an_acc/typeahead.py
+# Typeahead over the behaviour catalogue: domains, subdomains, behaviours, manifestations (details),
+# triggers and management strategies, so a carer can type "exit" and land on Exit-seeking under both
+# Problem wandering and High-risk behaviour without drilling down Domain → Subdomain first.
+#
+# Built once per catalogue into two inverted indexes over lower-cased words:
+#   - word prefixes (up to MAX_PREFIX characters) → entry ids, for the usual "type the start" case;
+#   - character trigrams → entry ids, for text typed from the middle of a word ("xit", "ander").
+# Entry ids are assigned in rank order (behaviours, then manifestations, triggers, strategies), so an
+# intersection of posting lists is already ranked and a query only materialises ``limit`` hits.
+#
+# Usage: python -m note_an_acc.typeahead "exit seek" [--facility site1] [--limit 10]
+
+import argparse
+import re
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .catalogue import Catalogue, LIST_FIELDS, load_facility_catalogue
+
+MAX_PREFIX = 12  # longer query words are matched on their first MAX_PREFIX characters, then verified
+LIMIT = 10
+
+# Entry kinds in rank order; catalogue list fields keep their BehaviourEntry names
+KINDS = ("behaviour", *LIST_FIELDS, "subdomain", "domain")
+KIND_LABELS = {
+    "behaviour": "Behaviour", "details": "Manifestation", "triggers_mod": "Modifiable trigger",
+    "triggers_nonmod": "Non-modifiable trigger", "prevent": "Preventative strategy",
+    "intervent": "Intervention", "subdomain": "Subdomain", "domain": "Domain",
+}
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+@dataclass(frozen=True)
+class TypeaheadHit:
+    label: str  # the matched catalogue text
+    kind: str  # one of KINDS
+    domain: str
+    subdomain: str
+    behaviour: Optional[str] = None  # None for domain and subdomain hits
+
+    def describe(self) -> str:
+        where = {"behaviour": f"{self.domain} → {self.subdomain}", "subdomain": self.domain,
+                 "domain": ""}.get(self.kind, self.behaviour)
+        return f"{self.label} · {KIND_LABELS[self.kind]}" + (f" · {where}" if where else "")
+
+
+def words(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+def _trigrams(word: str) -> List[str]:
+    return [word[i:i + 3] for i in range(len(word) - 2)]
+
+def _contains(ids: Tuple[int, ...], i: int) -> bool:
+    j = bisect_left(ids, i)
+    return j < len(ids) and ids[j] == i
+
+def _intersect(postings: List[Tuple[int, ...]], want: Optional[int] = None) -> Sequence[int]:
+    """The first ``want`` ids (all when None) in every posting list, ascending.
+
+    Walks the shortest list and binary-searches the others, so a one-letter word with a posting list
+    the size of the catalogue costs a few lookups per candidate instead of a set build.
+    """
+    first, *others = sorted(postings, key=len)
+    if not others:
+        return first[:want]
+    out = []
+    for i in first:
+        if all(_contains(ids, i) for ids in others):
+            out.append(i)
+            if len(out) == want:
+                break
+    return out
+
+
+class TypeaheadIndex:
+    """Prefix and trigram index over one catalogue's searchable text; read-only once built."""
+    __slots__ = ("version", "hits", "_text", "_prefixes", "_trigrams")
+
+    def __init__(self, catalogue: Catalogue):
+        self.version = catalogue.version
+        hits: List[TypeaheadHit] = []
+        seen = set()
+
+        def add(hit: TypeaheadHit) -> None:
+            key = (hit.kind, hit.label, hit.behaviour, hit.subdomain)
+            if key not in seen:
+                seen.add(key)
+                hits.append(hit)
+
+        for kind in KINDS:
+            for domain, subs in catalogue.domains.items():
+                if kind == "domain":
+                    add(TypeaheadHit(domain, kind, domain, next(iter(subs), "")))
+                    continue
+                for subdomain, behaviours in subs.items():
+                    if kind == "subdomain":
+                        add(TypeaheadHit(subdomain, kind, domain, subdomain))
+                        continue
+                    for beh in behaviours:
+                        if kind == "behaviour":
+                            add(TypeaheadHit(beh, kind, domain, subdomain, beh))
+                            continue
+                        entry = catalogue.behaviours[beh]
+                        for item in getattr(entry, kind):
+                            add(TypeaheadHit(item, kind, domain, subdomain, beh))
+
+        prefixes: Dict[str, List[int]] = {}
+        trigrams: Dict[str, List[int]] = {}
+        text = []
+        for i, hit in enumerate(hits):
+            ws = words(hit.label)
+            text.append(" ".join(ws))
+            for p in {w[:n] for w in ws for n in range(1, min(len(w), MAX_PREFIX) + 1)}:
+                prefixes.setdefault(p, []).append(i)
+            for g in {g for w in ws for g in _trigrams(w)}:
+                trigrams.setdefault(g, []).append(i)
+        self.hits = tuple(hits)
+        self._text = tuple(text)
+        # Built in id order, so every posting list is already ascending
+        self._prefixes = {k: tuple(v) for k, v in prefixes.items()}
+        self._trigrams = {k: tuple(v) for k, v in trigrams.items()}
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def _by_prefix(self, qwords: List[str], want: int) -> Sequence[int]:
+        postings = []
+        for w in qwords:
+            ids = self._prefixes.get(w[:MAX_PREFIX])
+            if not ids:
+                return ()
+            postings.append(ids)
+        long_words = [w for w in qwords if len(w) > MAX_PREFIX]
+        if not long_words:
+            return _intersect(postings, want)
+        ids = [i for i in _intersect(postings) if all(f" {w}" in f" {self._text[i]}" for w in long_words)]
+        return ids[:want]
+
+    def _by_substring(self, qwords: List[str], want: int) -> Sequence[int]:
+        postings = []
+        for w in qwords:
+            for g in set(_trigrams(w)):
+                ids = self._trigrams.get(g)
+                if not ids:
+                    return ()
+                postings.append(ids)
+        if not postings:  # words under three characters only match as prefixes
+            return ()
+        # Trigrams can match out of order, so candidates are verified against the text
+        ids = [i for i in _intersect(postings) if all(w in self._text[i] for w in qwords)]
+        return ids[:want]
+
+    def search(self, query: str, limit: int = LIMIT) -> List[TypeaheadHit]:
+        """Best ``limit`` entries matching every word of ``query``; word-start matches rank first."""
+        qwords = words(query)
+        if not qwords:
+            return []
+        # Mid-word matches only when nothing starts with the query, so "call" doesn't offer "Physically"
+        want = limit * 4
+        ids = self._by_prefix(qwords, want) or self._by_substring(qwords, want)
+        phrase = " ".join(qwords)
+        # Within the ranked ids, text that starts with the query comes first; the sort is stable
+        top = sorted(ids, key=lambda i: not self._text[i].startswith(phrase))
+        return [self.hits[i] for i in top[:limit]]
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Search the behaviour catalogue")
+    ap.add_argument("query")
+    ap.add_argument("--facility", default="")
+    ap.add_argument("--limit", type=int, default=LIMIT)
+    args = ap.parse_args(argv)
+
+    index = TypeaheadIndex(load_facility_catalogue(args.facility))
+    hits = index.search(args.query, args.limit)
+    for hit in hits:
+        print(hit.describe())
+    print(f"{len(hits)} of {len(index)} catalogue entries", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# note_an_acc/ui.py
+# Streamlit-side process-wide resources, shared by the main app and the pages/ scripts.
+
+import functools
+import os
+import time
+import uuid
+import streamlit as st
+from collections import deque
+from contextlib import contextmanager
+from datetime import date
+from typing import Collection, Dict, Iterable, Iterator, Optional, Tuple
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from .analytics import HeatmapIndex
+from .catalogue import Catalogue, list_facilities, load_facility_catalogue
+from .drafts import DraftWriter
+from .effectiveness import EffectivenessIndex
+from .engine import SentenceCache
+from .escalation import EscalationDetector
+from .profiling import (
+    METRICS_PORT, PROFILE_ENABLED, PROFILE_LOG, Profiler, RerunProfile, serve_metrics, slowest_sections,
+)
+from .recording import RECORD_PATH, InteractionLog, changes
+from .scoring import BurdenScores
+from .shifts import ShiftCalendar, load_calendar
+from .storage import ShiftStore
+from .typeahead import TypeaheadHit, TypeaheadIndex
+from .utils import keyify
+
+
+@st.cache_resource
+def get_catalogue(facility: str = "") -> Catalogue:
+    """The shared catalogue, or a facility's resolved overlay view of it."""
+    return load_facility_catalogue(facility)
+
+@st.cache_resource
+def facilities() -> Tuple[str, ...]:
+    """"" (the shared catalogue) followed by every facility with an overlay."""
+    return ("",) + list_facilities()
+
+def current_facility() -> str:
+    """This session's facility: its sidebar choice, else NOTE_AN_ACC_FACILITY, else the shared catalogue."""
+    facility = st.session_state.get("facility", os.environ.get("NOTE_AN_ACC_FACILITY", ""))
+    return facility if facility in facilities() else ""
+
+@st.cache_resource
+def get_typeahead(facility: str = "") -> TypeaheadIndex:
+    """Catalogue typeahead index for the shared catalogue or a facility's view, built once per process."""
+    return TypeaheadIndex(get_catalogue(facility))
+
+@st.cache_resource
+def get_calendar() -> ShiftCalendar:
+    return load_calendar()
+
+# Path from NOTE_AN_ACC_DB; saved notes are queued for delivery when NOTE_AN_ACC_OUTBOX_URL is set
+# (run python -m note_an_acc.outbox alongside the app to deliver them)
+@st.cache_resource
+def get_store() -> ShiftStore:
+    return ShiftStore(outbox=bool(os.environ.get("NOTE_AN_ACC_OUTBOX_URL")))
+
+@st.cache_resource
+def _heatmap_index() -> HeatmapIndex:
+    return HeatmapIndex.load(get_store(), date.today())
+
+def get_heatmaps() -> HeatmapIndex:
+    """Facility heatmap index, built once per process and rolled forward to today."""
+    index = _heatmap_index()
+    index.advance(date.today())
+    return index
+
+@st.cache_resource
+def get_effectiveness() -> EffectivenessIndex:
+    """Strategy/intervention success counts, built once per process and updated on save."""
+    return EffectivenessIndex.load(get_store())
+
+@st.cache_resource
+def get_escalations() -> EscalationDetector:
+    """Escalation tracks per resident and behaviour, warmed from recent history and fed on save."""
+    return EscalationDetector.load(get_store(), date.today())
+
+@st.cache_resource(max_entries=8)
+def _burden_scores(date_from: str, date_to: str, included_only: bool) -> BurdenScores:
+    return BurdenScores(date_from, date_to, get_catalogue(), included_only)
+
+def get_burden(date_from: str, date_to: str, included_only: bool = False) -> BurdenScores:
+    """Burden scores for one assessment period, shared across sessions; only changed residents are recomputed."""
+    scores = _burden_scores(date_from, date_to, included_only)
+    scores.refresh(get_store())
+    return scores
+
+@st.cache_resource
+def get_draft_writer() -> DraftWriter:
+    """Process-wide write-behind cache for in-progress forms (see note_an_acc.drafts)."""
+    return DraftWriter(get_store()).start()
+
+def get_sentence_cache(maxsize: int = 256) -> SentenceCache:
+    """This session's episode sentence cache (one per browser session, never shared)."""
+    if "_sentence_cache" not in st.session_state:
+        st.session_state["_sentence_cache"] = SentenceCache(maxsize)
+    return st.session_state["_sentence_cache"]
+
+# =========================
+# Episode widget state
+# =========================
+# Episode widgets are keyed by behaviour, not list position, so de-selecting one behaviour
+# leaves the others' answers where they were.
+EPISODE_FIELDS = ("spec", "freq", "sev", "disr", "slot", "tmod", "tnon", "tfree", "prev", "int", "eff", "med", "me")
+
+def episode_key(behaviour: str, field: str) -> str:
+    return f"ep_{keyify(behaviour)}_{field}"
+
+def prune_episode_state(live: Iterable[str]) -> int:
+    """Drop widget state for behaviours no longer picked; returns the number of keys removed."""
+    keep = {keyify(b) for b in live}
+    stale = []
+    for k in list(st.session_state.keys()):
+        if not isinstance(k, str) or not k.startswith("ep_"):
+            continue
+        slug, _, field = k[3:].rpartition("_")
+        if field in EPISODE_FIELDS and slug not in keep:
+            stale.append(k)
+    for k in stale:
+        del st.session_state[k]
+    return len(stale)
+
+# Catalogue list field → the episode widget that ticks its items
+HIT_FIELDS = {"details": "spec", "triggers_mod": "tmod", "triggers_nonmod": "tnon", "prevent": "prev", "intervent": "int"}
+
+def apply_typeahead_hit(hit: TypeaheadHit, catalogue: Catalogue, query_key: str) -> None:
+    """
+    Button callback (runs before the widgets are drawn): point Domain/Subdomain at ``hit``, pick its
+    behaviour alongside any picks from the same subdomain, tick the matched item and clear the search.
+    """
+    ss = st.session_state
+    ss[query_key] = ""
+    ss["domain"], ss["subdomain"] = hit.domain, hit.subdomain
+    if hit.behaviour is None:
+        return
+    options = catalogue.in_domain(hit.domain, hit.subdomain)
+    picked = [b for b in ss.get("behaviour_pick", ()) if b in options]
+    if hit.behaviour not in picked:
+        picked.append(hit.behaviour)
+    ss["behaviour_pick"] = picked
+    field = HIT_FIELDS.get(hit.kind)
+    if field:
+        key = episode_key(hit.behaviour, field)
+        ss[key] = list(dict.fromkeys([*ss.get(key, ()), hit.label]))
+
+# =========================
+# Draft autosave
+# =========================
+# A draft id in the URL (?draft=...) ties a browser tab to its saved form state, so reloading the
+# page after a dropped connection or a sleeping tablet brings the form back.
+DRAFT_PARAM = "draft"
+
+def draft_key() -> str:
+    key = st.query_params.get(DRAFT_PARAM)
+    if not key:
+        key = st.query_params[DRAFT_PARAM] = uuid.uuid4().hex[:16]
+    return key
+
+def draft_state(fields: Collection[str], prefixes: Tuple[str, ...] = ()) -> Dict[str, object]:
+    return {k: v for k, v in st.session_state.items() if k in fields or (prefixes and k.startswith(prefixes))}
+
+def restore_draft(fields: Collection[str], prefixes: Tuple[str, ...] = ()) -> bool:
+    """Once per session, before any widget is drawn: refill the form from this tab's draft."""
+    if st.session_state.get("_draft_restored"):
+        return False
+    st.session_state["_draft_restored"] = True
+    state = get_draft_writer().load(draft_key())
+    if not state:
+        return False
+    for k, v in state.items():
+        if (k in fields or (prefixes and k.startswith(prefixes))) and k not in st.session_state:
+            st.session_state[k] = v
+    return True
+
+def autosave_draft(fields: Collection[str], prefixes: Tuple[str, ...] = ()) -> None:
+    get_draft_writer().update(draft_key(), draft_state(fields, prefixes))
+
+def discard_draft(fields: Collection[str], prefixes: Tuple[str, ...] = ()) -> None:
+    get_draft_writer().discard(draft_key(), draft_state(fields, prefixes))
+
+# =========================
+# Interaction recording (opt-in: NOTE_AN_ACC_RECORD=sessions.jsonl)
+# =========================
+@st.cache_resource
+def get_interaction_log() -> Optional[InteractionLog]:
+    return InteractionLog(RECORD_PATH) if RECORD_PATH else None
+
+def record_interaction(fields: Collection[str], prefixes: Tuple[str, ...] = ()) -> None:
+    """Log what the user changed since this session's previous rerun, for load-test replay."""
+    log = get_interaction_log()
+    if log is None:
+        return
+    ss = st.session_state
+    state = draft_state(fields, prefixes)
+    before = ss.get("_recorded")
+    if before is None:
+        ss["_recorded_session"], ss["_recorded_t0"] = uuid.uuid4().hex[:16], time.monotonic()
+    else:
+        changed = changes(before, state)
+        if changed:
+            log.write(ss["_recorded_session"], time.monotonic() - ss["_recorded_t0"], changed)
+    ss["_recorded"] = state
+
+# =========================
+# Rerun profiling (opt-in: NOTE_AN_ACC_PROFILE=1)
+# =========================
+FULL_RUN = "Full page"
+PANEL_RERUNS = 50
+
+@st.cache_resource
+def get_profiler() -> Optional[Profiler]:
+    if not PROFILE_ENABLED:
+        return None
+    profiler = Profiler(PROFILE_LOG)
+    if METRICS_PORT:
+        serve_metrics(profiler, METRICS_PORT)
+    return profiler
+
+def _fragment_rerun() -> bool:
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and getattr(ctx, "fragment_ids_this_run", None))
+
+def _widget_count() -> Optional[int]:
+    # Streamlit internals: where the set lives has moved between releases
+    ctx = get_script_run_ctx()
+    ids = getattr(getattr(ctx, "shared", None), "widget_ids_this_run", None)
+    if ids is None:
+        ids = getattr(ctx, "widget_ids_this_run", None)
+    if ids is None:
+        return None
+    return len(ids.snapshot() if hasattr(ids, "snapshot") else ids)
+
+def start_rerun() -> None:
+    """Call at the top of the script; a no-op unless profiling is enabled."""
+    if get_profiler() is not None:
+        st.session_state["_profile_run"] = RerunProfile(FULL_RUN)
+
+def finish_rerun() -> None:
+    """Record the current rerun (full script or fragment) with this session's counts."""
+    profiler = get_profiler()
+    run = st.session_state.get("_profile_run")
+    if profiler is None or run is None or run.closed:
+        return
+    state = {k: v for k, v in st.session_state.items() if not str(k).startswith("_profile")}
+    run.finish(_widget_count(), len(st.session_state.get("behaviour_pick", ())), state)
+    profiler.record(run)
+    st.session_state.setdefault("_profile_history", deque(maxlen=PANEL_RERUNS)).append(run)
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """
+    Time a block as section ``name`` of the current rerun. The outermost section of a fragment
+    rerun starts (and records) a rerun of its own, scoped to that fragment.
+    """
+    if get_profiler() is None:
+        yield
+        return
+    run = st.session_state.get("_profile_run")
+    owner = run is None or run.closed or (_fragment_rerun() and run.scope == FULL_RUN)
+    if owner:
+        run = st.session_state["_profile_run"] = RerunProfile(name)
+    try:
+        with run.section(name):
+            yield
+    finally:
+        if owner:
+            finish_rerun()
+
+def profiled(name: str):
+    """Decorator form of profile_section, for fragment functions."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with profile_section(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def profile_panel() -> None:
+    """Debug panel: slowest sections over this session's recent reruns."""
+    history = st.session_state.get("_profile_history")
+    if get_profiler() is None or not history:
+        return
+    with st.expander(f"Rerun profile (last {len(history)} reruns)"):
+        st.dataframe(slowest_sections(history), hide_index=True, width="stretch")
+        last = history[-1]
+        st.caption(
+            f"Last rerun: {last.scope} in {last.total_s * 1000:.0f} ms; {last.widgets} widget(s), "
+            f"{last.episodes} episode(s), {last.state_keys} session-state keys (~{last.state_bytes / 1024:.1f} KB)."
+        )
@@ -0,0 +1,15 @@
+# note_an_acc/utils.py
+# Small text helpers shared by the Streamlit app and the note engine.
+# (Charting slots per shift come from the shift calendar, note_an_acc/shifts.py.)
+
+from typing import List
+
+
+def oxford_join(items: List[str]) -> str:
+    items = [i for i in items if i and str(i).strip()]
+    if not items: return ""
+    if len(items) == 1: return items[0]
+    return ", ".join(items[:-1]) + f" and {items[-1]}"
+
+def keyify(s: str) -> str:
+    return s.lower().replace(" ", "_").replace("/", "_").replace("-", "_").replace("&", "and")
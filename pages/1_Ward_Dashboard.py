@@ -0,0 +1,61 @@
+# pages/1_Ward_Dashboard.py
+# Streamlit page: ward-level view across residents for one day, fed by maintained aggregates.
+
+import streamlit as st
+from datetime import date, timedelta
+from time import perf_counter
+
+from note_an_acc.dashboard import WardBoard
+from note_an_acc.escalation import acknowledge, open_alerts
+from note_an_acc.ui import get_store
+
+st.set_page_config(page_title="Ward Dashboard", layout="wide")
+
+RENDER_BUDGET_MS = 200
+REFRESH_EVERY = timedelta(seconds=15)
+ALERTS_SHOWN = 20
+
+st.title("Ward Dashboard")
+c1, c2 = st.columns(2)
+with c1:
+    ward = st.text_input("Ward", value=st.session_state.get("ward", ""), key="dash_ward").strip()
+with c2:
+    day = st.date_input("Date", value=date.today(), key="dash_date").isoformat()
+
+# One board per (ward, day) per session; later refreshes only fetch changed residents
+board = st.session_state.get("_ward_board")
+if board is None or (board.ward, board.shift_date) != (ward, day):
+    board = st.session_state["_ward_board"] = WardBoard(ward, day)
+
+@st.fragment(run_every=REFRESH_EVERY)
+def board_view() -> None:
+    started = perf_counter()
+    changed = board.refresh(get_store())
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Residents reported", board.totals["residents"])
+    m2.metric("Included episodes", board.totals["included"])
+    m3.metric("Sedatives given", board.totals["sedatives"])
+    m4.metric("Unsettled", board.totals["unsettled"])
+
+    if board.rows:
+        st.dataframe(board.table(), hide_index=True, width="stretch")
+    else:
+        st.info("No shift records submitted for this ward and date yet.")
+
+    alerts = open_alerts(get_store(), ward, ALERTS_SHOWN)
+    if alerts:
+        st.subheader(f"Escalations ({len(alerts)} open)")
+        for a in alerts:
+            c1, c2 = st.columns([5, 1])
+            c1.markdown(f"**{a['resident_id']} · {a['behaviour']}** – {a['detail']} "
+                        f"({a['shift_type']} {a['shift_date']})")
+            c2.button("Acknowledge", key=f"ack_{a['alert_id']}", on_click=acknowledge,
+                      args=(get_store(), [a["alert_id"]]))
+
+    elapsed_ms = (perf_counter() - started) * 1000
+    st.caption(f"{changed} resident(s) updated · rendered in {elapsed_ms:.0f} ms (budget {RENDER_BUDGET_MS} ms)")
+    if elapsed_ms > RENDER_BUDGET_MS:
+        st.warning("Dashboard render exceeded its budget.")
+
+board_view()
@@ -0,0 +1,47 @@
+# pages/2_Behaviour_Heatmaps.py
+# Streamlit page: behaviour frequency/severity by charting slot over rolling 7/30/90-day windows.
+
+import altair as alt
+import streamlit as st
+
+from note_an_acc.analytics import SLOT_GRID, WINDOWS
+from note_an_acc.ui import get_heatmaps
+
+st.set_page_config(page_title="Behaviour Heatmaps", layout="wide")
+
+MEASURE_LABELS = {
+    "Episodes": None,
+    "Mean frequency": "freq",
+    "Mean severity": "sev",
+}
+
+st.title("Behaviour Heatmaps")
+index = get_heatmaps()
+
+c1, c2, c3 = st.columns(3)
+with c1:
+    ward = st.selectbox("Ward", sorted(index.wards) or [""], key="hm_ward")
+with c2:
+    days = st.radio("Window", WINDOWS, format_func=lambda d: f"{d} days", horizontal=True, key="hm_days")
+with c3:
+    measure = st.radio("Measure", list(MEASURE_LABELS), horizontal=True, key="hm_measure")
+
+def grid_values(grid):
+    field = MEASURE_LABELS[measure]
+    return list(grid.count) if field is None else grid.mean(field)
+
+rows = [("Ward total", grid_values(index.ward(ward, days)))]
+rows += [(r, grid_values(index.resident(r, days))) for r in index.ward_residents(ward)]
+data = [
+    {"Resident": who, "Slot": slot, measure: value}
+    for who, values in rows for slot, value in zip(SLOT_GRID, values)
+]
+
+chart = alt.Chart(alt.Data(values=data)).mark_rect().encode(
+    x=alt.X("Slot:O", sort=list(SLOT_GRID)),
+    y=alt.Y("Resident:N", sort=[who for who, _ in rows]),
+    color=alt.Color(f"{measure}:Q", scale=alt.Scale(scheme="orangered")),
+    tooltip=["Resident:N", "Slot:O", f"{measure}:Q"],
+)
+st.altair_chart(chart, width="stretch")
+st.caption(f"Rolling {days}-day window ending {index.as_of:%d/%m/%Y}.")
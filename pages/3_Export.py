@@ -0,0 +1,52 @@
+# pages/3_Export.py
+# Streamlit page: filtered export of shift records (with notes) or episodes for AN-ACC assessments and audits.
+
+import tempfile
+from datetime import date, timedelta
+
+import streamlit as st
+
+from note_an_acc.export import FORMATS, ExportFilter, export
+from note_an_acc.ui import get_catalogue, get_store
+
+st.set_page_config(page_title="Export", layout="wide")
+
+MIME = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+st.title("Export Shift Records")
+st.caption("Large exports (e.g. a facility-year) are better run from the command line: "
+           "`python -m note_an_acc.export --help`.")
+
+catalogue = get_catalogue()
+c1, c2, c3 = st.columns(3)
+with c1:
+    kind = st.radio("Export", ["shifts", "episodes"], horizontal=True,
+                    format_func=lambda k: "Shift records & notes" if k == "shifts" else "Episodes")
+    fmt = st.radio("Format", FORMATS, horizontal=True, format_func=str.upper)
+with c2:
+    resident = st.text_input("Resident ID (blank for all)").strip()
+    period = st.date_input("Shift dates", value=(date.today() - timedelta(days=90), date.today()))
+with c3:
+    domain = st.selectbox("Domain", ["All"] + list(catalogue.domains))
+    subdomain = st.selectbox("Subdomain", ["All"] + (list(catalogue.domains[domain]) if domain != "All" else []))
+
+date_from, date_to = (period + (None, None))[:2] if isinstance(period, tuple) else (period, None)
+flt = ExportFilter(
+    resident_id=resident or None,
+    date_from=date_from.isoformat() if date_from else None,
+    date_to=date_to.isoformat() if date_to else None,
+    domain=None if domain == "All" else domain,
+    subdomain=None if subdomain == "All" else subdomain,
+)
+
+def build_export():
+    # Spooled to disk so the export itself streams; Streamlit then serves the finished file
+    out = tempfile.TemporaryFile()
+    export(get_store(), kind, fmt, out, flt)
+    out.seek(0)
+    return out
+
+st.download_button(
+    "Download export", data=build_export, file_name=f"note_an_acc_{kind}.{fmt}",
+    mime=MIME[fmt], type="primary",
+)
@@ -0,0 +1,49 @@
+# pages/4_Search_Notes.py
+# Streamlit page: ranked full-text search over past shift notes and carers' free-text entries.
+
+from datetime import date, timedelta
+from time import perf_counter
+
+import streamlit as st
+
+from note_an_acc.export import ExportFilter
+from note_an_acc.search import CANDIDATES, search
+from note_an_acc.ui import get_catalogue, get_store
+
+st.set_page_config(page_title="Search Notes", layout="wide")
+
+st.title("Search Shift Notes")
+st.caption('Words must all appear; use "quotes" for an exact phrase and a trailing * for prefixes (e.g. agitat*).')
+
+catalogue = get_catalogue()
+query = st.text_input("Search", placeholder='e.g. "exit-seeking" or Responding to voices')
+c1, c2, c3 = st.columns(3)
+with c1:
+    resident = st.text_input("Resident ID (blank for all)").strip()
+with c2:
+    period = st.date_input("Shift dates", value=(date.today() - timedelta(days=365), date.today()))
+with c3:
+    domain = st.selectbox("Domain", ["All"] + list(catalogue.domains))
+    subdomain = st.selectbox("Subdomain", ["All"] + (list(catalogue.domains[domain]) if domain != "All" else []))
+
+if query.strip():
+    date_from, date_to = (period + (None, None))[:2] if isinstance(period, tuple) else (period, None)
+    flt = ExportFilter(
+        resident_id=resident or None,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        domain=None if domain == "All" else domain,
+        subdomain=None if subdomain == "All" else subdomain,
+    )
+    started = perf_counter()
+    results = search(get_store(), query, flt, limit=50)
+    st.caption(f"{len(results.hits)} result(s) in {(perf_counter() - started) * 1000:.0f} ms, best match first.")
+    if results.cutoff:
+        st.info(f"More than {CANDIDATES:,} notes matched, so only shifts after {results.cutoff} were ranked. "
+                "Narrow the dates or add words to search earlier notes.")
+    for h in results.hits:
+        with st.container(border=True):
+            st.markdown(f"**{h.resident_id}** · {h.shift_date} · {h.shift_type} shift" + (f" · Ward {h.ward}" if h.ward else ""))
+            st.markdown(h.note)
+            if h.free_text:
+                st.caption(f"Free text: {h.free_text}")
@@ -0,0 +1,44 @@
+# pages/5_Behaviour_Burden.py
+# Streamlit page: per-resident behaviour burden over an assessment period, by domain and subdomain.
+
+from datetime import date, timedelta
+from time import perf_counter
+
+import streamlit as st
+
+from note_an_acc.scoring import MEASURE_LABELS, MEASURES
+from note_an_acc.ui import get_burden, get_catalogue, get_store
+
+st.set_page_config(page_title="Behaviour Burden", layout="wide")
+
+st.title("Behaviour Burden")
+st.caption("Episodes, frequency × severity, disruption and sedatives per resident over the assessment period.")
+
+catalogue = get_catalogue()
+c1, c2, c3 = st.columns(3)
+with c1:
+    period = st.date_input("Assessment period", value=(date.today() - timedelta(days=28), date.today()))
+with c2:
+    ward = st.text_input("Ward (blank for all)", value=st.session_state.get("ward", "")).strip()
+with c3:
+    domain = st.selectbox("Domain", ["All"] + list(catalogue.domains))
+    included_only = st.checkbox("Only episodes meeting the inclusion rules")
+
+date_from, date_to = (period + (period[0],))[:2] if isinstance(period, tuple) and period else (period, period)
+started = perf_counter()
+scores = get_burden(date_from.isoformat(), date_to.isoformat(), included_only)
+residents = get_store().ward_residents(ward) if ward else None
+rows = scores.table(residents, None if domain == "All" else domain)
+st.caption(f"{len(rows)} resident(s) · {scores.recomputed} recomputed · {(perf_counter() - started) * 1000:.0f} ms")
+
+if not rows:
+    st.info("No episodes recorded for this period.")
+else:
+    st.dataframe(rows, hide_index=True, width="stretch")
+    pick = st.selectbox("Resident breakdown", [r["Resident"] for r in rows])
+    detail = [
+        {"Domain": d, "Subdomain": s, **{MEASURE_LABELS[m]: v[m] for m in MEASURES}}
+        for (d, s), v in scores.by_subdomain(pick).items()
+        if domain == "All" or d == domain
+    ]
+    st.dataframe(detail, hide_index=True, width="stretch")
@@ -0,0 +1,49 @@
+# pages/6_Ward_Handover.py
+# Streamlit page: the RN's end-of-shift handover pack for a whole ward, as HTML (or PDF).
+
+import io
+from datetime import date
+from time import perf_counter
+
+import streamlit as st
+
+from note_an_acc.handover import html_to_pdf, weasyprint, write_handover
+from note_an_acc.ui import get_calendar, get_store
+
+st.set_page_config(page_title="Ward Handover", layout="wide")
+
+st.title("Ward Handover")
+st.caption("Each resident's note, included episodes, sedatives, bed status and ongoing concerns for one shift.")
+
+calendar = get_calendar()
+c1, c2, c3 = st.columns(3)
+with c1:
+    ward = st.text_input("Ward", value=st.session_state.get("ward", "")).strip()
+with c2:
+    day = st.date_input("Shift date", value=date.today())
+with c3:
+    shift_type = st.selectbox("Shift", calendar.names)
+
+if ward:
+    started = perf_counter()
+    buf = io.StringIO()
+    n = write_handover(buf, get_store(), ward, day.isoformat(), shift_type)
+    document = buf.getvalue()
+    st.caption(f"{n} resident(s) · built in {(perf_counter() - started) * 1000:.0f} ms")
+    name = f"handover_{ward}_{day.isoformat()}_{shift_type}".replace(" ", "_")
+    b1, b2 = st.columns(2)
+    with b1:
+        st.download_button("Download HTML", data=document, file_name=f"{name}.html", mime="text/html", type="primary")
+    with b2:
+        if weasyprint is not None:
+            def build_pdf():
+                out = io.BytesIO()
+                html_to_pdf(document, out)
+                return out.getvalue()
+            st.download_button("Download PDF", data=build_pdf, file_name=f"{name}.pdf", mime="application/pdf")
+        else:
+            st.caption("PDF download needs WeasyPrint on the server (pip install weasyprint); print the HTML instead.")
+    with st.expander("Preview", expanded=True):
+        st.html(document)
+else:
+    st.info("Enter a ward to build its handover pack.")